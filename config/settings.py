@@ -129,6 +129,28 @@ DATABASES = {
     }
 }
 
+# =========================
+# CACHE (Redis – docker-compose'dagi redis konteyneri)
+# =========================
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # =========================
 # AUTH / JWT
 # =========================
@@ -171,6 +193,21 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Video fayllar imzolangan /stream/ URL orqali beriladi; nginx baytlarni
+# X-Accel-Redirect bilan internal location'dan uzatadi.
+STREAM_URL_TTL = int(os.getenv("STREAM_URL_TTL", 60 * 60))
+STREAM_USE_X_ACCEL = os.getenv("STREAM_USE_X_ACCEL", "0" if DEBUG else "1") == "1"
+STREAM_X_ACCEL_PREFIX = "/protected-media/"
+
+# Bo'laklab (resumable) video yuklash
+VIDEO_UPLOAD_MAX_SIZE = int(os.getenv("VIDEO_UPLOAD_MAX_SIZE", 10 * 1024 ** 3))
+VIDEO_UPLOAD_TTL = int(os.getenv("VIDEO_UPLOAD_TTL", 60 * 60 * 24))
+
+# Player heartbeat pozitsiyalari Redis'da yig'iladi va shuncha soniyada bir bazaga yoziladi
+WATCH_FLUSH_INTERVAL = int(os.getenv("WATCH_FLUSH_INTERVAL", 10))
+# Video ko'rishlar/unikal tomoshabinlar Redis hisoblagichlaridan kunlik jadvalga shu oraliqda yig'iladi
+ANALYTICS_ROLLUP_INTERVAL = int(os.getenv("ANALYTICS_ROLLUP_INTERVAL", 60))
+
 # =========================
 # DEFAULTS
 # =========================
@@ -6,6 +6,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from django.conf.urls.i18n import i18n_patterns
+from courses.views.stream_view import stream_media
+from courses.views.events_view import comment_events
 
 schema_view = get_schema_view(
    openapi.Info(
@@ -21,7 +23,8 @@ schema_view = get_schema_view(
 )
 
 urlpatterns = [
-   
+    path('stream/<int:expires>/<str:signature>/<path:path>', stream_media, name='stream-media'),
+    path('events/videos/<int:video_id>/comments/', comment_events, name='comment-events'),
 ]
 
 urlpatterns += i18n_patterns(
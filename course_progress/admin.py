@@ -1,4 +1,4 @@
 from django.contrib import admin
-from .models import Exam, Certificate, CourseProgress, CourseRating
+from .models import Exam, Certificate, CourseProgress, CourseRating, WatchPosition
 
-admin.site.register([Exam, Certificate, CourseProgress, CourseRating])
+admin.site.register([Exam, Certificate, CourseProgress, CourseRating, WatchPosition])
@@ -0,0 +1,204 @@
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef
+from django.db.models.functions import Greatest
+
+from course_progress.models import CourseProgress, CourseQuizProgress, SectionQuizProgress, VideoQuizProgress
+from courses.cache import bump_versions, course_scope
+from courses.models import Question, Section, SectionCompletion, Video
+
+
+def mark_questions_completed(question_ids, course_id):
+    if Question.objects.filter(id__in=question_ids, is_completed=False).update(is_completed=True):
+        # update() signal yubormaydi: barcha foydalanuvchilar progress keshi eskiradi
+        bump_versions(course_scope(course_id))
+
+
+def _increment(model, field, delta, **lookup):
+    """Hisoblagichni F() bilan o'zgartiradi; qator yo'q bo'lsa, faqat oshirishda yaratiladi."""
+    if delta > 0:
+        model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+    model.objects.filter(**lookup).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _course_completed(user_id, course_id):
+    """Quizli har bir section yakunlangan bo'lsa kurs yakunlangan; quizsiz sectionlar (masalan, kirish) hisobga olinmaydi."""
+    return not Section.objects.filter(course_id=course_id, quiz_video_count__gt=0).exclude(
+        Exists(SectionCompletion.objects.filter(user_id=user_id, section_id=OuterRef('pk')))
+    ).exists()
+
+
+def _complete_course(user_id, course_id):
+    if not _course_completed(user_id, course_id):
+        return
+    course_progress, _ = CourseProgress.objects.get_or_create(user_id=user_id, course_id=course_id)
+    if not course_progress.is_complete:
+        course_progress.is_complete = True
+        course_progress.save()
+
+
+def _complete_section(user_id, section_id, course_id):
+    _, section_completed = SectionCompletion.objects.get_or_create(user_id=user_id, section_id=section_id)
+    if not section_completed:
+        return
+    _increment(CourseQuizProgress, 'completed_sections', 1, user_id=user_id, course_id=course_id)
+    _complete_course(user_id, course_id)
+
+
+def apply_question_results(user_id, video, delta):
+    """
+    Videodagi to'g'ri javoblar soni `delta` ga o'zgarganda (false -> true +1, true -> false -1)
+    hisoblagichlarni yangilaydi. Video, section va kurs yakunlanishi shartli UPDATE / unique
+    qator bilan bir marta qayd etiladi va qaytarib olinmaydi, shuning uchun har bir javob
+    o'zgarmas sondagi so'rov bilan ishlanadi. `video` section bilan yuklangan bo'lishi kerak.
+    """
+    if not delta:
+        return
+    _increment(VideoQuizProgress, 'passed_count', delta, user_id=user_id, video_id=video.pk)
+    if delta < 0 or not video.question_count:
+        return
+    video_completed = VideoQuizProgress.objects.filter(
+        user_id=user_id, video_id=video.pk, is_completed=False, passed_count__gte=video.question_count
+    ).update(is_completed=True)
+    if not video_completed:
+        return
+
+    section = video.section
+    _increment(SectionQuizProgress, 'completed_videos', 1, user_id=user_id, section_id=section.pk)
+    if SectionQuizProgress.objects.filter(
+        user_id=user_id, section_id=section.pk, completed_videos__gte=section.quiz_video_count
+    ).exists():
+        _complete_section(user_id, section.pk, section.course_id)
+
+
+def reevaluate_quiz_completion(video_ids=(), section_ids=()):
+    """
+    Video.question_count / Section.quiz_video_count o'zgargandan keyin (savol qo'shish/o'chirish,
+    videoni ko'chirish) foydalanuvchi hisoblagichlarini yangi jami qiymatlarga moslaydi: yetib
+    borgan videolar yakunlanadi, section hisoblagichlari qayta sanaladi va yakunlangan
+    sectionlar/kurslar belgilanadi. Yakunlanish bu yerda ham qaytarib olinmaydi.
+    """
+    section_ids = set(section_ids)
+    quizless_courses = set()
+    with transaction.atomic():
+        if video_ids:
+            VideoQuizProgress.objects.filter(
+                video_id__in=video_ids, is_completed=False, video__question_count__gt=0,
+                passed_count__gte=F('video__question_count'),
+            ).update(is_completed=True)
+            section_ids.update(Video.objects.filter(pk__in=video_ids).values_list('section_id', flat=True))
+        if not section_ids:
+            return
+
+        completed_videos = (
+            VideoQuizProgress.objects.filter(
+                is_completed=True, video__question_count__gt=0, video__section_id__in=section_ids
+            )
+            .values('user_id', 'video__section_id').annotate(total=Count('id'))
+            .values_list('user_id', 'video__section_id', 'total')
+        )
+        SectionQuizProgress.objects.filter(section_id__in=section_ids).update(completed_videos=0)
+        SectionQuizProgress.objects.bulk_create(
+            [SectionQuizProgress(user_id=user_id, section_id=section_id, completed_videos=total)
+             for user_id, section_id, total in completed_videos],
+            batch_size=500, update_conflicts=True,
+            unique_fields=['user', 'section'], update_fields=['completed_videos'],
+        )
+
+        reached = (
+            SectionQuizProgress.objects.filter(
+                section_id__in=section_ids, section__quiz_video_count__gt=0,
+                completed_videos__gte=F('section__quiz_video_count'),
+            )
+            .exclude(Exists(SectionCompletion.objects.filter(
+                user_id=OuterRef('user_id'), section_id=OuterRef('section_id')
+            )))
+            .values_list('user_id', 'section_id', 'section__course_id')
+        )
+        for user_id, section_id, course_id in reached:
+            _complete_section(user_id, section_id, course_id)
+
+        # quizsiz bo'lib qolgan section endi kurs yakunlanishini to'smaydi
+        quizless_courses = set(
+            Section.objects.filter(pk__in=section_ids, quiz_video_count=0).values_list('course_id', flat=True)
+        )
+    if quizless_courses:
+        reevaluate_course_completion(quizless_courses)
+
+
+def reevaluate_course_completion(course_ids):
+    """
+    Section o'chirilgandan, boshqa kursga ko'chirilgandan yoki quizsiz bo'lib qolgandan keyin
+    CourseQuizProgress.completed_sections ni SectionCompletion qatorlaridan qayta sanaydi va
+    yakunlangan sectioni bor foydalanuvchilar uchun kurs yakunlanishini qayta tekshiradi.
+    """
+    with transaction.atomic():
+        completed_sections = list(
+            SectionCompletion.objects.filter(section__course_id__in=course_ids)
+            .values('user_id', 'section__course_id').annotate(total=Count('id'))
+            .values_list('user_id', 'section__course_id', 'total')
+        )
+        CourseQuizProgress.objects.filter(course_id__in=course_ids).update(completed_sections=0)
+        CourseQuizProgress.objects.bulk_create(
+            [CourseQuizProgress(user_id=user_id, course_id=course_id, completed_sections=total)
+             for user_id, course_id, total in completed_sections],
+            batch_size=500, update_conflicts=True,
+            unique_fields=['user', 'course'], update_fields=['completed_sections'],
+        )
+        completed_courses = set(
+            CourseProgress.objects.filter(course_id__in=course_ids, is_complete=True)
+            .values_list('user_id', 'course_id')
+        )
+        for user_id, course_id, _ in completed_sections:
+            if (user_id, course_id) not in completed_courses:
+                _complete_course(user_id, course_id)
+
+
+def completion_state(user_id, video):
+    """(video, section, kurs) yakunlanganmi — hisoblagich jadvallaridan to'g'ridan-to'g'ri o'qiladi."""
+    video_completed = not video.question_count or VideoQuizProgress.objects.filter(
+        user_id=user_id, video_id=video.pk, is_completed=True
+    ).exists()
+    section_completed = not video.section.quiz_video_count or SectionCompletion.objects.filter(
+        user_id=user_id, section_id=video.section_id
+    ).exists()
+    course_completed = CourseProgress.objects.filter(
+        user_id=user_id, course_id=video.section.course_id, is_complete=True
+    ).exists()
+    return video_completed, section_completed, course_completed
+
+
+def _percent(done, total):
+    return round(min(done, total) * 100 / total) if total else 0
+
+
+def quiz_progress(user_id, course_id):
+    """Kurs bo'yicha test progressi: har bir section uchun yakunlangan videolar va kurs foizi."""
+    completed_videos = dict(
+        SectionQuizProgress.objects.filter(user_id=user_id, section__course_id=course_id)
+        .values_list('section_id', 'completed_videos')
+    )
+    completed_sections = set(
+        SectionCompletion.objects.filter(user_id=user_id, section__course_id=course_id)
+        .values_list('section_id', flat=True)
+    )
+    sections = []
+    for section_id, quiz_video_count in Section.objects.filter(course_id=course_id) \
+            .order_by('position', 'id').values_list('id', 'quiz_video_count'):
+        # quizsiz section yakunlangan hisoblanadi
+        is_completed = not quiz_video_count or section_id in completed_sections
+        sections.append({
+            "section": section_id,
+            "completed_videos": completed_videos.get(section_id, 0),
+            "quiz_video_count": quiz_video_count,
+            "percent": 100 if is_completed else _percent(completed_videos.get(section_id, 0), quiz_video_count),
+            "is_completed": is_completed,
+        })
+    done = sum(section["is_completed"] for section in sections)
+    return {
+        "course": course_id,
+        "completed_sections": done,
+        "total_sections": len(sections),
+        "percent": _percent(done, len(sections)),
+        "is_complete": CourseProgress.objects.filter(user_id=user_id, course_id=course_id, is_complete=True).exists(),
+        "sections": sections,
+    }
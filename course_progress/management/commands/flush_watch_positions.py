@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from course_progress.watch import flush_watch_positions
+
+
+class Command(BaseCommand):
+    help = "Redis'dagi player heartbeat pozitsiyalarini har N soniyada bitta upsert bilan bazaga yozadi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=settings.WATCH_FLUSH_INTERVAL,
+                            help="Flushlar orasidagi vaqt (soniya)")
+        parser.add_argument('--once', action='store_true', help="Bir marta flush qilib to'xtash")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            close_old_connections()
+            total = flush_watch_positions()
+            if total:
+                self.stdout.write(f"{total} ta pozitsiya yozildi")
+            if options['once']:
+                break
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_quiz_progress(apps, schema_editor):
+    QuestionResult = apps.get_model('course_progress', 'QuestionResult')
+    VideoQuizProgress = apps.get_model('course_progress', 'VideoQuizProgress')
+    SectionQuizProgress = apps.get_model('course_progress', 'SectionQuizProgress')
+    CourseQuizProgress = apps.get_model('course_progress', 'CourseQuizProgress')
+    SectionCompletion = apps.get_model('courses', 'SectionCompletion')
+    Video = apps.get_model('courses', 'Video')
+
+    question_counts = dict(Video.objects.values_list('id', 'question_count'))
+    passed = (
+        QuestionResult.objects.filter(is_passed=True)
+        .values('user_id', 'question__video_id').annotate(total=Count('id'))
+        .values_list('user_id', 'question__video_id', 'total')
+    )
+    VideoQuizProgress.objects.bulk_create([
+        VideoQuizProgress(user_id=user_id, video_id=video_id, passed_count=total,
+                          is_completed=total >= question_counts[video_id])
+        for user_id, video_id, total in passed
+    ], batch_size=500)
+
+    completed_videos = (
+        VideoQuizProgress.objects.filter(is_completed=True)
+        .values('user_id', 'video__section_id').annotate(total=Count('id'))
+        .values_list('user_id', 'video__section_id', 'total')
+    )
+    SectionQuizProgress.objects.bulk_create([
+        SectionQuizProgress(user_id=user_id, section_id=section_id, completed_videos=total)
+        for user_id, section_id, total in completed_videos
+    ], batch_size=500)
+
+    completed_sections = (
+        SectionCompletion.objects.values('user_id', 'section__course_id').annotate(total=Count('id'))
+        .values_list('user_id', 'section__course_id', 'total')
+    )
+    CourseQuizProgress.objects.bulk_create([
+        CourseQuizProgress(user_id=user_id, course_id=course_id, completed_sections=total)
+        for user_id, course_id, total in completed_sections
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_progress', '0003_watch_position'),
+        ('courses', '0018_quiz_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseQuizProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_sections', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='courses.course')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_quiz_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'course')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SectionQuizProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_videos', models.PositiveIntegerField(default=0)),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='courses.section')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='section_quiz_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'section')},
+            },
+        ),
+        migrations.CreateModel(
+            name='VideoQuizProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('passed_count', models.PositiveIntegerField(default=0)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_quiz_progress', to=settings.AUTH_USER_MODEL)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='courses.video')),
+            ],
+            options={
+                'unique_together': {('user', 'video')},
+            },
+        ),
+        migrations.RunPython(backfill_quiz_progress, migrations.RunPython.noop),
+    ]
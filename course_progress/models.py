@@ -1,5 +1,5 @@
 from django.db import models
-from courses.models import BasicClass, Course, Video, Question, Answer
+from courses.models import BasicClass, Course, Section, Video, Question, Answer
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
@@ -32,6 +32,23 @@ class CourseProgress(models.Model):
         return f"user: {self.user} -- course: {self.course}"
 
 
+class WatchPosition(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='watch_positions')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    video = models.ForeignKey(Video, on_delete=models.CASCADE)
+    position = models.PositiveIntegerField(default=0)
+    watched_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'video')
+        indexes = [
+            models.Index(fields=['user', 'course', '-watched_at'], name='watch_position_resume_idx'),
+        ]
+
+    def __str__(self):
+        return f"user: {self.user} -- video: {self.video} --> {self.position}s"
+
+
 class Exam(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     title_en = models.CharField(max_length=255)
@@ -74,6 +91,45 @@ class QuestionResult(BasicClass):
     def __str__(self):
         return f"user: {self.user} --> question: {self.question} --> passed: {self.is_passed}"
 
+
+class VideoQuizProgress(models.Model):
+    """To'g'ri javob berilgan savollar soni; barcha savollar topshirilganda is_completed qaytarilmaydi."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='video_quiz_progress')
+    video = models.ForeignKey(Video, on_delete=models.CASCADE)
+    passed_count = models.PositiveIntegerField(default=0)
+    is_completed = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('user', 'video')
+
+    def __str__(self):
+        return f"user: {self.user} -- video: {self.video} --> passed: {self.passed_count}"
+
+
+class SectionQuizProgress(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='section_quiz_progress')
+    section = models.ForeignKey(Section, on_delete=models.CASCADE)
+    completed_videos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'section')
+
+    def __str__(self):
+        return f"user: {self.user} -- section: {self.section} --> videos: {self.completed_videos}"
+
+
+class CourseQuizProgress(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='course_quiz_progress')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    completed_sections = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'course')
+
+    def __str__(self):
+        return f"user: {self.user} -- course: {self.course} --> sections: {self.completed_sections}"
+
+
 class Certificate(BasicClass):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='certificate_user')
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
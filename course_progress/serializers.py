@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from courses.models import Video
 from .models import QuestionResult, CourseProgress, CourseRating, Exam
 
 class QuestionResultSerializer(serializers.ModelSerializer):
@@ -25,3 +26,25 @@ class ExamSerializer(serializers.ModelSerializer):
     class Meta:
         model = Exam
         fields = '__all__'
+
+
+class WatchHeartbeatSerializer(serializers.Serializer):
+    video = serializers.IntegerField(min_value=1)
+    position = serializers.IntegerField(min_value=0, help_text="Joriy pozitsiya (soniya)")
+
+
+class QuizAnswerSerializer(serializers.Serializer):
+    question = serializers.IntegerField(min_value=1)
+    selected_answer = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+
+
+class QuizSubmissionSerializer(serializers.Serializer):
+    video = serializers.PrimaryKeyRelatedField(queryset=Video.objects.select_related('section'))
+    answers = QuizAnswerSerializer(many=True, allow_empty=False)
+
+    def validate_answers(self, answers):
+        question_ids = [answer['question'] for answer in answers]
+        if len(question_ids) != len(set(question_ids)):
+            raise serializers.ValidationError("Har bir savolga faqat bitta javob yuborilishi kerak.")
+        return answers
+
@@ -1,3 +1,346 @@
+import importlib
+from decimal import Decimal
+from unittest import mock
+
+from django.apps import apps
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser, Teacher
+from course_progress.completion import apply_question_results, quiz_progress
+from course_progress.models import (
+    CourseProgress, CourseQuizProgress, QuestionResult, SectionQuizProgress, VideoQuizProgress, WatchPosition
+)
+from course_progress.watch import LocalWatchBuffer, flush_watch_positions
+from courses.models import Answer, Course, CourseCategory, Question, Section, SectionCompletion, Video
+
+
+def create_course(*videos_per_section, questions=1):
+    """Har bir section uchun berilgan sondagi videolar; har bir videoda `questions` ta savol."""
+    category = CourseCategory.objects.create(
+        name_en='c', name_uz='c', name_ru='c', description_en='d', description_uz='d', description_ru='d'
+    )
+    teacher, _ = Teacher.objects.get_or_create(
+        phone_number='+998900000001', defaults={'first_name': 'Ali', 'last_name': 'Valiyev', 'specialization': 'py'}
+    )
+    course = Course.objects.create(
+        name_en='Python', name_uz='Python', name_ru='Python', description_en='d', description_uz='d',
+        description_ru='d', price=Decimal('100.00'), discount='10%', duration='10:00', category=category,
+        instructor=teacher, status='boshlangich'
+    )
+    for section_index, video_count in enumerate(videos_per_section):
+        section = Section.objects.create(
+            course=course, title_en=f's{section_index}', title_uz='s', title_ru='s', duration='1:00'
+        )
+        for video_index in range(video_count):
+            video = Video.objects.create(
+                section=section, title_en=f'v{video_index}', title_uz='v', title_ru='v', duration='02:30',
+                video_file=f'videos/v{section_index}{video_index}.mp4'
+            )
+            for _ in range(questions):
+                add_question(video)
+    return course
+
+
+def add_question(video):
+    question = Question.objects.create(video=video, question_text_en='q', question_text_uz='q', question_text_ru='q')
+    Answer.objects.create(question=question, answer_text_en='a', answer_text_uz='a', answer_text_ru='a', is_correct=True)
+    Answer.objects.create(question=question, answer_text_en='b', answer_text_uz='b', answer_text_ru='b')
+    return question
+
+
+class QuizTestCase(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(first_name='U', last_name='S', phone_number='+998900000002')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post_answers(self, video, answers):
+        return self.client.post(
+            '/uz/api/course_progres/submit_quiz/', {'video': video.pk, 'answers': answers}, format='json'
+        )
+
+    def submit(self, video, correct=True, questions=None):
+        answers = [
+            {'question': question.pk, 'selected_answer': question.answer_set.get(is_correct=correct).pk}
+            for question in (questions or video.question_set.all())
+        ]
+        response = self.post_answers(video, answers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def videos(self, course):
+        return list(Video.objects.filter(section__course=course).order_by('section__position', 'position', 'id'))
+
+    def course_completed(self, course):
+        return CourseProgress.objects.filter(user=self.user, course=course, is_complete=True).exists()
+
+
+class QuizCompletionTests(QuizTestCase):
+
+    def test_pass_unpass_flip_does_not_double_count(self):
+        course = create_course(2)
+        video = self.videos(course)[0]
+
+        self.assertTrue(self.submit(video)['video_completed'])
+        self.submit(video, correct=False)
+        progress = VideoQuizProgress.objects.get(user=self.user, video=video)
+        self.assertEqual((progress.passed_count, progress.is_completed), (0, True))
+
+        self.submit(video)
+        self.assertEqual(VideoQuizProgress.objects.get(user=self.user, video=video).passed_count, 1)
+        self.assertEqual(SectionQuizProgress.objects.get(user=self.user, section=video.section).completed_videos, 1)
+        self.assertFalse(SectionCompletion.objects.filter(user=self.user).exists())
+
+    def test_question_added_after_completion_keeps_completion(self):
+        course = create_course(1)
+        video = self.videos(course)[0]
+        self.assertTrue(self.submit(video)['course_completed'])
+
+        add_question(video)
+        video.refresh_from_db()
+        progress = VideoQuizProgress.objects.get(user=self.user, video=video)
+        self.assertEqual((video.question_count, progress.passed_count, progress.is_completed), (2, 1, True))
+        self.assertEqual(SectionQuizProgress.objects.get(user=self.user, section=video.section).completed_videos, 1)
+        self.assertTrue(self.course_completed(course))
+
+    def test_question_removed_completes_video(self):
+        course = create_course(1, questions=2)
+        video = self.videos(course)[0]
+        first, second = video.question_set.order_by('id')
+        self.assertFalse(self.submit(video, questions=[first])['video_completed'])
+
+        second.delete()
+        self.assertTrue(VideoQuizProgress.objects.get(user=self.user, video=video).is_completed)
+        self.assertTrue(self.course_completed(course))
+
+    def test_video_moved_between_sections(self):
+        course = create_course(2, 1)
+        first, moved, last = self.videos(course)
+        self.submit(first)
+
+        moved.section = last.section
+        moved.save()
+        self.assertEqual(Section.objects.get(pk=first.section_id).quiz_video_count, 1)
+        self.assertEqual(Section.objects.get(pk=last.section_id).quiz_video_count, 2)
+        self.assertTrue(SectionCompletion.objects.filter(user=self.user, section=first.section_id).exists())
+        self.assertFalse(self.course_completed(course))
+
+        self.submit(moved)
+        self.assertEqual(SectionQuizProgress.objects.get(user=self.user, section=last.section_id).completed_videos, 1)
+        self.assertFalse(self.course_completed(course))
+        self.submit(last)
+        self.assertTrue(self.course_completed(course))
+        self.assertEqual(CourseQuizProgress.objects.get(user=self.user, course=course).completed_sections, 2)
+
+    def test_section_deleted_completes_course(self):
+        course = create_course(1, 1)
+        first, last = self.videos(course)
+        self.submit(first)
+        self.assertFalse(self.course_completed(course))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Section.objects.get(pk=last.section_id).delete()
+        self.assertTrue(self.course_completed(course))
+        self.assertEqual(CourseQuizProgress.objects.get(user=self.user, course=course).completed_sections, 1)
+
+    def test_section_moved_to_another_course_updates_counters(self):
+        course = create_course(1, 1)
+        other = create_course(1)
+        first, _ = self.videos(course)
+        self.submit(first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            section = Section.objects.get(pk=first.section_id)
+            section.course = other
+            section.save()
+        self.assertEqual(CourseQuizProgress.objects.get(user=self.user, course=course).completed_sections, 0)
+        self.assertEqual(CourseQuizProgress.objects.get(user=self.user, course=other).completed_sections, 1)
+        self.assertFalse(self.course_completed(other))
+
+    def test_section_without_quizzes_counts_as_complete(self):
+        course = create_course(1, 1)
+        intro = Section.objects.create(course=course, title_en='i', title_uz='i', title_ru='i', duration='1:00')
+        Video.objects.create(
+            section=intro, title_en='v', title_uz='v', title_ru='v', duration='02:30', video_file='videos/i.mp4'
+        )
+        first, last, _ = self.videos(course)
+        self.submit(first)
+        response = self.submit(last)
+
+        self.assertEqual(
+            (response['video_completed'], response['section_completed'], response['course_completed']),
+            (True, True, True)
+        )
+        progress = quiz_progress(self.user.pk, course.pk)
+        self.assertEqual((progress['completed_sections'], progress['total_sections'], progress['percent']), (3, 3, 100))
+
+    def test_backfill_matches_live_counters(self):
+        course = create_course(2, 1)
+        first, second, last = self.videos(course)
+        self.submit(first)
+        self.submit(second)
+        self.submit(last, correct=False)
+
+        def counters():
+            return (
+                sorted(VideoQuizProgress.objects.values_list('user_id', 'video_id', 'passed_count', 'is_completed')),
+                sorted(SectionQuizProgress.objects.values_list('user_id', 'section_id', 'completed_videos')),
+                sorted(CourseQuizProgress.objects.values_list('user_id', 'course_id', 'completed_sections')),
+            )
+
+        live = counters()
+        VideoQuizProgress.objects.all().delete()
+        SectionQuizProgress.objects.all().delete()
+        CourseQuizProgress.objects.all().delete()
+        importlib.import_module('course_progress.migrations.0004_quiz_progress_counters') \
+            .backfill_quiz_progress(apps, None)
+
+        backfilled = counters()
+        # backfill faqat to'g'ri javobi bor qatorlarni yaratadi
+        self.assertEqual(backfilled[0], [row for row in live[0] if row[2]])
+        self.assertEqual(backfilled[1:], live[1:])
+
+
+class SubmitQuizTests(QuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.video = self.videos(create_course(1, questions=3))[0]
+        self.questions = list(self.video.question_set.order_by('id'))
+
+    def answer(self, question, correct=True):
+        return {'question': question.pk, 'selected_answer': question.answer_set.get(is_correct=correct).pk}
+
+    def test_response_shape(self):
+        data = self.submit(self.video, questions=self.questions[:2])
+        self.assertEqual(data, {
+            'video': self.video.pk,
+            'total': 3,
+            'passed': 2,
+            'results': [
+                {'question': question.pk, 'selected_answer': question.answer_set.get(is_correct=True).pk,
+                 'is_passed': True}
+                for question in self.questions[:2]
+            ],
+            'video_completed': False,
+            'section_completed': False,
+            'course_completed': False,
+        })
+
+    def test_partial_resubmission_changes_only_sent_answers(self):
+        self.submit(self.video)
+        data = self.post_answers(self.video, [self.answer(self.questions[1], correct=False)]).json()
+
+        self.assertEqual((data['total'], data['passed'], len(data['results'])), (3, 0, 1))
+        self.assertEqual(
+            list(QuestionResult.objects.filter(user=self.user).order_by('question_id').values_list('is_passed', flat=True)),
+            [True, False, True]
+        )
+        self.assertEqual(VideoQuizProgress.objects.get(user=self.user, video=self.video).passed_count, 2)
+
+    def test_answer_from_another_question_is_400(self):
+        first, second, _ = self.questions
+        response = self.post_answers(self.video, [
+            self.answer(first), {'question': second.pk, 'selected_answer': first.answer_set.first().pk},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': {str(second.pk): "Javob savolga tegishli emas."}})
+        self.assertFalse(QuestionResult.objects.exists())
+
+    def test_question_from_another_video_is_400(self):
+        other = self.videos(create_course(1))[0].question_set.get()
+        response = self.post_answers(self.video, [self.answer(other)])
+        self.assertEqual(response.json(), {'detail': {str(other.pk): "Savol bu videoga tegishli emas."}})
+
+    def test_delta_passed_to_counters(self):
+        first, second, third = self.questions
+        with mock.patch(
+            'course_progress.views.test_result_views.apply_question_results', wraps=apply_question_results
+        ) as apply:
+            self.post_answers(self.video, [self.answer(first), self.answer(second), self.answer(third, False)])
+            self.post_answers(self.video, [self.answer(first, False), self.answer(third)])
+            self.post_answers(self.video, [self.answer(first, False), self.answer(second, False)])
+            self.post_answers(self.video, [self.answer(first)])
+
+        self.assertEqual([call.args[2] for call in apply.call_args_list], [2, 0, -1, 1])
+        self.assertTrue(all(call.args[:2] == (self.user.pk, self.video) for call in apply.call_args_list))
+        self.assertEqual(VideoQuizProgress.objects.get(user=self.user, video=self.video).passed_count, 2)
+
+
+class WatchHeartbeatTests(QuizTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.course = create_course(2)
+        self.first, self.second = self.videos(self.course)
+        self.buffer = LocalWatchBuffer()
+        patcher = mock.patch('course_progress.watch._local_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def heartbeat(self, video, position):
+        return self.client.post(
+            '/uz/api/course_progres/watch_heartbeat/', {'video': video.pk, 'position': position}, format='json'
+        )
+
+    def record(self, video, position, watched_at):
+        self.buffer.record(str(self.user.pk), video.pk, self.course.pk, position, watched_at)
+
+    def stored_position(self, video):
+        return WatchPosition.objects.values_list('position', flat=True).get(user=self.user, video=video)
+
+    def test_locked_until_previous_video_passed(self):
+        response = self.heartbeat(self.second, 10)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {"error": "Previous video test not completed.!"})
+        self.assertEqual(self.buffer.pending(str(self.user.pk)), {})
+
+        self.assertEqual(self.heartbeat(self.first, 10).status_code, 204)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submit(self.first)
+        self.assertEqual(self.heartbeat(self.second, 10).status_code, 204)
+        self.assertEqual(set(self.buffer.pending(str(self.user.pk))), {self.first.pk, self.second.pk})
+
+    def test_missing_video_is_404(self):
+        self.assertEqual(self.heartbeat(self.second, 10).status_code, 403)
+        response = self.client.post(
+            '/uz/api/course_progres/watch_heartbeat/', {'video': 999999, 'position': 1}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_position_is_clamped_to_duration(self):
+        self.heartbeat(self.first, 10_000)
+        course_id, position, _ = self.buffer.pending(str(self.user.pk))[self.first.pk]
+        self.assertEqual((course_id, position), (self.course.pk, self.first.duration_seconds))
+
+    def test_flush_keeps_latest_position(self):
+        self.record(self.first, 100, 2_000)
+        flush_watch_positions(self.buffer)
+        self.assertEqual(self.stored_position(self.first), 100)
+
+        # kechikkan eski heartbeat yangi pozitsiyani bosib ketmaydi
+        self.record(self.first, 50, 1_000)
+        self.assertEqual(flush_watch_positions(self.buffer), 0)
+        self.assertEqual(self.stored_position(self.first), 100)
+
+        # orqaga o'rash: vaqt bo'yicha eng oxirgisi saqlanadi
+        self.record(self.first, 30, 3_000)
+        self.record(self.first, 40, 4_000)
+        self.assertEqual(flush_watch_positions(self.buffer), 1)
+        self.assertEqual(self.stored_position(self.first), 40)
+
+    def test_flush_updates_course_progress(self):
+        CourseProgress.objects.create(user=self.user, course=self.course)
+        self.record(self.second, 20, 2_000)
+        self.record(self.first, 10, 1_000)
+        self.assertEqual(flush_watch_positions(self.buffer), 2)
+        self.assertEqual(CourseProgress.objects.get(user=self.user, course=self.course).video_progress_id, self.second.pk)
 
-# Create your tests here.
+        self.record(self.first, 15, 3_000)
+        flush_watch_positions(self.buffer)
+        self.assertEqual(CourseProgress.objects.get(user=self.user, course=self.course).video_progress_id, self.first.pk)
@@ -4,6 +4,8 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from course_progress.serializers import CourseProgressSerializer
 from course_progress.models import CourseProgress
+from course_progress.completion import quiz_progress
+from courses.models import Course
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -67,3 +69,26 @@ class GetAllCourseProgress(APIView):
         course_progres = CourseProgress.objects.all()
         serializer = CourseProgressSerializer(course_progres, many=True)
         return Response(serializer.data, status=200)
+
+
+class CourseQuizProgressAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Kurs bo'yicha test progressi",
+        operation_description="Har bir section uchun yakunlangan videolar soni va foizi, kurs bo'yicha yakunlangan "
+                              "sectionlar. Qiymatlar hisoblagich jadvallaridan to'g'ridan-to'g'ri o'qiladi.",
+        manual_parameters=[
+            openapi.Parameter('id', openapi.IN_PATH, description="Kurs ID raqami", type=openapi.TYPE_INTEGER,
+                              required=True)
+        ],
+        responses={
+            200: "course, completed_sections, total_sections, percent, is_complete, sections[]",
+            401: "Avtorizatsiya xatosi",
+            404: "Topilmadi"
+        }
+    )
+    def get(self, request, pk):
+        if not Course.objects.filter(pk=pk).exists():
+            return Response({"error": "Course not found.!"}, status=404)
+        return Response(quiz_progress(request.user.pk, pk), status=200)
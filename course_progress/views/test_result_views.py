@@ -2,14 +2,14 @@ from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from course_progress.serializers import QuestionResultSerializer
+from course_progress.serializers import QuestionResultSerializer, QuizSubmissionSerializer
 from course_progress.models import QuestionResult
+from course_progress.completion import apply_question_results, completion_state, mark_questions_completed
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.db import transaction
-from courses.models import Section, SectionCompletion, Question, Video
-from course_progress.models import CourseProgress
-from django.utils import timezone
+from courses.models import Answer, Question
+from courses.progress import mark_video_progress
 from rest_framework import status
 
 
@@ -56,29 +56,8 @@ class AddQuestionResultAPIView(APIView):
                     },
                     status=200
                 )
-            Question.objects.filter(id=question.id).update(is_completed=True)
-            section = question.video.section
-            if _is_section_completed(request.user, section):
-                SectionCompletion.objects.get_or_create(
-                    user=request.user,
-                    section=section
-                )
-            
-            course = section.course
-            total_section = Section.objects.filter(course=course).count()
-            completed_section = SectionCompletion.objects.filter(
-                user=request.user,
-                section__course=course
-            ).count()
-            
-            if completed_section == total_section:
-                course_progress, _ = CourseProgress.objects.get_or_create(
-                    user=request.user,
-                    course=course
-                )
-                course_progress.is_complete = True
-                course_progress.completed = timezone.now()
-                course_progress.save()
+            # video/section/kurs hisoblagichlari QuestionResult signalida yangilanadi
+            mark_questions_completed([question.id], question.video.section.course_id)
             response_serializer = QuestionResultSerializer(question_result)
             return Response(response_serializer.data, status=201)
 
@@ -110,22 +89,87 @@ class GetQuestionResultAPIView(APIView):
         return Response(serializer.data, status=200)
 
 
-def _is_section_completed(user, section):
-    videos = Video.objects.filter(section=section)
-    for video in videos:
-        if not _is_video_completed(user, video):
-            return False
-    return True
-
-
-def _is_video_completed(user, video):
-    total_questions = Question.objects.filter(video=video).count()
-    if total_questions == 0:
-        return True
-    passed_questions = QuestionResult.objects.filter(
-        user=user,
-        is_passed=True,
-        question__video=video
-    ).count()
-    return passed_questions >= total_questions
+class SubmitQuizAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Video testini bitta so'rovda yuborish",
+        operation_description="Videoning barcha savollariga javoblar bitta so'rovda yuboriladi. Natijalar bulk "
+                              "upsert qilinadi, video/section/kurs hisoblagichlari bitta farq (delta) bilan yangilanadi.",
+        request_body=QuizSubmissionSerializer,
+        responses={
+            200: "Natijalar: passed/total, har bir savol bo'yicha is_passed, video/section/kurs holati",
+            400: "Yaroqsiz ma’lumot yuborildi",
+            401: "Avtorizatsiya xatosi"
+        }
+    )
+    def post(self, request):
+        serializer = QuizSubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        video = serializer.validated_data['video']
+        submitted = {item['question']: item.get('selected_answer') for item in serializer.validated_data['answers']}
+
+        question_ids = set(Question.objects.filter(video=video).values_list('id', flat=True))
+        answers = {
+            answer_id: (question_id, is_correct)
+            for answer_id, question_id, is_correct in Answer.objects.filter(
+                question__video=video
+            ).values_list('id', 'question_id', 'is_correct')
+        }
+        errors = {}
+        for question_id, answer_id in submitted.items():
+            if question_id not in question_ids:
+                errors[str(question_id)] = "Savol bu videoga tegishli emas."
+            elif answer_id is not None and answers.get(answer_id, (None,))[0] != question_id:
+                errors[str(question_id)] = "Javob savolga tegishli emas."
+        if errors:
+            return Response({"detail": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [
+            QuestionResult(
+                user=request.user,
+                question_id=question_id,
+                selected_answer_id=answer_id,
+                is_passed=answer_id is not None and answers[answer_id][1],
+            )
+            for question_id, answer_id in submitted.items()
+        ]
+        passed_ids = [result.question_id for result in results if result.is_passed]
+        course_id = video.section.course_id
+
+        with transaction.atomic():
+            previous = dict(
+                QuestionResult.objects.select_for_update()
+                .filter(user=request.user, question_id__in=submitted.keys())
+                .values_list('question_id', 'is_passed')
+            )
+            QuestionResult.objects.bulk_create(
+                results, update_conflicts=True, unique_fields=['user', 'question'],
+                update_fields=['selected_answer', 'is_passed', 'updated_at'],
+            )
+            # bulk_create signal yubormaydi: bitmap va hisoblagichlar bir marta yangilanadi
+            mark_video_progress(request.user.pk, video.pk, course_id)
+            apply_question_results(request.user.pk, video, sum(
+                result.is_passed - previous.get(result.question_id, False) for result in results
+            ))
+            if passed_ids:
+                mark_questions_completed(passed_ids, course_id)
+            video_completed, section_completed, course_completed = completion_state(request.user.pk, video)
+
+        return Response(
+            {
+                "video": video.id,
+                "total": len(question_ids),
+                "passed": len(passed_ids),
+                "results": [
+                    {"question": result.question_id, "selected_answer": result.selected_answer_id,
+                     "is_passed": result.is_passed}
+                    for result in results
+                ],
+                "video_completed": video_completed,
+                "section_completed": section_completed,
+                "course_completed": course_completed,
+            },
+            status=200
+        )
 
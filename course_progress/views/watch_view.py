@@ -0,0 +1,77 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from course_progress.serializers import WatchHeartbeatSerializer
+from course_progress.watch import VideoLocked, record_heartbeat, resume_positions
+
+
+class WatchHeartbeatAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Player heartbeat",
+        operation_description="Player har bir necha soniyada joriy pozitsiyani yuboradi. Pozitsiya Redis'ga "
+                              "yoziladi va fon jarayoni (flush_watch_positions) tomonidan bazaga to'plab yoziladi.",
+        request_body=WatchHeartbeatSerializer,
+        responses={
+            204: "Qabul qilindi",
+            400: "Yaroqsiz ma’lumot yuborildi",
+            403: "Oldingi video testi yakunlanmagan",
+            404: "Video topilmadi"
+        },
+        tags=["Video"]
+    )
+    def post(self, request):
+        serializer = WatchHeartbeatSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            recorded = record_heartbeat(
+                request.user, serializer.validated_data['video'], serializer.validated_data['position']
+            )
+        except VideoLocked:
+            return Response({"error": "Previous video test not completed.!"}, status=403)
+        if recorded is None:
+            return Response({"error": "Video not found.!"}, status=404)
+        return Response(status=204)
+
+
+class ResumeCourseAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Kursni davom ettirish",
+        operation_description="Kurs bo'yicha oxirgi ko'rilgan video va har bir video uchun saqlangan pozitsiya.",
+        manual_parameters=[
+            openapi.Parameter('id', openapi.IN_PATH, description="Kurs ID raqami", type=openapi.TYPE_INTEGER,
+                              required=True)
+        ],
+        responses={
+            200: openapi.Response(
+                description="Pozitsiyalar",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "video": openapi.Schema(type=openapi.TYPE_INTEGER, description="Oxirgi ko'rilgan video"),
+                        "position": openapi.Schema(type=openapi.TYPE_INTEGER),
+                        "positions": openapi.Schema(type=openapi.TYPE_OBJECT, description="{video_id: soniya}"),
+                    }
+                )
+            ),
+            401: "Avtorizatsiya xatosi"
+        },
+        tags=["Video"]
+    )
+    def get(self, request, pk):
+        positions = resume_positions(request.user.id, pk)
+        last_video = max(positions, key=lambda video_id: positions[video_id][1], default=None)
+        return Response(
+            {
+                "video": last_video,
+                "position": positions[last_video][0] if last_video else 0,
+                "positions": {str(video_id): position for video_id, (position, _) in positions.items()},
+            },
+            status=200
+        )
@@ -0,0 +1,230 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from course_progress.models import CourseProgress, WatchPosition
+from courses.analytics import COMPLETION_RATIO, record_completion
+from courses.cache import redis_connection
+from courses.models import Video
+from courses.progress import course_video_order, is_video_passed
+
+DIRTY_KEY = 'watch:dirty'
+POSITIONS_TTL = 60 * 60 * 24
+VIDEO_META_TIMEOUT = 60 * 60
+FLUSH_BATCH = 1000
+
+
+class VideoLocked(Exception):
+    pass
+
+
+def _positions_key(user_id):
+    return f"watch:positions:{user_id}"
+
+
+def _encode(course_id, position, watched_at):
+    return f"{course_id}:{position}:{watched_at}"
+
+
+def _decode(raw):
+    course_id, position, watched_at = (raw.decode() if isinstance(raw, bytes) else raw).split(':')
+    return int(course_id), int(position), int(watched_at)
+
+
+class RedisWatchBuffer:
+    """
+    Har bir foydalanuvchi uchun watch:positions:<user> hashi (video -> kurs:pozitsiya:vaqt)
+    va bazaga yozilmagan "user:video" juftliklari to'plami (watch:dirty). Heartbeat bitta
+    pipeline, bazaga hech narsa yozilmaydi.
+    """
+    shared = True
+
+    def __init__(self, connection):
+        self.redis = connection
+
+    def record(self, user_id, video_id, course_id, position, watched_at):
+        key = _positions_key(user_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(key, video_id, _encode(course_id, position, watched_at))
+        pipe.expire(key, POSITIONS_TTL)
+        pipe.sadd(DIRTY_KEY, f"{user_id}:{video_id}")
+        pipe.execute()
+
+    def pending(self, user_id):
+        return {int(video_id): _decode(raw) for video_id, raw in self.redis.hgetall(_positions_key(user_id)).items()}
+
+    def drain(self, limit):
+        members = self.redis.spop(DIRTY_KEY, limit) or []
+        pairs = [member.decode().rsplit(':', 1) for member in members]
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id, video_id in pairs:
+            pipe.hget(_positions_key(user_id), video_id)
+        entries = [
+            (user_id, int(video_id), *_decode(raw))
+            for (user_id, video_id), raw in zip(pairs, pipe.execute())
+            if raw is not None
+        ]
+        return members, entries
+
+    def restore(self, members, entries):
+        # pozitsiyalar hashda qoladi, faqat qayta yozish navbatiga qaytariladi
+        if members:
+            self.redis.sadd(DIRTY_KEY, *members)
+
+
+class LocalWatchBuffer:
+    """Redis bo'lmaganda (dev, locmem) jarayon ichidagi bufer; heartbeat so'rovining o'zi flush qiladi."""
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._positions = {}
+        self.flushed_at = time.monotonic()
+
+    def record(self, user_id, video_id, course_id, position, watched_at):
+        with self._lock:
+            self._positions.setdefault(user_id, {})[video_id] = (course_id, position, watched_at)
+
+    def pending(self, user_id):
+        with self._lock:
+            return dict(self._positions.get(user_id, {}))
+
+    def drain(self, limit):
+        with self._lock:
+            user_ids = list(self._positions)[:limit]
+            drained = {user_id: self._positions.pop(user_id) for user_id in user_ids}
+            self.flushed_at = time.monotonic()
+        entries = [
+            (user_id, video_id, *values)
+            for user_id, positions in drained.items()
+            for video_id, values in positions.items()
+        ]
+        return user_ids, entries
+
+    def restore(self, members, entries):
+        with self._lock:
+            for user_id, video_id, course_id, position, watched_at in entries:
+                self._positions.setdefault(user_id, {}).setdefault(video_id, (course_id, position, watched_at))
+
+
+_local_buffer = LocalWatchBuffer()
+
+
+def get_watch_buffer():
+    connection = redis_connection()
+    if connection is None:
+        return _local_buffer
+    return RedisWatchBuffer(connection)
+
+
+def video_meta(video_id):
+    """(course_id, duration_seconds) — heartbeat yo'lida bazaga murojaat qilmaslik uchun keshlanadi."""
+    key = f"watch:video:{video_id}"
+    meta = cache.get(key)
+    if meta is None:
+        meta = Video.objects.filter(pk=video_id).values_list('section__course_id', 'duration_seconds').first()
+        if meta is None:
+            return None
+        cache.set(key, meta, VIDEO_META_TIMEOUT)
+    return meta
+
+
+def _previous_video_passed(user, video_id, course_id):
+    """get_video_url dagi shart: oldingi video testlari yakunlangan bo'lishi kerak (keshdagi tartib va bitmap)."""
+    order = course_video_order(course_id)
+    position = order['positions'].get(video_id)
+    if not position:
+        return True
+    return is_video_passed(user, order['ids'][position - 1], course_id)
+
+
+def record_heartbeat(user, video_id, position):
+    meta = video_meta(video_id)
+    if meta is None:
+        return None
+    course_id, duration = meta
+    if not _previous_video_passed(user, video_id, course_id):
+        raise VideoLocked
+    if duration:
+        position = min(position, duration)
+        if position >= duration * COMPLETION_RATIO:
+            record_completion(video_id, user.pk)
+    buffer = get_watch_buffer()
+    buffer.record(str(user.pk), video_id, course_id, position, int(time.time() * 1000))
+    if not buffer.shared and time.monotonic() - buffer.flushed_at >= settings.WATCH_FLUSH_INTERVAL:
+        flush_watch_positions(buffer)
+    return course_id, position
+
+
+def _upsert(entries):
+    video_ids = set(Video.objects.filter(pk__in={entry[1] for entry in entries}).values_list('id', flat=True))
+    # qayta navbatga qo'yilgan yoki boshqa workerdan kechikkan eski heartbeat yangi pozitsiya ustidan yozilmaydi
+    stored = {
+        (str(user_id), video_id): watched_at
+        for user_id, video_id, watched_at in WatchPosition.objects.filter(
+            user_id__in={entry[0] for entry in entries}, video_id__in=video_ids
+        ).values_list('user_id', 'video_id', 'watched_at')
+    }
+    rows = [
+        WatchPosition(
+            user_id=user_id, video_id=video_id, course_id=course_id, position=position,
+            watched_at=datetime.fromtimestamp(watched_at / 1000, tz=dt_timezone.utc),
+        )
+        for user_id, video_id, course_id, position, watched_at in entries
+        if video_id in video_ids
+    ]
+    rows = [row for row in rows if row.watched_at >= stored.get((str(row.user_id), row.video_id), row.watched_at)]
+    # har bir (user, kurs) uchun oxirgi ko'rilgan video CourseProgress.video_progress ga yoziladi
+    latest = {}
+    for row in sorted(rows, key=lambda row: row.watched_at):
+        latest[(str(row.user_id), row.course_id)] = row.video_id
+    with transaction.atomic():
+        WatchPosition.objects.bulk_create(
+            rows, batch_size=500, update_conflicts=True,
+            unique_fields=['user', 'video'], update_fields=['course', 'position', 'watched_at'],
+        )
+        progresses = list(CourseProgress.objects.filter(
+            user_id__in={user_id for user_id, _ in latest},
+            course_id__in={course_id for _, course_id in latest},
+        ))
+        changed = []
+        for progress in progresses:
+            video_id = latest.get((str(progress.user_id), progress.course_id))
+            if video_id is not None and progress.video_progress_id != video_id:
+                progress.video_progress_id = video_id
+                changed.append(progress)
+        CourseProgress.objects.bulk_update(changed, ['video_progress'], batch_size=500)
+    return len(rows)
+
+
+def flush_watch_positions(buffer=None, batch=FLUSH_BATCH):
+    """Buferdagi pozitsiyalarni `batch` talik bo'laklarda bitta upsert bilan bazaga yozadi."""
+    buffer = buffer or get_watch_buffer()
+    total = 0
+    while True:
+        members, entries = buffer.drain(batch)
+        if not members:
+            return total
+        try:
+            total += _upsert(entries) if entries else 0
+        except Exception:
+            buffer.restore(members, entries)
+            raise
+
+
+def resume_positions(user_id, course_id):
+    """Kurs bo'yicha {video_id: (pozitsiya, vaqt)} — bazadagi va hali yozilmagan heartbeatlar birlashtiriladi."""
+    positions = {
+        video_id: (position, int(watched_at.timestamp() * 1000))
+        for video_id, position, watched_at in WatchPosition.objects.filter(
+            user_id=user_id, course_id=course_id
+        ).values_list('video_id', 'position', 'watched_at')
+    }
+    for video_id, (pending_course_id, position, watched_at) in get_watch_buffer().pending(str(user_id)).items():
+        if pending_course_id == course_id and watched_at >= positions.get(video_id, (0, 0))[1]:
+            positions[video_id] = (position, watched_at)
+    return positions
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, CourseCategory, Question, Section, Video,Answer
+from .models import Course, CourseCategory, Question, Section, Video,Answer, MediaJob, VideoDailyStats
 
 
-admin.site.register([Course, CourseCategory, Question, Section, Video,Answer])
+admin.site.register([Course, CourseCategory, Question, Section, Video,Answer, MediaJob, VideoDailyStats])
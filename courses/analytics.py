@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.utils import timezone
+
+from courses.cache import redis_connection
+from courses.models import Video, VideoDailyStats
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = 'analytics:dirty'
+COUNTERS_TTL = 60 * 60 * 24 * 3
+ROLLUP_BATCH = 1000
+COUNTER_NAMES = ('plays', 'viewers', 'completions')
+COMPLETION_RATIO = 0.9
+
+
+def _counter_key(day, video_id, name):
+    return f"analytics:{day.isoformat()}:{video_id}:{name}"
+
+
+class HyperLogLog:
+    """
+    Redis PFADD/PFCOUNT ning locmem fallback uchun kichik muqobili:
+    2**precision ta registr, standart xato ~1.04/sqrt(2**precision).
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        digest = int.from_bytes(hashlib.sha1(str(value).encode()).digest()[:8], 'big')
+        index = digest >> (64 - self.precision)
+        rest = digest & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        size = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+
+class RedisCounters:
+    """Kunlik hisoblagichlar: INCR (ko'rishlar), PFADD (unikal tomoshabin va yakunlaganlar)."""
+    shared = True
+
+    def __init__(self, connection):
+        self.redis = connection
+
+    def record(self, day, video_id, viewer=None, completed_by=None):
+        pipe = self.redis.pipeline(transaction=False)
+        if viewer is not None:
+            pipe.incr(_counter_key(day, video_id, 'plays'))
+            pipe.pfadd(_counter_key(day, video_id, 'viewers'), viewer)
+        else:
+            pipe.pfadd(_counter_key(day, video_id, 'completions'), completed_by)
+        # kunning barcha kalitlari birga eskiradi: qisman o'chgan kun bo'lmaydi
+        for name in COUNTER_NAMES:
+            pipe.expire(_counter_key(day, video_id, name), COUNTERS_TTL)
+        pipe.sadd(DIRTY_KEY, f"{day.isoformat()}:{video_id}")
+        pipe.execute()
+
+    def drain(self, limit):
+        members = self.redis.spop(DIRTY_KEY, limit) or []
+        pairs = [(date.fromisoformat(day), int(video_id)) for day, video_id in
+                 (member.decode().split(':') for member in members)]
+        pipe = self.redis.pipeline(transaction=False)
+        for day, video_id in pairs:
+            pipe.exists(*(_counter_key(day, video_id, name) for name in COUNTER_NAMES))
+            pipe.get(_counter_key(day, video_id, 'plays'))
+            pipe.pfcount(_counter_key(day, video_id, 'viewers'))
+            pipe.pfcount(_counter_key(day, video_id, 'completions'))
+        values = pipe.execute()
+        rows = [
+            (day, video_id, int(values[index * 4 + 1] or 0), values[index * 4 + 2], values[index * 4 + 3])
+            for index, (day, video_id) in enumerate(pairs)
+            # kalitlar TTL bilan o'chgan: bazadagi qiymat nollar bilan ustidan yozilmaydi
+            if values[index * 4]
+        ]
+        return members, rows
+
+    def restore(self, members):
+        if members:
+            self.redis.sadd(DIRTY_KEY, *members)
+
+
+class LocalCounters:
+    """
+    Redis bo'lmaganda (dev) jarayon ichidagi hisoblagichlar; rollup so'rovning o'zida bajariladi.
+    Hisob har bir jarayonda alohida, shuning uchun bir nechta worker bilan faqat Redis ishlatiladi.
+    """
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plays = {}
+        self._viewers = {}
+        self._completions = {}
+        self._dirty = set()
+        self.rolled_up_at = time.monotonic()
+
+    def record(self, day, video_id, viewer=None, completed_by=None):
+        key = (day, video_id)
+        with self._lock:
+            if viewer is not None:
+                self._plays[key] = self._plays.get(key, 0) + 1
+                self._viewers.setdefault(key, HyperLogLog()).add(viewer)
+            else:
+                self._completions.setdefault(key, HyperLogLog()).add(completed_by)
+            self._dirty.add(key)
+
+    def drain(self, limit):
+        today = timezone.localdate()
+        with self._lock:
+            members = [self._dirty.pop() for _ in range(min(limit, len(self._dirty)))]
+            rows = []
+            for day, video_id in members:
+                key = (day, video_id)
+                viewers, completions = self._viewers.get(key), self._completions.get(key)
+                rows.append((day, video_id, self._plays.get(key, 0),
+                             viewers.count() if viewers else 0, completions.count() if completions else 0))
+                if day < today:
+                    # o'tgan kunlar yakuniy qiymat bilan yozildi, xotiradan chiqariladi
+                    for store in (self._plays, self._viewers, self._completions):
+                        store.pop(key, None)
+            self.rolled_up_at = time.monotonic()
+        return members, rows
+
+    def restore(self, members):
+        with self._lock:
+            self._dirty.update(members)
+
+
+_local_counters = LocalCounters()
+
+
+def get_counters():
+    connection = redis_connection()
+    if connection is None:
+        return _local_counters
+    return RedisCounters(connection)
+
+
+def _record(video_id, **kwargs):
+    # so'rov yo'lida faqat Redis (yoki xotira) hisoblagichlari; xato javobni buzmasligi kerak
+    try:
+        counters = get_counters()
+        counters.record(timezone.localdate(), video_id, **kwargs)
+        if not counters.shared and time.monotonic() - counters.rolled_up_at >= settings.ANALYTICS_ROLLUP_INTERVAL:
+            rollup_video_stats(counters)
+    except Exception:
+        logger.exception("Video %s analytics could not be recorded", video_id)
+
+
+def record_play(video_id, viewer):
+    """Video URL berilganda: ko'rishlar soni va unikal tomoshabinlar (HLL)."""
+    _record(video_id, viewer=str(viewer))
+
+
+def record_completion(video_id, user_id):
+    _record(video_id, completed_by=str(user_id))
+
+
+def rollup_video_stats(counters=None, batch=ROLLUP_BATCH):
+    """
+    O'zgargan (kun, video) hisoblagichlarini VideoDailyStats ga upsert qiladi.
+    Redis kun bo'yi to'liq qiymatni saqlaydi, shuning uchun qayta yozish idempotent.
+    """
+    counters = counters or get_counters()
+    total = 0
+    while True:
+        members, rows = counters.drain(batch)
+        if not members:
+            return total
+        try:
+            video_ids = set(Video.objects.filter(pk__in={row[1] for row in rows}).values_list('id', flat=True))
+            stats = [
+                VideoDailyStats(video_id=video_id, date=day, plays=plays,
+                                unique_viewers=viewers, completions=completions)
+                for day, video_id, plays, viewers, completions in rows
+                if video_id in video_ids
+            ]
+            VideoDailyStats.objects.bulk_create(
+                stats, batch_size=500, update_conflicts=True,
+                unique_fields=['video', 'date'], update_fields=['plays', 'unique_viewers', 'completions'],
+            )
+        except Exception:
+            counters.restore(members)
+            raise
+        total += len(stats)
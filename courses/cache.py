@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from accounts.models import Enrollment
+
+CATALOG_CACHE_TIMEOUT = 60 * 5
+
+
+def _version_key(scope):
+    return f"catalog:version:{scope}"
+
+
+def get_versions(scopes):
+    """
+    Har bir scope uchun joriy versiyani qaytaradi. Versiya keshdan o'chib
+    ketgan bo'lsa, eski javoblar bilan to'qnashmasligi uchun vaqtga
+    asoslangan yangi qiymat beriladi.
+    """
+    keys = {scope: _version_key(scope) for scope in scopes}
+    stored = cache.get_many(keys.values())
+    versions = []
+    for scope, key in keys.items():
+        version = stored.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        versions.append(f"{scope}={version}")
+    return versions
+
+
+def bump_versions(*scopes):
+    """Scope'larga tegishli barcha keshlangan javoblarni tranzaksiya tugagach eskirtiradi."""
+    def bump():
+        for scope in scopes:
+            key = _version_key(scope)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+    transaction.on_commit(bump)
+
+
+def redis_connection():
+    """Kesh Redis'da bo'lsa xom Redis ulanishi, locmem fallback'da None."""
+    if 'django_redis' not in settings.CACHES['default']['BACKEND']:
+        return None
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def course_scope(course_id):
+    return f"course:{course_id}"
+
+
+def response_audience(request, course_id=None):
+    """
+    Javob qaysi auditoriya uchun keshlanishini aniqlaydi.
+    Kursga yozilgan foydalanuvchilar uchun videolar holati shaxsiy bo'lgani
+    sababli None qaytariladi va javob keshlanmaydi.
+    """
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return 'public'
+    enrollments = Enrollment.objects.filter(user=user)
+    if course_id is not None:
+        enrollments = enrollments.filter(course_id=course_id)
+    if enrollments.exists():
+        return None
+    return 'public'
+
+
+def response_cache_key(endpoint, request, scopes, audience='public'):
+    lang = getattr(request, 'LANGUAGE_CODE', 'uz')
+    query = '&'.join(
+        f"{name}={value}"
+        for name, values in sorted(request.GET.lists())
+        for value in values
+    )
+    versions = ','.join(get_versions(scopes))
+    return f"catalog:response:{endpoint}:{lang}:{audience}:{versions}:{query}"
+
+
+def cached_response_data(endpoint, request, scopes, build, audience='public'):
+    """
+    `build()` natijasini (serializer.data) endpoint, til, auditoriya va
+    scope versiyalari bo'yicha keshlaydi.
+    """
+    if audience is None:
+        return build()
+    key = response_cache_key(endpoint, request, scopes, audience)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+    return data
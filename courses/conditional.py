@@ -0,0 +1,155 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+from course_progress.models import QuestionResult
+from courses.cache import CATALOG_CACHE_TIMEOUT, course_scope, response_audience, response_cache_key
+from courses.models import Course, CourseCategory, CourseStats, Question, Section, Video
+
+
+def _table_state(queryset):
+    state = queryset.order_by().aggregate(last=Max('updated_at'), count=Count('pk'))
+    return state['last'], state['count']
+
+
+def _build_validator(states, request, extra=''):
+    # Faqat ETag: Last-Modified o'chirish va .update() da oldinga siljimaydi, If-Modified-Since eskirgan 304 berardi
+    raw = '|'.join(
+        [getattr(request, 'LANGUAGE_CODE', 'uz'), request.GET.urlencode(), extra]
+        + [f"{count}:{last.timestamp() if last else 0}" for last, count in states]
+    )
+    etag = hashlib.sha1(raw.encode()).hexdigest()
+    return {'etag': f'"{etag}"'}
+
+
+def _user_progress_state(request, course_id=None):
+    results = QuestionResult.objects.filter(user=request.user)
+    if course_id is not None:
+        results = results.filter(question__video__section__course_id=course_id)
+    last, count = _table_state(results)
+    return f"user:{request.user.pk}:{count}:{last.timestamp() if last else 0}"
+
+
+def _cached_validator(endpoint, request, scopes, audience, compute):
+    """
+    Validator keshlangan javob bilan bir xil versiyalangan kalitda saqlanadi,
+    shuning uchun issiq keshda 304 javobi bazaga murojaat qilmaydi.
+    """
+    if audience is None:
+        return compute()
+    key = response_cache_key(f"validator:{endpoint}", request, scopes, audience)
+    validator = cache.get(key)
+    if validator is None:
+        validator = compute()
+        cache.set(key, validator, CATALOG_CACHE_TIMEOUT)
+    return validator
+
+
+def _course_states(course_ids=None):
+    courses = Course.objects.all()
+    sections = Section.objects.all()
+    videos = Video.objects.all()
+    questions = Question.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+        sections = sections.filter(course_id__in=course_ids)
+        videos = videos.filter(section__course_id__in=course_ids)
+        questions = questions.filter(video__section__course_id__in=course_ids)
+        categories = CourseCategory.objects.filter(course__in=course_ids)
+    else:
+        categories = CourseCategory.objects.all()
+    stats = CourseStats.objects.all() if course_ids is None else CourseStats.objects.filter(course_id__in=course_ids)
+    return [
+        _table_state(courses),
+        _table_state(categories),
+        _table_state(sections),
+        _table_state(videos),
+        _table_state(questions),
+        _table_state(stats),
+    ]
+
+
+def catalog_validator(request):
+    audience = response_audience(request)
+    extra = 'public' if audience else _user_progress_state(request)
+    return _cached_validator(
+        'courses', request, ['catalog'], audience,
+        lambda: _build_validator(_course_states(), request, extra)
+    )
+
+
+def course_validator(request, pk):
+    audience = response_audience(request, course_id=pk)
+    extra = 'public' if audience else _user_progress_state(request, pk)
+
+    def compute():
+        states = _course_states([pk])
+        course_count = states[0][1]
+        if not course_count:
+            return {}
+        return _build_validator(states, request, extra)
+
+    return _cached_validator('course', request, [course_scope(pk)], audience, compute)
+
+
+def section_validator(request, pk):
+    course_id = Section.objects.filter(pk=pk).values_list('course_id', flat=True).first()
+    if course_id is None:
+        return {}
+    audience = response_audience(request, course_id=course_id)
+    extra = f"section:{pk}:" + ('public' if audience else _user_progress_state(request, course_id))
+    return _cached_validator(
+        f'section:{pk}', request, [course_scope(course_id)], audience,
+        lambda: _build_validator(_course_states([course_id]), request, extra)
+    )
+
+
+def section_videos_validator(request, pk):
+    """get_video: sectionning preview videolari; qulf holati kurs videolari tartibi va foydalanuvchi progressiga bog'liq."""
+    course_id = Section.objects.filter(pk=pk).values_list('course_id', flat=True).first()
+    if course_id is None:
+        return {}
+    audience = response_audience(request, course_id=course_id)
+    extra = f"section_videos:{pk}:" + ('public' if audience else _user_progress_state(request, course_id))
+    return _cached_validator(
+        f'section_videos:{pk}', request, [course_scope(course_id)], audience,
+        lambda: _build_validator([
+            _table_state(Video.objects.filter(section__course_id=course_id)),
+            _table_state(Question.objects.filter(video__section_id=pk)),
+        ], request, extra)
+    )
+
+
+def category_validator(request):
+    return _cached_validator(
+        'categories', request, ['categories'], 'public',
+        lambda: _build_validator([_table_state(CourseCategory.objects.all())], request)
+    )
+
+
+def conditional_get(validator_func):
+    """
+    APIView GET metodlari uchun ETag (If-None-Match) qo'llab-quvvatlashi.
+    Mijoz validatori mos kelsa, view chaqirilmasdan 304 qaytariladi.
+    """
+    def decorator(method):
+        @wraps(method)
+        def inner(self, request, *args, **kwargs):
+            validator = validator_func(request, *args, **kwargs)
+            if not validator:
+                return method(self, request, *args, **kwargs)
+
+            etag = validator['etag']
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ['Cookie'])
+            return response
+        return inner
+    return decorator
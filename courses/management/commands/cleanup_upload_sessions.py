@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from courses.models import UploadSession
+from courses.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = "Muddati tugagan, yakunlanmagan video yuklash sessiyalari va .part fayllarini o'chiradi."
+
+    def handle(self, *args, **options):
+        total = 0
+        for session in UploadSession.objects.filter(state='uploading', expires_at__lt=timezone.now()).iterator():
+            discard_upload(session)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f"{total} ta yuklash sessiyasi o'chirildi"))
@@ -0,0 +1,48 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from courses.media_jobs import claim_next, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = "MediaJob navbatini (HLS transkodlash va boshqalar) ffmpeg process pool bilan bajaradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                            help="Parallel ffmpeg jarayonlari soni")
+        parser.add_argument('--poll', type=float, default=5.0, help="Navbat bo'sh bo'lganda kutish (soniya)")
+        parser.add_argument('--stale-after', type=int, default=120,
+                            help="Shuncha daqiqadan beri running bo'lgan joblar qayta navbatga qo'yiladi")
+        parser.add_argument('--once', action='store_true', help="Navbat bo'shagach to'xtash")
+
+    def handle(self, *args, **options):
+        stale = requeue_stale(timedelta(minutes=options['stale_after']))
+        if stale:
+            self.stdout.write(f"{stale} ta to'xtab qolgan job qayta navbatga qo'yildi")
+
+        # spawn: bola jarayonlar ota jarayonning baza ulanishlarini meros qilib olmaydi
+        context = multiprocessing.get_context('spawn')
+        processed = 0
+        with ProcessPoolExecutor(max_workers=max(options['workers'], 1), mp_context=context) as pool:
+            while True:
+                close_old_connections()
+                job = claim_next()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                self.stdout.write(f"job {job.pk}: {job.kind} video={job.video_id} (urinish {job.attempts})")
+                run_job(job, pool)
+                job.refresh_from_db(fields=['state', 'error'])
+                style = self.style.SUCCESS if job.state == 'done' else self.style.WARNING
+                self.stdout.write(style(f"job {job.pk}: {job.state} {job.error[:200]}".rstrip()))
+                processed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{processed} ta job bajarildi"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.stats import compute_course_stats, save_course_stats
+
+
+class Command(BaseCommand):
+    help = "CourseStats jadvalini manba jadvallardan bo'laklab qayta hisoblaydi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help="Faqat berilgan kurs(lar)ni qayta hisoblash")
+
+    def handle(self, *args, **options):
+        chunk_size = max(options['chunk_size'], 1)
+        course_ids = Course.objects.order_by('pk').values_list('pk', flat=True)
+        if options['courses']:
+            course_ids = course_ids.filter(pk__in=options['courses'])
+
+        total = 0
+        last_id = 0
+        while True:
+            chunk = list(course_ids.filter(pk__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            save_course_stats(compute_course_stats(chunk))
+            total += len(chunk)
+            last_id = chunk[-1]
+            self.stdout.write(f"{total} ta kurs qayta hisoblandi")
+
+        self.stdout.write(self.style.SUCCESS(f"CourseStats yangilandi: {total} ta kurs"))
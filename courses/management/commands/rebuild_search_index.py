@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.models import Course, SearchDocument
+from courses.search import index_course_tree
+
+
+class Command(BaseCommand):
+    help = "Qidiruv indeksini (SearchDocument va FTS jadvali) kurslardan qayta quradi."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+            total = 0
+            for course in Course.objects.iterator():
+                index_course_tree(course)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f"Qidiruv indeksi qayta qurildi: {total} ta kurs"))
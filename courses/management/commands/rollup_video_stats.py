@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from courses.analytics import rollup_video_stats
+
+
+class Command(BaseCommand):
+    help = "Redis'dagi video ko'rish, unikal tomoshabin va yakunlash hisoblagichlarini VideoDailyStats ga yig'adi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=settings.ANALYTICS_ROLLUP_INTERVAL,
+                            help="Rolluplar orasidagi vaqt (soniya)")
+        parser.add_argument('--once', action='store_true', help="Bir marta rollup qilib to'xtash")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            close_old_connections()
+            total = rollup_video_stats()
+            if total:
+                self.stdout.write(f"{total} ta kunlik statistika yangilandi")
+            if options['once']:
+                break
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import os
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from courses import transcode
+from courses.models import MediaJob, Video, format_duration
+from courses.stats import refresh_course_stats
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30
+HLS_ROOT = 'hls'
+THUMBNAILS_ROOT = 'thumbnails'
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(video_id, kind):
+    """Video uchun navbatda turgan shu turdagi job bo'lmasa, yangisini qo'shadi."""
+    job = MediaJob.objects.filter(video_id=video_id, kind=kind, state='queued').first()
+    if job is not None:
+        return job
+    return MediaJob.objects.create(video_id=video_id, kind=kind)
+
+
+def claim_next(batch=10):
+    """
+    Navbatdagi jobni `running` holatiga o'tkazib qaytaradi. Shartli UPDATE
+    tufayli bir nechta worker bitta jobni ikki marta olmaydi.
+    """
+    now = timezone.now()
+    candidates = (
+        MediaJob.objects.filter(state='queued', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:batch]
+    )
+    for job_id in candidates:
+        claimed = MediaJob.objects.filter(pk=job_id, state='queued').update(
+            state='running', attempts=F('attempts') + 1, started_at=now, updated_at=now
+        )
+        if claimed:
+            return MediaJob.objects.select_related('video').get(pk=job_id)
+    return None
+
+
+def requeue_stale(older_than):
+    """Worker to'xtab qolganda `running` bo'lib qolgan joblarni qayta navbatga qo'yadi."""
+    cutoff = timezone.now() - older_than
+    return MediaJob.objects.filter(state='running', started_at__lt=cutoff).update(
+        state='queued', run_after=timezone.now(), updated_at=timezone.now()
+    )
+
+
+def _finish(job, error=None):
+    now = timezone.now()
+    if error is None:
+        job.state, job.error, job.finished_at = 'done', '', now
+    elif job.attempts >= job.max_attempts:
+        job.state, job.error, job.finished_at = 'failed', error, now
+    else:
+        job.state, job.error = 'queued', error
+        job.run_after = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+    job.save(update_fields=['state', 'error', 'finished_at', 'run_after', 'updated_at'])
+
+
+def run_job(job, pool):
+    try:
+        HANDLERS[job.kind](job, pool)
+    except Exception as exc:
+        logger.exception("Media job %s (%s) failed", job.pk, job.kind)
+        _finish(job, error=str(exc) or exc.__class__.__name__)
+    else:
+        _finish(job)
+
+
+def hls_directory(video_id):
+    return os.path.join(settings.MEDIA_ROOT, HLS_ROOT, str(video_id))
+
+
+@handler('probe')
+def run_probe_job(job, pool):
+    """ffprobe bilan haqiqiy davomiylikni aniqlaydi; kurs jami SQL Sum bilan qayta hisoblanadi."""
+    video = job.video
+    info = transcode.probe(video.video_file.path)
+    video.duration_seconds = round(info['duration'])
+    if not video.duration:
+        video.duration = format_duration(video.duration_seconds)
+    video.save(update_fields=['duration_seconds', 'duration', 'updated_at'])
+    refresh_course_stats(video.section.course_id)
+
+
+def thumbnails_directory(video_id):
+    return os.path.join(settings.MEDIA_ROOT, THUMBNAILS_ROOT, str(video_id))
+
+
+def _content_hashed(path, directory, stem):
+    """Faylni <stem>.<sha256[:12]>.<ext> nomi bilan `directory` ga ko'chiradi va nomini qaytaradi."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(chunk)
+    name = f"{stem}.{digest.hexdigest()[:12]}{os.path.splitext(path)[1]}"
+    os.replace(path, os.path.join(directory, name))
+    return name
+
+
+@handler('thumbnails')
+def run_thumbnails_job(job, pool):
+    """
+    Poster va seek-preview sprite (tile filter) + WebVTT indeksini yaratadi.
+    Nomlar kontent hashiga ega, shuning uchun nginx ularni muddatsiz keshlaydi.
+    """
+    video = job.video
+    source = video.video_file.path
+    info = transcode.probe(source)
+    layout = transcode.sprite_layout(info['duration'], info['width'], info['height'])
+
+    directory = thumbnails_directory(video.pk)
+    work_dir = os.path.join(directory, f"job-{job.pk}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    try:
+        poster = pool.submit(transcode.extract_poster, source, os.path.join(work_dir, 'poster.jpg'), info['duration'])
+        sprite = pool.submit(transcode.build_sprite, source, os.path.join(work_dir, 'sprite.jpg'), layout)
+        poster_name = _content_hashed(poster.result(), directory, 'poster')
+        sprite_name = _content_hashed(sprite.result(), directory, 'sprite')
+        vtt_path = transcode.write_sprite_vtt(
+            os.path.join(work_dir, 'sprite.vtt'), sprite_name, layout, info['duration']
+        )
+        vtt_name = _content_hashed(vtt_path, directory, 'sprite')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    relative_dir = f"{THUMBNAILS_ROOT}/{video.pk}"
+    created = {poster_name, sprite_name, vtt_name}
+    # Ishlov davomida video fayli almashtirilgan bo'lsa, eskirgan natija yozilmaydi
+    updated = Video.objects.filter(pk=video.pk, video_file=video.video_file.name).update(
+        poster=f"{relative_dir}/{poster_name}", thumbnails_vtt=f"{relative_dir}/{vtt_name}"
+    )
+    for name in os.listdir(directory):
+        stale = name not in created if updated else name in created
+        if stale and not name.startswith('job-'):
+            os.remove(os.path.join(directory, name))
+
+
+@handler('hls')
+def run_hls_job(job, pool):
+    """
+    Har bir rendition alohida ffmpeg jarayonida (pool) kodlanadi, so'ng master
+    playlist yoziladi. Natija hls/<video>/<job>/ ichida bo'ladi, shuning uchun
+    qayta kodlash tayyor playlistga tegmaydi.
+    """
+    video = job.video
+    source = video.video_file.path
+    info = transcode.probe(source)
+    renditions = transcode.select_renditions(info['height'])
+
+    relative_dir = f"{HLS_ROOT}/{video.pk}/{job.pk}"
+    output_dir = os.path.join(settings.MEDIA_ROOT, relative_dir)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    futures = [
+        pool.submit(transcode.transcode_rendition, source, output_dir, rendition, info['has_audio'])
+        for rendition in renditions
+    ]
+    for future in futures:
+        future.result()
+    transcode.write_master_playlist(output_dir, renditions, info['width'], info['height'], info['has_audio'])
+
+    # Kodlash davomida video fayli almashtirilgan bo'lsa, eskirgan natija yozilmaydi
+    updated = Video.objects.filter(pk=video.pk, video_file=video.video_file.name).update(
+        hls_playlist=f"{relative_dir}/master.m3u8"
+    )
+    if not updated:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return
+
+    for name in os.listdir(hls_directory(video.pk)):
+        if name != str(job.pk):
+            shutil.rmtree(os.path.join(hls_directory(video.pk), name), ignore_errors=True)
+
+
+def enqueue_video_processing(video_id):
+    def enqueue_all():
+        enqueue(video_id, 'probe')
+        enqueue(video_id, 'thumbnails')
+        enqueue(video_id, 'hls')
+    transaction.on_commit(enqueue_all)
+
+
+def remove_video_media(video_id):
+    def remove_all():
+        shutil.rmtree(hls_directory(video_id), ignore_errors=True)
+        shutil.rmtree(thumbnails_directory(video_id), ignore_errors=True)
+    transaction.on_commit(remove_all)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_banner_desktop_course_banner_mobile_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='courses.course')),
+                ('enrolled_count', models.IntegerField(default=0)),
+                ('progress_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('rating_sum', models.DecimalField(decimal_places=1, default=0, max_digits=12)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('rating_avg', models.FloatField(default=0)),
+                ('lesson_count', models.IntegerField(default=0)),
+                ('total_duration', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Course stats',
+            },
+        ),
+    ]
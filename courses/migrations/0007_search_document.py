@@ -0,0 +1,134 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE courses_searchdocument_fts USING fts5(
+        title_uz, title_en, title_ru, body_uz, body_en, body_ru,
+        content='courses_searchdocument', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER courses_searchdocument_ai AFTER INSERT ON courses_searchdocument BEGIN
+        INSERT INTO courses_searchdocument_fts(rowid, title_uz, title_en, title_ru, body_uz, body_en, body_ru)
+        VALUES (new.id, new.title_uz, new.title_en, new.title_ru, new.body_uz, new.body_en, new.body_ru);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_searchdocument_ad AFTER DELETE ON courses_searchdocument BEGIN
+        INSERT INTO courses_searchdocument_fts(courses_searchdocument_fts, rowid, title_uz, title_en, title_ru, body_uz, body_en, body_ru)
+        VALUES ('delete', old.id, old.title_uz, old.title_en, old.title_ru, old.body_uz, old.body_en, old.body_ru);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_searchdocument_au AFTER UPDATE ON courses_searchdocument BEGIN
+        INSERT INTO courses_searchdocument_fts(courses_searchdocument_fts, rowid, title_uz, title_en, title_ru, body_uz, body_en, body_ru)
+        VALUES ('delete', old.id, old.title_uz, old.title_en, old.title_ru, old.body_uz, old.body_en, old.body_ru);
+        INSERT INTO courses_searchdocument_fts(rowid, title_uz, title_en, title_ru, body_uz, body_en, body_ru)
+        VALUES (new.id, new.title_uz, new.title_en, new.title_ru, new.body_uz, new.body_en, new.body_ru);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS courses_searchdocument_au",
+    "DROP TRIGGER IF EXISTS courses_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS courses_searchdocument_ai",
+    "DROP TABLE IF EXISTS courses_searchdocument_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE courses_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title_uz, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title_en, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(title_ru, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body_uz, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(body_en, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(body_ru, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX courses_searchdocument_vector_idx ON courses_searchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS courses_searchdocument_vector_idx",
+    "ALTER TABLE courses_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def populate_search_documents(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Section = apps.get_model('courses', 'Section')
+    Video = apps.get_model('courses', 'Video')
+    SearchDocument = apps.get_model('courses', 'SearchDocument')
+
+    documents = []
+    for course in Course.objects.all():
+        documents.append(SearchDocument(
+            kind='course', object_id=course.pk, course_id=course.pk,
+            title_uz=course.name_uz, title_en=course.name_en, title_ru=course.name_ru,
+            body_uz=course.description_uz, body_en=course.description_en, body_ru=course.description_ru,
+        ))
+    for section in Section.objects.all():
+        documents.append(SearchDocument(
+            kind='section', object_id=section.pk, course_id=section.course_id,
+            title_uz=section.title_uz, title_en=section.title_en, title_ru=section.title_ru,
+        ))
+    for video in Video.objects.select_related('section'):
+        documents.append(SearchDocument(
+            kind='video', object_id=video.pk, course_id=video.section.course_id,
+            title_uz=video.title_uz, title_en=video.title_en, title_ru=video.title_ru,
+            body_uz=video.description_uz or '', body_en=video.description_en or '',
+            body_ru=video.description_ru or '',
+        ))
+    # bulk_create triggerlarni ishga tushiradi, FTS jadvali ham to'ldiriladi
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_course_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Course'), ('section', 'Section'), ('video', 'Video')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title_uz', models.CharField(blank=True, default='', max_length=255)),
+                ('title_en', models.CharField(blank=True, default='', max_length=255)),
+                ('title_ru', models.CharField(blank=True, default='', max_length=255)),
+                ('body_uz', models.TextField(blank=True, default='')),
+                ('body_en', models.TextField(blank=True, default='')),
+                ('body_ru', models.TextField(blank=True, default='')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='courses.course')),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:18
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+def populate_effective_price(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    courses = list(Course.objects.only('pk', 'price', 'discount'))
+    for course in courses:
+        price = Decimal(str(course.price or 0))
+        discount = (course.discount or '').strip().replace(',', '.').replace(' ', '')
+        value = price
+        if discount:
+            try:
+                if discount.endswith('%'):
+                    value = price - price * Decimal(discount[:-1]) / 100
+                else:
+                    value = price - Decimal(discount)
+            except InvalidOperation:
+                value = price
+        course.effective_price = max(value, Decimal('0')).quantize(Decimal('0.01'))
+    Course.objects.bulk_update(courses, ['effective_price'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_customuser_date_joined_customuser_location'),
+        ('courses', '0007_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(populate_effective_price, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at', '-id'], name='course_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='course_category_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='course_status_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['effective_price', 'id'], name='course_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['category', 'effective_price', 'id'], name='course_category_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['instructor', '-created_at', '-id'], name='course_instructor_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursestats',
+            index=models.Index(fields=['-rating_avg', '-course'], name='coursestats_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursestats',
+            index=models.Index(fields=['-enrolled_count', '-course'], name='coursestats_popular_idx'),
+        ),
+    ]
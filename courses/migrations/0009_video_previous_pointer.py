@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_videos(apps, schema_editor):
+    Video = apps.get_model('courses', 'Video')
+    videos = list(
+        Video.objects.order_by('section__course_id', 'created_at', 'id').values_list('id', 'section__course_id')
+    )
+    updates = []
+    previous_id, previous_course_id = None, None
+    for video_id, course_id in videos:
+        if course_id == previous_course_id and previous_id is not None:
+            updates.append(Video(id=video_id, previous_video_id=previous_id))
+        previous_id, previous_course_id = video_id, course_id
+    Video.objects.bulk_update(updates, ['previous_video'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='previous_video',
+            field=models.OneToOneField(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='next_video', to='courses.video'),
+        ),
+        migrations.RunPython(link_videos, migrations.RunPython.noop),
+    ]
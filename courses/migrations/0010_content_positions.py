@@ -0,0 +1,66 @@
+from itertools import groupby
+
+from django.db import migrations, models
+
+
+def initialize_positions(apps, schema_editor):
+    Section = apps.get_model('courses', 'Section')
+    Video = apps.get_model('courses', 'Video')
+
+    sections = list(Section.objects.order_by('course_id', 'created_at', 'id'))
+    for _, group in groupby(sections, key=lambda section: section.course_id):
+        for position, section in enumerate(group):
+            section.position = position
+    Section.objects.bulk_update(sections, ['position'], batch_size=500)
+
+    videos = list(Video.objects.order_by('section_id', 'created_at', 'id'))
+    for _, group in groupby(videos, key=lambda video: video.section_id):
+        for position, video in enumerate(group):
+            video.position = position
+    Video.objects.bulk_update(videos, ['position'], batch_size=500)
+
+    # previous_video ko'rsatkichlari yangi tartib (section.position, position) bo'yicha qayta bog'lanadi
+    rows = list(
+        Video.objects.order_by('section__course_id', 'section__position', 'position', 'id')
+        .values_list('id', 'section__course_id')
+    )
+    Video.objects.update(previous_video=None)
+    updates = []
+    for _, group in groupby(rows, key=lambda row: row[1]):
+        previous_id = None
+        for video_id, _ in group:
+            if previous_id is not None:
+                updates.append(Video(id=video_id, previous_video_id=previous_id))
+            previous_id = video_id
+    Video.objects.bulk_update(updates, ['previous_video'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_video_previous_pointer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='position',
+            field=models.PositiveIntegerField(blank=True, default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='position',
+            field=models.PositiveIntegerField(blank=True, default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(initialize_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['course', 'position'], name='section_course_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['section', 'position'], name='video_section_position_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+def fill_duration_seconds(apps, schema_editor):
+    Video = apps.get_model('courses', 'Video')
+    videos = []
+    for video in Video.objects.exclude(duration='').only('id', 'duration'):
+        seconds = 0
+        try:
+            for part in video.duration.strip().split(':'):
+                seconds = seconds * 60 + int(part)
+        except ValueError:
+            continue
+        video.duration_seconds = max(seconds, 0)
+        videos.append(video)
+    Video.objects.bulk_update(videos, ['duration_seconds'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='duration_seconds',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_duration_seconds, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='mediajob',
+            name='kind',
+            field=models.CharField(choices=[('probe', 'Probe'), ('hls', 'HLS')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='coursestats',
+            index=models.Index(fields=['total_duration', 'course'], name='coursestats_duration_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+def enqueue_existing_videos(apps, schema_editor):
+    Video = apps.get_model('courses', 'Video')
+    MediaJob = apps.get_model('courses', 'MediaJob')
+    video_ids = Video.objects.exclude(video_file='').values_list('id', flat=True)
+    MediaJob.objects.bulk_create(
+        [MediaJob(video_id=video_id, kind='thumbnails') for video_id in video_ids], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0013_video_duration_seconds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='poster',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='thumbnails_vtt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='mediajob',
+            name='kind',
+            field=models.CharField(choices=[('probe', 'Probe'), ('thumbnails', 'Thumbnails'), ('hls', 'HLS')], max_length=20),
+        ),
+        migrations.RunPython(enqueue_existing_videos, migrations.RunPython.noop),
+    ]
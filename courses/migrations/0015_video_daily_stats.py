@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0014_video_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('plays', models.PositiveIntegerField(default=0)),
+                ('unique_viewers', models.PositiveIntegerField(default=0)),
+                ('completions', models.PositiveIntegerField(default=0)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='courses.video')),
+            ],
+            options={
+                'verbose_name_plural': 'Video daily stats',
+                'unique_together': {('video', 'date')},
+            },
+        ),
+    ]
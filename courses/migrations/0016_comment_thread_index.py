@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0015_video_daily_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='videocomment',
+            index=models.Index(fields=['video', 'parent_comment', '-created_at', '-id'], name='videocomment_thread_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_likes_count(apps, schema_editor):
+    VideoComment = apps.get_model('courses', 'VideoComment')
+    counts = (
+        VideoComment.likes.through.objects
+        .values('videocomment_id')
+        .annotate(total=Count('id'))
+        .values_list('videocomment_id', 'total')
+    )
+    comments = [VideoComment(id=comment_id, likes_count=total) for comment_id, total in counts]
+    VideoComment.objects.bulk_update(comments, ['likes_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0016_comment_thread_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videocomment',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_likes_count, migrations.RunPython.noop),
+    ]
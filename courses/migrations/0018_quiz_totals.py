@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:47
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_quiz_totals(apps, schema_editor):
+    Video = apps.get_model('courses', 'Video')
+    Section = apps.get_model('courses', 'Section')
+    Question = apps.get_model('courses', 'Question')
+    question_counts = Question.objects.values('video_id').annotate(total=Count('id')).values_list('video_id', 'total')
+    videos = [Video(id=video_id, question_count=total) for video_id, total in question_counts]
+    Video.objects.bulk_update(videos, ['question_count'], batch_size=500)
+    quiz_videos = (
+        Video.objects.filter(question_count__gt=0)
+        .values('section_id').annotate(total=Count('id')).values_list('section_id', 'total')
+    )
+    sections = [Section(id=section_id, quiz_video_count=total) for section_id, total in quiz_videos]
+    Section.objects.bulk_update(sections, ['quiz_video_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0017_comment_likes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='quiz_video_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_quiz_totals, migrations.RunPython.noop),
+    ]
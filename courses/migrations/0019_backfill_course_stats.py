@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+
+def backfill_course_stats(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CourseStats = apps.get_model('courses', 'CourseStats')
+    Video = apps.get_model('courses', 'Video')
+    Enrollment = apps.get_model('accounts', 'Enrollment')
+    CourseProgress = apps.get_model('course_progress', 'CourseProgress')
+    CourseRating = apps.get_model('course_progress', 'CourseRating')
+
+    now = timezone.now()
+    stats = {course_id: CourseStats(course_id=course_id, updated_at=now)
+             for course_id in Course.objects.values_list('pk', flat=True)}
+    for course_id, count in Enrollment.objects.values('course_id').annotate(count=Count('id')) \
+            .values_list('course_id', 'count'):
+        stats[course_id].enrolled_count = count
+    for course_id, count, completed in (
+        CourseProgress.objects.values('course_id')
+        .annotate(count=Count('id'), completed=Count('id', filter=Q(is_complete=True)))
+        .values_list('course_id', 'count', 'completed')
+    ):
+        stats[course_id].progress_count = count
+        stats[course_id].completed_count = completed
+    for course_id, total, count, avg in (
+        CourseRating.objects.values('course_id')
+        .annotate(total=Sum('rating'), count=Count('id'), avg=Avg('rating'))
+        .values_list('course_id', 'total', 'count', 'avg')
+    ):
+        stats[course_id].rating_sum = total or Decimal('0')
+        stats[course_id].rating_count = count
+        stats[course_id].rating_avg = float(avg or 0)
+    for course_id, count, total in (
+        Video.objects.values('section__course_id')
+        .annotate(count=Count('id'), total=Sum('duration_seconds'))
+        .values_list('section__course_id', 'count', 'total')
+    ):
+        stats[course_id].lesson_count = count
+        stats[course_id].total_duration = total or 0
+
+    CourseStats.objects.bulk_create(
+        stats.values(), batch_size=500, update_conflicts=True, unique_fields=['course'],
+        update_fields=[
+            'enrolled_count', 'progress_count', 'completed_count', 'rating_sum',
+            'rating_count', 'rating_avg', 'lesson_count', 'total_duration', 'updated_at',
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+    """0006 dan oldin mavjud bo'lgan kurslar uchun CourseStats qatorlarini yaratadi."""
+
+    dependencies = [
+        ('courses', '0018_quiz_totals'),
+        ('accounts', '0003_customuser_date_joined_customuser_location'),
+        ('course_progress', '0004_quiz_progress_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_course_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def enqueue_existing_videos(apps, schema_editor):
+    Video = apps.get_model('courses', 'Video')
+    MediaJob = apps.get_model('courses', 'MediaJob')
+    jobs = []
+    for kind, videos in (
+        ('probe', Video.objects.exclude(video_file='')),
+        ('hls', Video.objects.exclude(video_file='').filter(hls_playlist='')),
+    ):
+        pending = MediaJob.objects.filter(kind=kind, state__in=['queued', 'running']).values_list('video_id', flat=True)
+        jobs += [MediaJob(video_id=video_id, kind=kind)
+                 for video_id in videos.exclude(pk__in=pending).values_list('id', flat=True)]
+    MediaJob.objects.bulk_create(jobs, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    """0011 mavjud videolar uchun probe/HLS joblarini navbatga qo'ymagan edi (0014 thumbnails kabi)."""
+
+    dependencies = [
+        ('courses', '0019_backfill_course_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(enqueue_existing_videos, migrations.RunPython.noop),
+    ]
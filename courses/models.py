@@ -1,5 +1,10 @@
+import uuid
+from decimal import Decimal, InvalidOperation
+
 from django.db import models
+from django.db.models import Max
 from django.conf import settings
+from django.utils import timezone
 
 from validators import validate_desktop_banner, validate_mobile_banner
 
@@ -59,14 +64,100 @@ class Course(BasicClass):
         validators=[validate_mobile_banner]
     )
     discount = models.CharField(max_length=255, null=True, blank=True)
+    effective_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
     duration = models.CharField(max_length=15)
     category = models.ForeignKey(CourseCategory, on_delete=models.CASCADE)
     instructor = models.ForeignKey('accounts.Teacher', on_delete=models.CASCADE, related_name='instructor')
     status = models.CharField(max_length=150, choices=STATUS_CHOICES)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='course_newest_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='course_category_newest_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='course_status_newest_idx'),
+            models.Index(fields=['effective_price', 'id'], name='course_price_idx'),
+            models.Index(fields=['category', 'effective_price', 'id'], name='course_category_price_idx'),
+            models.Index(fields=['instructor', '-created_at', '-id'], name='course_instructor_newest_idx'),
+        ]
+
     def __str__(self):
         return self.name_uz
 
+    def get_effective_price(self):
+        """
+        discount maydonidan chegirmali narxni hisoblaydi: "20%" foiz sifatida,
+        oddiy son esa narxdan ayiriladigan summa sifatida qabul qilinadi.
+        """
+        price = Decimal(str(self.price or 0))
+        discount = (self.discount or '').strip().replace(',', '.').replace(' ', '')
+        value = price
+        if discount:
+            try:
+                if discount.endswith('%'):
+                    value = price - price * Decimal(discount[:-1]) / 100
+                else:
+                    value = price - Decimal(discount)
+            except InvalidOperation:
+                value = price
+        return max(value, Decimal('0')).quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        self.effective_price = self.get_effective_price()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'price', 'discount'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'effective_price'}
+        super().save(*args, **kwargs)
+
+
+class CourseStats(models.Model):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    enrolled_count = models.IntegerField(default=0)
+    progress_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+    rating_count = models.IntegerField(default=0)
+    rating_avg = models.FloatField(default=0)
+    lesson_count = models.IntegerField(default=0)
+    total_duration = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = 'Course stats'
+        indexes = [
+            models.Index(fields=['-rating_avg', '-course'], name='coursestats_rating_idx'),
+            models.Index(fields=['-enrolled_count', '-course'], name='coursestats_popular_idx'),
+            models.Index(fields=['total_duration', 'course'], name='coursestats_duration_idx'),
+        ]
+
+    def __str__(self):
+        return f"stats: {self.course_id}"
+
+
+def parse_duration(value):
+    """'12:45' yoki '1:02:03' ko'rinishidagi davomiylikni sekundga o'giradi."""
+    if not value:
+        return 0
+    seconds = 0
+    try:
+        for part in str(value).strip().split(':'):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return 0
+    return max(seconds, 0)
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def next_position(siblings):
+    last = siblings.aggregate(last=Max('position'))['last']
+    return 0 if last is None else last + 1
+
 
 class Section(BasicClass):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -75,10 +166,22 @@ class Section(BasicClass):
     title_ru = models.CharField(max_length=255)
     duration = models.CharField(max_length=15)
     is_completed = models.BooleanField(default=False)
+    position = models.PositiveIntegerField(blank=True)
+    quiz_video_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'position'], name='section_course_position_idx'),
+        ]
 
     def __str__(self):
         return f"course: {self.course} --> title: {self.title_uz}"
 
+    def save(self, *args, **kwargs):
+        if self.position is None:
+            self.position = next_position(Section.objects.filter(course_id=self.course_id))
+        super().save(*args, **kwargs)
+
 
 class Video(BasicClass):
     section = models.ForeignKey(Section, on_delete=models.CASCADE)
@@ -90,11 +193,61 @@ class Video(BasicClass):
     description_ru = models.CharField(max_length=255,null=True,blank=True,default="")
     video_file = models.FileField(upload_to='videos/')
     duration = models.CharField(max_length=15)
+    duration_seconds = models.PositiveIntegerField(default=0)
     is_preview = models.BooleanField(default=False)
+    position = models.PositiveIntegerField(blank=True)
+    hls_playlist = models.CharField(max_length=255, blank=True, default="", editable=False)
+    poster = models.CharField(max_length=255, blank=True, default="", editable=False)
+    thumbnails_vtt = models.CharField(max_length=255, blank=True, default="", editable=False)
+    question_count = models.PositiveIntegerField(default=0, editable=False)
+    previous_video = models.OneToOneField(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='next_video'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['section', 'position'], name='video_section_position_idx'),
+        ]
 
     def __str__(self):
         return self.title_uz
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_duration = instance.__dict__.get('duration')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.position is None:
+            self.position = next_position(Video.objects.filter(section_id=self.section_id))
+        # duration matni o'zgarsa sekundlar qayta hisoblanadi (probe job keyin aniq qiymatni yozadi)
+        saved_duration = getattr(self, '_saved_duration', None)
+        changed = not self.duration_seconds if saved_duration is None else self.duration != saved_duration
+        seconds = parse_duration(self.duration) if changed else 0
+        if seconds and seconds != self.duration_seconds:
+            self.duration_seconds = seconds
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'duration' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'duration_seconds'}
+        super().save(*args, **kwargs)
+        self._saved_duration = self.duration
+
+
+class VideoDailyStats(models.Model):
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    plays = models.PositiveIntegerField(default=0)
+    unique_viewers = models.PositiveIntegerField(default=0)
+    completions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('video', 'date')
+        verbose_name_plural = 'Video daily stats'
+
+    def __str__(self):
+        return f"video: {self.video_id} -- {self.date} --> {self.plays}"
+
 
 class VideoComment(BasicClass):
     user = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE)
@@ -102,6 +255,12 @@ class VideoComment(BasicClass):
     text = models.TextField()
     parent_comment = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies')
     likes = models.ManyToManyField('accounts.CustomUser', related_name='liked_comment', blank=True)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['video', 'parent_comment', '-created_at', '-id'], name='videocomment_thread_idx'),
+        ]
 
     def __str__(self):
         return self.text
@@ -141,6 +300,86 @@ class SectionCompletion(models.Model):
         return f"{self.user.full_name} completed {self.section.title_uz} at {self.completed_at}"
     
 
+SEARCH_KIND_CHOICES = (
+    ("course", "Course"),
+    ("section", "Section"),
+    ("video", "Video"),
+)
+
+
+class SearchDocument(models.Model):
+    kind = models.CharField(max_length=10, choices=SEARCH_KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='search_documents')
+    title_uz = models.CharField(max_length=255, blank=True, default="")
+    title_en = models.CharField(max_length=255, blank=True, default="")
+    title_ru = models.CharField(max_length=255, blank=True, default="")
+    body_uz = models.TextField(blank=True, default="")
+    body_en = models.TextField(blank=True, default="")
+    body_ru = models.TextField(blank=True, default="")
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind}: {self.object_id}"
+
+
+MEDIA_JOB_KIND_CHOICES = (
+    ("probe", "Probe"),
+    ("thumbnails", "Thumbnails"),
+    ("hls", "HLS"),
+)
+
+MEDIA_JOB_STATE_CHOICES = (
+    ("queued", "Queued"),
+    ("running", "Running"),
+    ("done", "Done"),
+    ("failed", "Failed"),
+)
+
+
+class MediaJob(BasicClass):
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='media_jobs')
+    kind = models.CharField(max_length=20, choices=MEDIA_JOB_KIND_CHOICES)
+    state = models.CharField(max_length=10, choices=MEDIA_JOB_STATE_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['state', 'run_after'], name='mediajob_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: video {self.video_id} --> {self.state}"
+
+
+UPLOAD_STATE_CHOICES = (
+    ("uploading", "Uploading"),
+    ("completed", "Completed"),
+)
+
+
+class UploadSession(BasicClass):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    metadata = models.JSONField(default=dict)
+    state = models.CharField(max_length=10, choices=UPLOAD_STATE_CHOICES, default='uploading')
+    video = models.ForeignKey(Video, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.filename}: {self.offset}/{self.size}"
+
+
 class ContactUsMessage(BasicClass):
     full_name = models.CharField(max_length=255)
     phone_number = models.CharField(max_length=20)
@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class SectionPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination:
+    """
+    Cursor (keyset) pagination: keyingi sahifa OFFSET bilan emas, oxirgi
+    yozuvning (saralash qiymati, id) juftligidan keyin boshlanadi, shuning
+    uchun chuqur sahifalar ham indeks bo'yicha bir xil tezlikda o'qiladi.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def __init__(self, field, descending=True):
+        self.field = field
+        self.descending = descending
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    @staticmethod
+    def encode_cursor(value, pk):
+        if isinstance(value, datetime):
+            # DjangoJSONEncoder millisekundgacha qisqartiradi, chegara qatorlari tushib qolmasligi uchun to'liq qiymat
+            value = value.isoformat()
+        raw = json.dumps([value, pk], cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except (TypeError, ValueError, binascii.Error):
+            raise ValidationError({'cursor': "Invalid cursor.!"})
+        return value, pk
+
+    def _model_field(self, model):
+        for part in self.field.split('__'):
+            field = model._meta.get_field(part)
+            model = field.related_model
+        return field
+
+    def validate_cursor(self, model, value, pk):
+        """Cursor qiymatlarini saralash maydoni va pk turiga keltiradi: noto'g'ri turdagi qiymat 500 emas, 400 beradi."""
+        try:
+            if value is None:
+                raise ValueError(value)
+            return self._model_field(model).to_python(value), int(pk)
+        except (TypeError, ValueError, OverflowError, DjangoValidationError):
+            raise ValidationError({'cursor': "Invalid cursor.!"})
+
+    def _value(self, obj):
+        for part in self.field.split('__'):
+            obj = getattr(obj, part, None)
+            if obj is None:
+                return None
+        return obj
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        lookup, tiebreak = ('lt', '-') if self.descending else ('gt', '')
+        queryset = queryset.order_by(f"{tiebreak}{self.field}", f"{tiebreak}pk")
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = self.validate_cursor(queryset.model, *self.decode_cursor(cursor))
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{lookup}": value}) | Q(**{self.field: value, f"pk__{lookup}": pk})
+            )
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = None
+        if self.has_next:
+            self.next_cursor = self.encode_cursor(self._value(rows[-1]), rows[-1].pk)
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        return {'next': self.get_next_link(), 'results': data}
@@ -0,0 +1,143 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from accounts.models import Enrollment
+from courses.cache import course_scope, get_versions
+from courses.models import Question, Video
+
+PROGRESS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _course_version(course_id):
+    return get_versions([course_scope(course_id)])[0]
+
+
+def course_video_order(course_id, version=None):
+    """
+    Kurs videolarining tartiblangan ro'yxati va preview videolar bitmaski.
+    Kurs versiyasi bilan keshlanadi: video/savol o'zgarsa kalit ham o'zgaradi.
+    """
+    version = version or _course_version(course_id)
+    key = f"progress:order:{course_id}:{version}"
+    order = cache.get(key)
+    if order is None:
+        rows = (
+            Video.objects.filter(section__course_id=course_id)
+            .order_by('section__position', 'section_id', 'position', 'id')
+            .values_list('id', 'is_preview')
+        )
+        ids, preview_mask = [], 0
+        for index, (video_id, is_preview) in enumerate(rows):
+            ids.append(video_id)
+            if is_preview:
+                preview_mask |= 1 << index
+        order = {'ids': ids, 'positions': {video_id: index for index, video_id in enumerate(ids)},
+                 'preview_mask': preview_mask}
+        cache.set(key, order, PROGRESS_CACHE_TIMEOUT)
+    return order
+
+
+def _bitmap_key(user_id, course_id, version):
+    return f"progress:bitmap:{user_id}:{course_id}:{version}"
+
+
+def _completed_video_ids(user_id, video_ids):
+    """Barcha savollari yakunlangan (yoki savolsiz) videolar."""
+    question_counts = dict(Video.objects.filter(pk__in=video_ids).values_list('id', 'question_count'))
+    completed_counts = dict(
+        Question.objects.filter(video_id__in=video_ids)
+        .filter(Q(is_completed=True) | Q(questionresult__user_id=user_id, questionresult__is_passed=True))
+        .values_list('video_id')
+        .annotate(count=Count('id', distinct=True))
+    )
+    return {
+        video_id for video_id in video_ids
+        if completed_counts.get(video_id, 0) >= question_counts.get(video_id, 0)
+    }
+
+
+def get_progress_bitmap(user, course_id, is_enrolled=None):
+    """
+    Foydalanuvchining kursdagi progressi: {'enrolled': bool, 'bits': int}.
+    `bits` ning i-biti course_video_order() dagi i-video yakunlanganini bildiradi
+    (kursga yozilmagan foydalanuvchi uchun ham hisoblanadi).
+    """
+    version = _course_version(course_id)
+    order = course_video_order(course_id, version)
+    key = _bitmap_key(user.pk, course_id, version)
+    entry = cache.get(key)
+    if entry is None:
+        if is_enrolled is None:
+            is_enrolled = Enrollment.objects.filter(user=user, course_id=course_id).exists()
+        bits = 0
+        completed = _completed_video_ids(user.pk, order['ids'])
+        for index, video_id in enumerate(order['ids']):
+            if video_id in completed:
+                bits |= 1 << index
+        entry = {'enrolled': is_enrolled, 'bits': bits}
+        cache.set(key, entry, PROGRESS_CACHE_TIMEOUT)
+    return order, entry
+
+
+def mark_video_progress(user_id, video_id, course_id):
+    """
+    Savol natijasi yozilgandan keyin faqat shu videoning bitini yangilaydi.
+    Bitmap hali keshda bo'lmasa, keyingi o'qishda bazadan to'liq quriladi.
+    """
+    def update():
+        version = _course_version(course_id)
+        key = _bitmap_key(user_id, course_id, version)
+        entry = cache.get(key)
+        if entry is None:
+            return
+        order = course_video_order(course_id, version)
+        if video_id not in order['positions']:
+            return
+        bit = 1 << order['positions'][video_id]
+        if video_id in _completed_video_ids(user_id, [video_id]):
+            bits = entry['bits'] | bit
+        else:
+            bits = entry['bits'] & ~bit
+        if bits != entry['bits']:
+            cache.set(key, {**entry, 'bits': bits}, PROGRESS_CACHE_TIMEOUT)
+    transaction.on_commit(update)
+
+
+def invalidate_progress_bitmap(user_id, course_id):
+    transaction.on_commit(lambda: cache.delete(_bitmap_key(user_id, course_id, _course_version(course_id))))
+
+
+def is_video_passed(user, video_id, course_id):
+    """Videoning barcha savollari foydalanuvchi tomonidan yakunlanganmi (keshdagi bitmap bo'yicha)."""
+    order, progress = get_progress_bitmap(user, course_id)
+    position = order['positions'].get(video_id)
+    if position is None:
+        return _completed_video_ids(user.pk, [video_id]) == {video_id}
+    return bool(progress['bits'] >> position & 1)
+
+
+def relink_course_videos(course_id):
+    """
+    Kurs videolarining previous_video ko'rsatkichlarini joriy tartibga moslaydi.
+    Faqat o'zgargan qatorlar yoziladi; OneToOne unique cheklovi oraliq holatda
+    buzilmasligi uchun avval ular NULL qilinadi.
+    """
+    rows = list(
+        Video.objects.filter(section__course_id=course_id)
+        .order_by('section__position', 'section_id', 'position', 'id')
+        .values_list('id', 'previous_video_id')
+    )
+    changed = []
+    previous_id = None
+    for video_id, current_previous_id in rows:
+        if current_previous_id != previous_id:
+            changed.append(Video(id=video_id, previous_video_id=previous_id))
+        previous_id = video_id
+    if not changed:
+        return
+    with transaction.atomic():
+        Video.objects.filter(pk__in=[video.id for video in changed]).update(previous_video=None)
+        Video.objects.bulk_update(
+            [video for video in changed if video.previous_video_id is not None], ['previous_video'], batch_size=500
+        )
@@ -0,0 +1,136 @@
+"""
+Video commentlari uchun real vaqt hodisalari (Server-Sent Events).
+
+Sinxron kod (signal, view) `publish_*` bilan hodisa yuboradi. Redis bo'lsa u
+pub/sub orqali barcha ASGI workerlarga yetkaziladi: har bir worker bitta
+PSUBSCRIBE ulanishi bilan o'z event loopidagi obunachilarga tarqatadi.
+Redis bo'lmaganda (dev, testlar) hodisa shu jarayondagi brokerga beriladi.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from courses.cache import redis_connection
+from courses.serializers import VideoCommentReplySerializer
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'comments:video:'
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def video_channel(video_id):
+    return f"{CHANNEL_PREFIX}{video_id}"
+
+
+def sse_frame(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class LocalBroker:
+    """Kanal -> (event loop, asyncio.Queue) obunachilar; har qanday threaddan dispatch qilish mumkin."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[channel].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(channel, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+
+    def dispatch(self, channel, frame):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, frame)
+
+
+def _offer(queue, frame):
+    # sekin mijoz boshqalarni to'xtatmasligi uchun navbat to'lganda hodisa tashlanadi
+    try:
+        queue.put_nowait(frame)
+    except asyncio.QueueFull:
+        pass
+
+
+broker = LocalBroker()
+_listeners = {}
+
+
+async def _listen_redis():
+    """Workerning yagona Redis obunasi: kelgan hodisalarni lokal brokerga uzatadi."""
+    from redis import asyncio as aioredis
+
+    while True:
+        client = aioredis.from_url(settings.REDIS_URL)
+        try:
+            pubsub = client.pubsub()
+            await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+            async for message in pubsub.listen():
+                if message['type'] == 'pmessage':
+                    broker.dispatch(message['channel'].decode(), message['data'].decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Comment events Redis listener failed, reconnecting")
+            await asyncio.sleep(1)
+        finally:
+            await client.aclose()
+
+
+def _ensure_listener():
+    if redis_connection() is None:
+        return
+    loop = asyncio.get_running_loop()
+    task = _listeners.get(loop)
+    if task is None or task.done():
+        _listeners[loop] = loop.create_task(_listen_redis())
+
+
+def subscribe(channel):
+    _ensure_listener()
+    return broker.subscribe(channel)
+
+
+def unsubscribe(channel, queue):
+    broker.unsubscribe(channel, queue)
+
+
+def publish(video_id, event, data):
+    """Tranzaksiya tasdiqlangach hodisani barcha workerlarga yuboradi."""
+    channel, frame = video_channel(video_id), sse_frame(event, data)
+
+    def send():
+        try:
+            connection = redis_connection()
+            if connection is None:
+                broker.dispatch(channel, frame)
+            else:
+                connection.publish(channel, frame)
+        except Exception:
+            logger.exception("Comment event for video %s could not be published", video_id)
+    transaction.on_commit(send)
+
+
+def publish_comment(comment):
+    comment.liked_by_me = False
+    publish(comment.video_id, 'comment', VideoCommentReplySerializer(comment).data)
+
+
+def publish_likes(video_id, comment_id, likes_count):
+    publish(video_id, 'likes', {"id": comment_id, "likes_count": likes_count})
@@ -0,0 +1,143 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from courses.models import SearchDocument, Section, Video
+
+FTS_TABLE = 'courses_searchdocument_fts'
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _tokens(query):
+    return _TOKEN_RE.findall(query.lower())[:8]
+
+
+def course_document(course):
+    return {
+        'kind': 'course',
+        'object_id': course.pk,
+        'course_id': course.pk,
+        'title_uz': course.name_uz, 'title_en': course.name_en, 'title_ru': course.name_ru,
+        'body_uz': course.description_uz, 'body_en': course.description_en, 'body_ru': course.description_ru,
+    }
+
+
+def section_document(section):
+    return {
+        'kind': 'section',
+        'object_id': section.pk,
+        'course_id': section.course_id,
+        'title_uz': section.title_uz, 'title_en': section.title_en, 'title_ru': section.title_ru,
+        'body_uz': '', 'body_en': '', 'body_ru': '',
+    }
+
+
+def video_document(video, course_id):
+    return {
+        'kind': 'video',
+        'object_id': video.pk,
+        'course_id': course_id,
+        'title_uz': video.title_uz, 'title_en': video.title_en, 'title_ru': video.title_ru,
+        'body_uz': video.description_uz or '', 'body_en': video.description_en or '',
+        'body_ru': video.description_ru or '',
+    }
+
+
+def index_document(document):
+    """
+    Hujjatni SearchDocument jadvaliga yozadi. FTS5 jadvali (SQLite) triggerlar,
+    tsvector ustuni (Postgres) esa generated column orqali o'zi yangilanadi.
+    """
+    document = dict(document)
+    SearchDocument.objects.update_or_create(
+        kind=document.pop('kind'),
+        object_id=document.pop('object_id'),
+        defaults=document,
+    )
+
+
+def remove_document(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def index_course_tree(course):
+    index_document(course_document(course))
+    for section in Section.objects.filter(course=course):
+        index_document(section_document(section))
+    for video in Video.objects.filter(section__course=course):
+        index_document(video_document(video, course.pk))
+
+
+def _sqlite_search(tokens, limit, offset):
+    match = ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+    weights = ', '.join([str(TITLE_WEIGHT)] * 3 + [str(BODY_WEIGHT)] * 3)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT rowid, bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        rows = cursor.fetchall()
+    # bm25() kichikroq qiymatni yaxshiroq deb hisoblaydi
+    return total, [(document_id, -rank) for document_id, rank in rows]
+
+
+def _postgres_search(tokens, limit, offset):
+    raw = ' & '.join(f"{token}:*" for token in tokens)
+    tsquery = (
+        "(to_tsquery('simple', %s) || to_tsquery('english', %s) || to_tsquery('russian', %s))"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT count(*) FROM courses_searchdocument WHERE search_vector @@ {tsquery}",
+            [raw, raw, raw],
+        )
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT id, ts_rank(search_vector, {tsquery}) AS rank FROM courses_searchdocument "
+            f"WHERE search_vector @@ {tsquery} ORDER BY rank DESC, id LIMIT %s OFFSET %s",
+            [raw, raw, raw, raw, raw, raw, limit, offset],
+        )
+        rows = cursor.fetchall()
+    return total, rows
+
+
+def _fallback_search(tokens, limit, offset):
+    documents = SearchDocument.objects.all()
+    for token in tokens:
+        condition = Q()
+        for field in ('title_uz', 'title_en', 'title_ru', 'body_uz', 'body_en', 'body_ru'):
+            condition |= Q(**{f"{field}__icontains": token})
+        documents = documents.filter(condition)
+    total = documents.count()
+    ids = documents.order_by('kind', 'id').values_list('id', flat=True)[offset:offset + limit]
+    return total, [(document_id, 0.0) for document_id in ids]
+
+
+def search_documents(query, limit=20, offset=0):
+    """
+    Kurs, section va video matnlari bo'yicha to'liq matnli qidiruv.
+    (total, [(SearchDocument, rank), ...]) qaytaradi, natijalar rank bo'yicha tartiblangan.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return 0, []
+    if connection.vendor == 'sqlite':
+        total, rows = _sqlite_search(tokens, limit, offset)
+    elif connection.vendor == 'postgresql':
+        total, rows = _postgres_search(tokens, limit, offset)
+    else:
+        total, rows = _fallback_search(tokens, limit, offset)
+
+    documents = SearchDocument.objects.in_bulk([document_id for document_id, _ in rows])
+    return total, [
+        (documents[document_id], rank)
+        for document_id, rank in rows
+        if document_id in documents
+    ]
@@ -1,14 +1,84 @@
 from rest_framework import serializers
-from .models import CourseCategory, Course, Video, Section, VideoComment, \
+from .models import STATUS_CHOICES, CourseCategory, Course, Video, Section, VideoComment, \
     Question, Answer, ContactUsMessage
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from course_progress.models import CourseRating, CourseProgress
-from courses.utils import build_video_access_map
-from django.db.models import Avg
+from courses.utils import CATALOG_SORTS, build_video_access_map
+from courses.stats import get_course_stats
+from courses.streaming import public_media_url
+from django.db.models import Avg, Sum
 from decimal import Decimal
 
 User = get_user_model()
 
+LANGUAGE_SUFFIXES = ('uz', 'en', 'ru')
+
+
+def _query_list(request, name):
+    raw = request.query_params.get(name, '') if request else ''
+    return {item.strip() for item in raw.split(',') if item.strip()}
+
+
+def is_compact_request(request):
+    return bool(request) and request.query_params.get('compact', '').lower() in ('1', 'true', 'yes')
+
+
+class DynamicFieldsMixin:
+    """
+    GET so'rovlari uchun javob maydonlarini query parametrlar bilan boshqaradi:
+
+    ?fields=id,name  - faqat shu maydonlar (faqat yuqori darajadagi serializer uchun)
+    ?expand=videos   - Meta.expandable_fields'dagi qimmat maydonlarni qo'shadi
+    ?compact=1       - Meta.translated_fields'ning _uz/_en/_ru nusxalari olib tashlanadi
+                       (faqat faol tildagi qiymat qoladi), expandable maydonlar esa
+                       ?expand orqali so'ralmaguncha chiqarilmaydi.
+    """
+
+    @classmethod
+    def field_requested(cls, request, name, top_level=True):
+        if request is None or request.method != 'GET':
+            return True
+        requested = _query_list(request, 'fields') if top_level else set()
+        if requested and name not in requested:
+            return False
+        if name in getattr(cls.Meta, 'expandable_fields', ()) and is_compact_request(request):
+            return name in _query_list(request, 'expand') or name in requested
+        return True
+
+    def _is_top_level(self):
+        if self.context.get('nested'):
+            return False
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return fields
+
+        requested = _query_list(request, 'fields') if self._is_top_level() else set()
+        expanded = _query_list(request, 'expand')
+        compact = is_compact_request(request)
+
+        if compact:
+            for prefix in getattr(self.Meta, 'translated_fields', ()):
+                for suffix in LANGUAGE_SUFFIXES:
+                    if f"{prefix}_{suffix}" not in requested:
+                        fields.pop(f"{prefix}_{suffix}", None)
+            for name in getattr(self.Meta, 'expandable_fields', ()):
+                if name not in expanded and name not in requested:
+                    fields.pop(name, None)
+
+        if requested:
+            for name in list(fields):
+                if name not in requested and name not in expanded:
+                    fields.pop(name)
+        return fields
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,7 +86,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username']
 
 
-class CourseCategorySerializer(serializers.ModelSerializer):
+class CourseCategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
     description = serializers.SerializerMethodField()
 
@@ -24,6 +94,7 @@ class CourseCategorySerializer(serializers.ModelSerializer):
         model = CourseCategory
         fields = ['id', 'name', 'description', 'name_uz', 'name_en', 'name_ru', 'description_uz', 'description_en',
                   'description_ru']
+        translated_fields = ['name', 'description']
 
     def get_name(self, obj):
         lang = self.context['request'].LANGUAGE_CODE
@@ -43,7 +114,7 @@ class CourseCategorySerializer(serializers.ModelSerializer):
         return obj.description_uz
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.SerializerMethodField()
 
     name = serializers.SerializerMethodField()
@@ -54,13 +125,18 @@ class CourseSerializer(serializers.ModelSerializer):
     users = serializers.SerializerMethodField()
     instructor = serializers.SerializerMethodField()
     videos = serializers.SerializerMethodField()
+    duration_seconds = serializers.SerializerMethodField()
 
     class Meta:
         model = Course
         fields = ['id', 'users', 'rating', 'lessons', 'finish', 'category_name', 'name',
                   'name_uz', 'name_en', 'name_ru','description', 'description_uz',
-                  'description_en', 'description_ru', 'price', 'duration', 'discount', 'instructor', 'status',
+                  'description_en', 'description_ru', 'price', 'duration', 'duration_seconds', 'discount',
+                  'effective_price',
+                  'instructor', 'status',
                   'videos',"banner_desktop","banner_mobile","banner"]
+        translated_fields = ['name', 'description']
+        expandable_fields = ['videos']
     def get_category_name(self, obj):
         lang = self.context['request'].LANGUAGE_CODE
         category = obj.category
@@ -71,18 +147,37 @@ class CourseSerializer(serializers.ModelSerializer):
             return category.name_en
         return category.name_uz
     def get_users(self, obj):
+        stats = get_course_stats(obj)
+        if stats is not None:
+            return stats.progress_count
         return CourseProgress.objects.filter(course=obj).count()
 
     def get_rating(self, obj):
+        stats = get_course_stats(obj)
+        if stats is not None:
+            return round(stats.rating_avg, 1)
         avg_rating = CourseRating.objects.filter(course=obj).aggregate(Avg('rating'))["rating__avg"]
         return round(avg_rating or Decimal("0.0"), 1)
 
     def get_lessons(self, obj):
+        stats = get_course_stats(obj)
+        if stats is not None:
+            return stats.lesson_count
         return Video.objects.filter(section__course=obj).count()
 
+    def get_duration_seconds(self, obj):
+        stats = get_course_stats(obj)
+        if stats is not None:
+            return stats.total_duration
+        return Video.objects.filter(section__course=obj).aggregate(total=Sum('duration_seconds'))['total'] or 0
+
     def get_finish(self, obj):
-        part = CourseProgress.objects.filter(course=obj, is_complete=True).count()
-        total = CourseProgress.objects.filter(course=obj).count()
+        stats = get_course_stats(obj)
+        if stats is not None:
+            part, total = stats.completed_count, stats.progress_count
+        else:
+            part = CourseProgress.objects.filter(course=obj, is_complete=True).count()
+            total = CourseProgress.objects.filter(course=obj).count()
         if total == 0:
             return 0
         return round((part / total) * 100, 1)
@@ -112,25 +207,35 @@ class CourseSerializer(serializers.ModelSerializer):
         }
 
     def get_videos(self, obj):
-        videos = Video.objects.filter(section__course=obj)
+        videos = getattr(obj, 'catalog_videos', None)
+        if videos is None:
+            videos = Video.objects.filter(section__course=obj)
         request = self.context.get('request')
-        access_map = build_video_access_map(request.user, obj) if request else None
+        access_map = None
+        if request:
+            enrolled_course_ids = self.context.get('enrolled_course_ids')
+            is_enrolled = None if enrolled_course_ids is None else obj.id in enrolled_course_ids
+            access_map = build_video_access_map(request.user, obj, is_enrolled=is_enrolled)
         return VideoSerializer(
             videos,
             many=True,
-            context={'request': request, 'access_map': access_map}
+            context={'request': request, 'access_map': access_map, 'nested': True}
         ).data
 
 
-class VideoSerializer(serializers.ModelSerializer):
+class VideoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     title = serializers.SerializerMethodField()
+    description = serializers.SerializerMethodField()
     is_locked = serializers.SerializerMethodField()
     has_questions = serializers.SerializerMethodField()
+    poster = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Video
-        fields = ["id", 'section', 'title', 'title_uz', 'title_en', 'title_ru', 'description_uz', 'description_en', 'description_ru', "video_file", 'duration',
-                  'is_preview', 'is_locked', 'has_questions']
+        fields = ["id", 'section', 'title', 'title_uz', 'title_en', 'title_ru', 'description', 'description_uz', 'description_en', 'description_ru', "video_file", 'duration',
+                  'duration_seconds', 'is_preview', 'position', 'is_locked', 'has_questions', 'poster', 'thumbnails']
+        translated_fields = ['title', 'description']
 
     def get_title(self, obj):
         lang = self.context['request'].LANGUAGE_CODE
@@ -140,6 +245,14 @@ class VideoSerializer(serializers.ModelSerializer):
             return obj.title_en
         return obj.title_uz
 
+    def get_description(self, obj):
+        lang = self.context['request'].LANGUAGE_CODE
+        if lang == 'ru':
+            return obj.description_ru
+        elif lang == 'en':
+            return obj.description_en
+        return obj.description_uz
+
     def get_is_locked(self, obj):
         access_map = self.context.get("access_map")
         if access_map is None:
@@ -147,15 +260,23 @@ class VideoSerializer(serializers.ModelSerializer):
         return not access_map.get(obj.id, False)
 
     def get_has_questions(self, obj):
+        if hasattr(obj, 'has_questions_flag'):
+            return obj.has_questions_flag
         return Question.objects.filter(video=obj).exists()
 
+    def get_poster(self, obj):
+        return public_media_url(self.context['request'], obj.poster)
+
+    def get_thumbnails(self, obj):
+        return public_media_url(self.context['request'], obj.thumbnails_vtt)
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         data.pop("video_file", None)
         return data
 
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     title = serializers.SerializerMethodField()
     course = CourseSerializer(read_only=True)
     course_id = serializers.PrimaryKeyRelatedField(
@@ -166,7 +287,9 @@ class SectionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Section
-        fields = ['id', 'title', 'title_uz', 'title_en', 'title_ru', 'duration', 'course', 'course_id']
+        fields = ['id', 'title', 'title_uz', 'title_en', 'title_ru', 'duration', 'position', 'course', 'course_id']
+        translated_fields = ['title']
+        expandable_fields = ['course']
 
     def get_title(self, obj):
         lang = self.context['request'].LANGUAGE_CODE
@@ -177,18 +300,166 @@ class SectionSerializer(serializers.ModelSerializer):
         return obj.title_uz
 
 
+class SectionListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    title = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Section
+        fields = ['id', 'title', 'title_uz', 'title_en', 'title_ru', 'duration', 'position', 'course_id']
+        translated_fields = ['title']
+
+    def get_title(self, obj):
+        return localized(obj, 'title', self.context['request'].LANGUAGE_CODE)
+
+
+def localized(obj, field, lang):
+    if lang == 'ru':
+        return getattr(obj, f"{field}_ru")
+    elif lang == 'en':
+        return getattr(obj, f"{field}_en")
+    return getattr(obj, f"{field}_uz")
+
+
+class CurriculumVideoSerializer(serializers.ModelSerializer):
+    title = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Video
+        fields = ['id', 'title', 'duration', 'duration_seconds', 'is_preview', 'position', 'question_count']
+
+    def get_title(self, obj):
+        return localized(obj, 'title', self.context['request'].LANGUAGE_CODE)
+
+
+class CurriculumSectionSerializer(serializers.ModelSerializer):
+    title = serializers.SerializerMethodField()
+    videos = CurriculumVideoSerializer(source='video_set', many=True, read_only=True)
+    duration_seconds = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Section
+        fields = ['id', 'title', 'duration', 'duration_seconds', 'position', 'videos']
+
+    def get_title(self, obj):
+        return localized(obj, 'title', self.context['request'].LANGUAGE_CODE)
+
+
+class CurriculumSerializer(serializers.ModelSerializer):
+    name = serializers.SerializerMethodField()
+    sections = CurriculumSectionSerializer(source='section_set', many=True, read_only=True)
+    duration_seconds = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ['id', 'name', 'duration', 'duration_seconds', 'sections']
+
+    def get_name(self, obj):
+        return localized(obj, 'name', self.context['request'].LANGUAGE_CODE)
+
+
+class ReorderSectionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    videos = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
+
+
+class CurriculumReorderSerializer(serializers.Serializer):
+    sections = ReorderSectionSerializer(many=True)
+
+    def validate(self, attrs):
+        course = self.context['course']
+        section_ids = [section['id'] for section in attrs['sections']]
+        video_ids = [video_id for section in attrs['sections'] for video_id in section['videos']]
+        if len(set(section_ids)) != len(section_ids) or len(set(video_ids)) != len(video_ids):
+            raise serializers.ValidationError("Section yoki video ID lari takrorlanmasligi kerak.!")
+
+        course_section_ids = set(Section.objects.filter(course=course).values_list('id', flat=True))
+        course_video_ids = set(Video.objects.filter(section__course=course).values_list('id', flat=True))
+        if set(section_ids) != course_section_ids:
+            raise serializers.ValidationError({'sections': "Kursning barcha sectionlari ko'rsatilishi kerak.!"})
+        if set(video_ids) != course_video_ids:
+            raise serializers.ValidationError({'videos': "Kursning barcha videolari ko'rsatilishi kerak.!"})
+        return attrs
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    section = serializers.PrimaryKeyRelatedField(queryset=Section.objects.all())
+    title_uz = serializers.CharField(max_length=255)
+    title_en = serializers.CharField(max_length=255)
+    title_ru = serializers.CharField(max_length=255)
+    description_uz = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    description_en = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    description_ru = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    duration = serializers.CharField(max_length=15, required=False, allow_blank=True, default="")
+    is_preview = serializers.BooleanField(required=False, default=False)
+
+    def validate_size(self, value):
+        if value > settings.VIDEO_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Fayl hajmi {settings.VIDEO_UPLOAD_MAX_SIZE} baytdan oshmasligi kerak.!")
+        return value
+
+
+class CatalogFilterSerializer(serializers.Serializer):
+    category = serializers.IntegerField(required=False, min_value=1)
+    status = serializers.ChoiceField(choices=STATUS_CHOICES, required=False)
+    instructor = serializers.UUIDField(required=False)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+    min_rating = serializers.FloatField(required=False, min_value=0, max_value=5)
+    min_duration = serializers.IntegerField(required=False, min_value=0)
+    max_duration = serializers.IntegerField(required=False, min_value=0)
+    sort = serializers.ChoiceField(choices=list(CATALOG_SORTS), required=False, default='newest')
+
+    def validate(self, attrs):
+        min_price, max_price = attrs.get('min_price'), attrs.get('max_price')
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError({'min_price': "min_price max_price dan katta bo'lmasligi kerak.!"})
+        min_duration, max_duration = attrs.get('min_duration'), attrs.get('max_duration')
+        if min_duration is not None and max_duration is not None and min_duration > max_duration:
+            raise serializers.ValidationError(
+                {'min_duration': "min_duration max_duration dan katta bo'lmasligi kerak.!"}
+            )
+        return attrs
+
+
 class VideoCommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = VideoComment
-        fields = ['id', 'user', 'text', 'video', 'parent_comment', 'likes']
-        read_only_fields = ['likes', 'video', 'user']
+        fields = ['id', 'user', 'text', 'video', 'parent_comment', 'likes_count']
+        read_only_fields = ['likes_count', 'video', 'user']
+
+
+class CommentAuthorSerializer(serializers.ModelSerializer):
+    full_name = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['id', 'full_name', 'profile_picture']
+
+
+class VideoCommentReplySerializer(serializers.ModelSerializer):
+    user = CommentAuthorSerializer(read_only=True)
+    liked_by_me = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = VideoComment
+        fields = ['id', 'user', 'text', 'parent_comment', 'created_at', 'likes_count', 'liked_by_me']
+
+
+class VideoCommentThreadSerializer(VideoCommentReplySerializer):
+    replies = VideoCommentReplySerializer(many=True, read_only=True)
+
+    class Meta(VideoCommentReplySerializer.Meta):
+        fields = VideoCommentReplySerializer.Meta.fields + ['replies']
 
-class AnswerSerializer(serializers.ModelSerializer):
+class AnswerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     answer_text = serializers.SerializerMethodField()
 
     class Meta:
         model = Answer
         fields = "__all__"
+        translated_fields = ['answer_text']
 
     def get_answer_text(self, obj):
         lang = self.context['request'].LANGUAGE_CODE
@@ -198,13 +469,14 @@ class AnswerSerializer(serializers.ModelSerializer):
             return obj.answer_text_en
         return obj.answer_text_uz
     
-class QuestionSerializer(serializers.ModelSerializer):
+class QuestionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     questtion_text = serializers.SerializerMethodField()
     answers = serializers.SerializerMethodField()
 
     class Meta:
         model = Question
         fields = '__all__'
+        translated_fields = ['question_text']
 
     def get_questtion_text(self, obj):
         lang = self.context['request'].LANGUAGE_CODE
@@ -218,7 +490,7 @@ class QuestionSerializer(serializers.ModelSerializer):
         serializer = AnswerSerializer(
             answers,
             many=True,
-            context=self.context
+            context={**self.context, 'nested': True}
         )
         return serializer.data
 
@@ -0,0 +1,407 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import CustomUser, Enrollment, Teacher
+from course_progress.completion import apply_question_results, reevaluate_course_completion
+from course_progress.models import CourseProgress, CourseRating, QuestionResult
+from courses.cache import bump_versions, course_scope
+from courses.models import Answer, Course, CourseCategory, Question, Section, Video, VideoComment
+from courses.progress import invalidate_progress_bitmap, mark_video_progress, relink_course_videos
+from courses.search import course_document, index_document, remove_document, section_document, video_document
+from courses.stats import bump_course_stats, refresh_course_stats, refresh_quiz_totals
+from courses import typeahead
+from courses.media_jobs import enqueue_video_processing, remove_video_media
+from courses.realtime import publish_comment
+
+
+def _section_course_id(section_id):
+    return Section.objects.filter(pk=section_id).values_list('course_id', flat=True).first()
+
+
+@receiver(post_save, sender=Course)
+def create_course_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        refresh_course_stats(instance.pk)
+
+
+@receiver(post_init, sender=Enrollment)
+def remember_enrollment(sender, instance, **kwargs):
+    instance._stats_course_id = instance.course_id
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        bump_course_stats(instance.course_id, enrolled_count=1)
+    elif instance._stats_course_id != instance.course_id:
+        bump_course_stats(instance._stats_course_id, enrolled_count=-1)
+        bump_course_stats(instance.course_id, enrolled_count=1)
+        invalidate_progress_bitmap(instance.user_id, instance._stats_course_id)
+    invalidate_progress_bitmap(instance.user_id, instance.course_id)
+    instance._stats_course_id = instance.course_id
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    bump_course_stats(instance.course_id, create_missing=False, enrolled_count=-1)
+    invalidate_progress_bitmap(instance.user_id, instance.course_id)
+
+
+@receiver(post_init, sender=CourseProgress)
+def remember_course_progress(sender, instance, **kwargs):
+    instance._stats_state = (instance.course_id, instance.is_complete)
+
+
+@receiver(post_save, sender=CourseProgress)
+def course_progress_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_course_id, old_complete = instance._stats_state
+    if created:
+        bump_course_stats(instance.course_id, progress_count=1, completed_count=int(instance.is_complete))
+    elif old_course_id != instance.course_id:
+        bump_course_stats(old_course_id, progress_count=-1, completed_count=-int(old_complete))
+        bump_course_stats(instance.course_id, progress_count=1, completed_count=int(instance.is_complete))
+    elif old_complete != instance.is_complete:
+        bump_course_stats(instance.course_id, completed_count=1 if instance.is_complete else -1)
+    instance._stats_state = (instance.course_id, instance.is_complete)
+
+
+@receiver(post_delete, sender=CourseProgress)
+def course_progress_deleted(sender, instance, **kwargs):
+    bump_course_stats(
+        instance.course_id, create_missing=False,
+        progress_count=-1, completed_count=-int(instance.is_complete)
+    )
+
+
+@receiver(post_init, sender=CourseRating)
+def remember_course_rating(sender, instance, **kwargs):
+    instance._stats_state = (instance.course_id, instance.rating or 0)
+
+
+@receiver(post_save, sender=CourseRating)
+def course_rating_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_course_id, old_rating = instance._stats_state
+    if created:
+        bump_course_stats(instance.course_id, rating_sum=instance.rating, rating_count=1)
+    elif old_course_id != instance.course_id:
+        bump_course_stats(old_course_id, rating_sum=-old_rating, rating_count=-1)
+        bump_course_stats(instance.course_id, rating_sum=instance.rating, rating_count=1)
+    elif old_rating != instance.rating:
+        bump_course_stats(instance.course_id, rating_sum=instance.rating - old_rating)
+    instance._stats_state = (instance.course_id, instance.rating)
+
+
+@receiver(post_delete, sender=CourseRating)
+def course_rating_deleted(sender, instance, **kwargs):
+    bump_course_stats(instance.course_id, create_missing=False, rating_sum=-instance.rating, rating_count=-1)
+
+
+@receiver(post_init, sender=Video)
+def remember_video(sender, instance, **kwargs):
+    instance._stats_state = (instance.section_id, instance.duration_seconds)
+    instance._link_state = (instance.section_id, instance.position)
+    instance._media_file = instance.video_file.name
+    instance._quiz_section_id = instance.section_id
+
+
+@receiver(post_save, sender=Video)
+def video_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_section_id, old_duration = instance._stats_state
+    duration = instance.duration_seconds
+    if created:
+        bump_course_stats(_section_course_id(instance.section_id), lesson_count=1, total_duration=duration)
+    elif old_section_id != instance.section_id:
+        old_course_id = _section_course_id(old_section_id)
+        new_course_id = _section_course_id(instance.section_id)
+        if old_course_id != new_course_id:
+            bump_course_stats(old_course_id, lesson_count=-1, total_duration=-old_duration)
+            bump_course_stats(new_course_id, lesson_count=1, total_duration=duration)
+        elif old_duration != duration:
+            bump_course_stats(new_course_id, total_duration=duration - old_duration)
+    elif old_duration != duration:
+        bump_course_stats(_section_course_id(instance.section_id), total_duration=duration - old_duration)
+    instance._stats_state = (instance.section_id, duration)
+
+
+@receiver(post_delete, sender=Video)
+def video_deleted(sender, instance, **kwargs):
+    bump_course_stats(
+        _section_course_id(instance.section_id), create_missing=False,
+        lesson_count=-1, total_duration=-instance.duration_seconds
+    )
+
+
+@receiver([post_save, post_delete], sender=CourseCategory)
+def invalidate_category_cache(sender, instance, **kwargs):
+    bump_versions('categories', 'catalog')
+
+
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_course_cache(sender, instance, **kwargs):
+    bump_versions('catalog', course_scope(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Section)
+def invalidate_section_cache(sender, instance, **kwargs):
+    bump_versions('catalog', course_scope(instance.course_id))
+
+
+@receiver([post_save, post_delete], sender=Video)
+def invalidate_video_cache(sender, instance, **kwargs):
+    bump_versions('catalog', course_scope(_section_course_id(instance.section_id)))
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question_cache(sender, instance, **kwargs):
+    course_id = Video.objects.filter(pk=instance.video_id).values_list('section__course_id', flat=True).first()
+    bump_versions('catalog', course_scope(course_id))
+
+
+@receiver([post_save, post_delete], sender=Answer)
+def invalidate_answer_cache(sender, instance, **kwargs):
+    course_id = (
+        Question.objects.filter(pk=instance.question_id).values_list('video__section__course_id', flat=True).first()
+    )
+    bump_versions(course_scope(course_id))
+
+
+@receiver([post_save, post_delete], sender=CourseRating)
+def invalidate_rating_cache(sender, instance, **kwargs):
+    bump_versions('catalog', course_scope(instance.course_id))
+
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_document(course_document(instance))
+
+
+@receiver(post_save, sender=Section)
+def index_section(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_document(section_document(instance))
+
+
+@receiver(post_delete, sender=Section)
+def unindex_section(sender, instance, **kwargs):
+    remove_document('section', instance.pk)
+
+
+@receiver(post_save, sender=Video)
+def index_video(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_document(video_document(instance, _section_course_id(instance.section_id)))
+
+
+@receiver(post_delete, sender=Video)
+def unindex_video(sender, instance, **kwargs):
+    remove_document('video', instance.pk)
+
+
+@receiver(post_save, sender=Course)
+def typeahead_course_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: typeahead.update_course(instance))
+
+
+@receiver(post_delete, sender=Course)
+def typeahead_course_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: typeahead.update_course(instance, deleted=True))
+
+
+@receiver(post_save, sender=Teacher)
+def typeahead_teacher_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: typeahead.update_teacher(instance))
+
+
+@receiver(post_delete, sender=Teacher)
+def typeahead_teacher_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: typeahead.update_teacher(instance, deleted=True))
+
+
+@receiver(post_init, sender=Question)
+def remember_question(sender, instance, **kwargs):
+    instance._quiz_video_id = instance.video_id
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or instance._quiz_video_id != instance.video_id:
+        refresh_quiz_totals(video_ids={instance._quiz_video_id, instance.video_id})
+    instance._quiz_video_id = instance.video_id
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, **kwargs):
+    refresh_quiz_totals(video_ids={instance.video_id})
+
+
+@receiver(post_save, sender=Video)
+def quiz_video_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created and instance._quiz_section_id != instance.section_id and instance.question_count:
+        refresh_quiz_totals(section_ids={instance._quiz_section_id, instance.section_id})
+    instance._quiz_section_id = instance.section_id
+
+
+@receiver(post_delete, sender=Video)
+def quiz_video_deleted(sender, instance, **kwargs):
+    if instance.question_count:
+        refresh_quiz_totals(section_ids={instance.section_id})
+
+
+@receiver(post_save, sender=Section)
+def quiz_section_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_course_id = instance._quiz_course_id
+    if not created and old_course_id != instance.course_id:
+        course_ids = {old_course_id, instance.course_id}
+        transaction.on_commit(lambda: reevaluate_course_completion(course_ids))
+    instance._quiz_course_id = instance.course_id
+
+
+@receiver(post_delete, sender=Section)
+def quiz_section_deleted(sender, instance, **kwargs):
+    # kurs bilan birga o'chirilganda commitdan keyin hech narsa qolmaydi
+    course_ids = {instance.course_id}
+    transaction.on_commit(lambda: reevaluate_course_completion(course_ids))
+
+
+@receiver(post_init, sender=QuestionResult)
+def remember_question_result(sender, instance, **kwargs):
+    instance._passed_state = instance.is_passed
+
+
+@receiver(post_save, sender=QuestionResult)
+def question_result_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_passed = False if created else instance._passed_state
+    if was_passed != instance.is_passed:
+        video = Video.objects.select_related('section').filter(question__pk=instance.question_id).first()
+        if video is not None:
+            apply_question_results(instance.user_id, video, 1 if instance.is_passed else -1)
+    instance._passed_state = instance.is_passed
+
+
+@receiver(post_delete, sender=QuestionResult)
+def question_result_deleted(sender, instance, **kwargs):
+    if instance.is_passed:
+        video = Video.objects.select_related('section').filter(question__pk=instance.question_id).first()
+        if video is not None:
+            apply_question_results(instance.user_id, video, -1)
+
+
+@receiver([post_save, post_delete], sender=QuestionResult)
+def update_progress_bitmap(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    row = Question.objects.filter(pk=instance.question_id).values_list('video_id', 'video__section__course_id').first()
+    if row is not None:
+        mark_video_progress(instance.user_id, *row)
+
+
+@receiver(post_save, sender=Video)
+def link_video_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_section_id, old_position = instance._link_state
+    if created or (old_section_id, old_position) != (instance.section_id, instance.position):
+        course_ids = {_section_course_id(instance.section_id)}
+        if not created and old_section_id != instance.section_id:
+            course_ids.add(_section_course_id(old_section_id))
+        for course_id in course_ids - {None}:
+            transaction.on_commit(lambda course_id=course_id: relink_course_videos(course_id))
+    instance._link_state = (instance.section_id, instance.position)
+
+
+@receiver(post_delete, sender=Video)
+def link_video_deleted(sender, instance, **kwargs):
+    course_id = _section_course_id(instance.section_id)
+    if course_id is not None:
+        transaction.on_commit(lambda: relink_course_videos(course_id))
+
+
+@receiver(post_init, sender=Section)
+def remember_section(sender, instance, **kwargs):
+    instance._link_state = (instance.course_id, instance.position)
+    instance._quiz_course_id = instance.course_id
+
+
+@receiver(post_save, sender=Section)
+def link_section_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    old_course_id, old_position = instance._link_state
+    if (old_course_id, old_position) != (instance.course_id, instance.position):
+        for course_id in {old_course_id, instance.course_id}:
+            transaction.on_commit(lambda course_id=course_id: relink_course_videos(course_id))
+    instance._link_state = (instance.course_id, instance.position)
+
+
+@receiver(post_save, sender=Video)
+def process_video_media(sender, instance, created, raw=False, **kwargs):
+    if raw or not instance.video_file:
+        return
+    if created or instance._media_file != instance.video_file.name:
+        if not created and (instance.hls_playlist or instance.poster or instance.thumbnails_vtt):
+            # eski HLS va thumbnaillar yangi faylga mos emas: tayyor bo'lguncha asl fayl beriladi
+            Video.objects.filter(pk=instance.pk).update(hls_playlist="", poster="", thumbnails_vtt="")
+            instance.hls_playlist = instance.poster = instance.thumbnails_vtt = ""
+        enqueue_video_processing(instance.pk)
+    instance._media_file = instance.video_file.name
+
+
+@receiver(post_delete, sender=Video)
+def remove_video_files(sender, instance, **kwargs):
+    remove_video_media(instance.pk)
+
+
+@receiver(post_save, sender=VideoComment)
+def broadcast_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        publish_comment(instance)
+
+
+def _refresh_likes_count(comment_ids):
+    likes = VideoComment.likes.through.objects.filter(videocomment_id=OuterRef('pk'))
+    VideoComment.objects.filter(pk__in=comment_ids).update(likes_count=Coalesce(
+        Subquery(likes.values('videocomment_id').annotate(count=Count('id')).values('count')), 0
+    ))
+
+
+@receiver(m2m_changed, sender=VideoComment.likes.through)
+def comment_likes_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Like endpointidan tashqari (admin, .likes.add/remove/clear) o'zgarishlarda likes_count qayta sanaladi."""
+    if action == 'pre_clear' and reverse:
+        instance._cleared_comment_ids = list(instance.liked_comment.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            comment_ids = [instance.pk]
+        elif action == 'post_clear':
+            comment_ids = instance._cleared_comment_ids
+        else:
+            comment_ids = pk_set
+        _refresh_likes_count(comment_ids)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def release_user_likes(sender, instance, **kwargs):
+    # through jadvalidagi like qatorlari kaskad bilan o'chadi, signal yubormaydi
+    VideoComment.objects.filter(likes=instance).update(likes_count=Greatest(F('likes_count') - 1, 0))
@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from accounts.models import Enrollment
+from course_progress.completion import reevaluate_quiz_completion
+from course_progress.models import CourseProgress, CourseRating
+from courses.models import Course, CourseStats, Question, Section, Video
+
+
+def compute_course_stats(course_ids):
+    """Berilgan kurslar uchun statistikani manba jadvallardan qayta hisoblaydi."""
+    course_ids = list(Course.objects.filter(pk__in=list(course_ids)).values_list('pk', flat=True))
+    stats = {course_id: CourseStats(course_id=course_id) for course_id in course_ids}
+
+    for row in (
+        Enrollment.objects.filter(course_id__in=course_ids)
+        .values('course_id').annotate(count=Count('id'))
+    ):
+        stats[row['course_id']].enrolled_count = row['count']
+
+    for row in (
+        CourseProgress.objects.filter(course_id__in=course_ids)
+        .values('course_id')
+        .annotate(count=Count('id'), completed=Count('id', filter=Q(is_complete=True)))
+    ):
+        stats[row['course_id']].progress_count = row['count']
+        stats[row['course_id']].completed_count = row['completed']
+
+    for row in (
+        CourseRating.objects.filter(course_id__in=course_ids)
+        .values('course_id')
+        .annotate(total=Sum('rating'), count=Count('id'), avg=Avg('rating'))
+    ):
+        item = stats[row['course_id']]
+        item.rating_sum = row['total'] or Decimal('0')
+        item.rating_count = row['count']
+        item.rating_avg = float(row['avg'] or 0)
+
+    for row in (
+        Video.objects.filter(section__course_id__in=course_ids)
+        .values('section__course_id')
+        .annotate(count=Count('id'), total=Sum('duration_seconds'))
+    ):
+        stats[row['section__course_id']].lesson_count = row['count']
+        stats[row['section__course_id']].total_duration = row['total'] or 0
+
+    now = timezone.now()
+    for item in stats.values():
+        item.updated_at = now
+    return list(stats.values())
+
+
+def save_course_stats(items):
+    CourseStats.objects.bulk_create(
+        items,
+        update_conflicts=True,
+        unique_fields=['course'],
+        update_fields=[
+            'enrolled_count', 'progress_count', 'completed_count', 'rating_sum',
+            'rating_count', 'rating_avg', 'lesson_count', 'total_duration', 'updated_at',
+        ],
+    )
+
+
+def refresh_course_stats(course_id):
+    save_course_stats(compute_course_stats([course_id]))
+
+
+def bump_course_stats(course_id, create_missing=True, **deltas):
+    """
+    Statistik hisoblagichlarni F() orqali atomar o'zgartiradi.
+    Qator hali mavjud bo'lmasa, u manba jadvallardan yaratiladi
+    (o'chirish signallarida create_missing=False beriladi, chunki kurs
+    kaskad bilan o'chirilayotgan bo'lishi mumkin).
+    """
+    if not course_id:
+        return
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    updates = {name: F(name) + delta for name, delta in deltas.items()}
+    if 'rating_sum' in deltas or 'rating_count' in deltas:
+        new_sum = F('rating_sum') + deltas.get('rating_sum', 0)
+        new_count = F('rating_count') + deltas.get('rating_count', 0)
+        updates['rating_avg'] = Case(
+            When(
+                GreaterThan(new_count, 0),
+                then=Cast(new_sum, FloatField()) / Cast(new_count, FloatField()),
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    updates['updated_at'] = timezone.now()
+
+    with transaction.atomic():
+        updated = CourseStats.objects.filter(course_id=course_id).update(**updates)
+        if not updated and create_missing:
+            refresh_course_stats(course_id)
+
+
+def _count_subquery(queryset, field):
+    return Coalesce(Subquery(queryset.values(field).annotate(count=Count('id')).values('count')), 0)
+
+
+def refresh_quiz_totals(video_ids=(), section_ids=()):
+    """
+    Video.question_count va Section.quiz_video_count (savoli bor videolar soni) ni
+    COUNT subquery bilan qayta yozadi. Savol qo'shilganda/o'chirilganda yoki video
+    boshqa sectionga ko'chirilganda (signal yoki reorder endpointi) chaqiriladi.
+    """
+    video_ids = {video_id for video_id in video_ids if video_id}
+    section_ids = {section_id for section_id in section_ids if section_id}
+    if video_ids:
+        Video.objects.filter(pk__in=video_ids).update(
+            question_count=_count_subquery(Question.objects.filter(video=OuterRef('pk')), 'video')
+        )
+        section_ids.update(Video.objects.filter(pk__in=video_ids).values_list('section_id', flat=True))
+    if section_ids:
+        Section.objects.filter(pk__in=section_ids).update(
+            quiz_video_count=_count_subquery(
+                Video.objects.filter(section=OuterRef('pk'), question_count__gt=0), 'section'
+            )
+        )
+        # jami kamaysa, unga yetib qolgan foydalanuvchilar shu yerda yakunlanadi
+        reevaluate_quiz_completion(video_ids, section_ids)
+
+
+def get_course_stats(course):
+    """select_related('stats') bilan yuklangan statistikani qaytaradi, bo'lmasa None."""
+    try:
+        return course.stats
+    except CourseStats.DoesNotExist:
+        return None
@@ -0,0 +1,62 @@
+import mimetypes
+import posixpath
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+SIGNING_SALT = 'courses.streaming'
+
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/mp2t', '.ts')
+
+
+def _signature(scope, expires):
+    return salted_hmac(SIGNING_SALT, f"{expires}:{scope}", algorithm='sha256').hexdigest()[:32]
+
+
+def is_safe_path(path):
+    return bool(path) and not path.startswith('/') and posixpath.normpath(path) == path and '..' not in path.split('/')
+
+
+def public_media_url(request, name):
+    """Imzosiz (kontent hashli, muddatsiz keshlanadigan) media fayl URL'i."""
+    if not name:
+        return None
+    return request.build_absolute_uri(settings.MEDIA_URL + quote(name))
+
+
+def signed_stream_url(request, name, ttl=None, directory=False):
+    """
+    MEDIA_ROOT ichidagi fayl uchun muddati cheklangan imzolangan URL.
+    directory=True bo'lsa imzo faylning papkasini qamraydi (p<chuqurlik>.<imzo>),
+    shunda HLS playlistdagi nisbiy segment URL'lari ham shu imzo bilan ochiladi.
+    """
+    expires = int(time.time()) + (ttl or settings.STREAM_URL_TTL)
+    if directory:
+        parts = name.split('/')[:-1]
+        signature = f"p{len(parts)}.{_signature('dir:' + '/'.join(parts) + '/', expires)}"
+    else:
+        signature = _signature(name, expires)
+    url = reverse('stream-media', kwargs={'expires': expires, 'signature': signature, 'path': name})
+    return request.build_absolute_uri(url)
+
+
+def verify_stream_signature(path, expires, signature):
+    """Imzo va muddatni tekshiradi. Bazaga murojaat qilinmaydi."""
+    if expires < time.time() or not is_safe_path(path):
+        return False
+    if signature.startswith('p') and '.' in signature:
+        depth, _, signature = signature[1:].partition('.')
+        parts = path.split('/')
+        if not depth.isdigit() or not 0 < int(depth) < len(parts):
+            return False
+        scope = 'dir:' + '/'.join(parts[:int(depth)]) + '/'
+        return constant_time_compare(_signature(scope, expires), signature)
+    return constant_time_compare(_signature(path, expires), signature)
+
+
+def x_accel_location(path):
+    return settings.STREAM_X_ACCEL_PREFIX + quote(path)
@@ -1,3 +1,557 @@
-from django.test import TestCase
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser, Teacher
+from course_progress.models import QuestionResult
+from courses import realtime
+from courses.analytics import RedisCounters, rollup_video_stats
+from courses.models import (
+    Answer, Course, CourseCategory, Question, Section, UploadSession, Video, VideoComment, VideoDailyStats
+)
+from courses.progress import relink_course_videos
+from courses.streaming import signed_stream_url
+from courses.uploads import part_path
+from courses.realtime import LocalBroker, video_channel
+from courses.views import events_view
+from courses.views.upload_view import UPLOAD_CONTENT_TYPE
+
+
+class LocalBrokerTests(TestCase):
+
+    def test_dispatch_from_another_thread_reaches_subscriber(self):
+        async def scenario():
+            broker = LocalBroker()
+            queue = broker.subscribe('channel')
+            await asyncio.get_running_loop().run_in_executor(None, broker.dispatch, 'channel', 'frame')
+            return await asyncio.wait_for(queue.get(), 1)
+
+        self.assertEqual(asyncio.run(scenario()), 'frame')
+
+    def test_unsubscribe_removes_empty_channel(self):
+        async def scenario():
+            broker = LocalBroker()
+            queue = broker.subscribe('channel')
+            broker.unsubscribe('channel', queue)
+            broker.dispatch('channel', 'frame')
+            await asyncio.sleep(0)
+            return broker._subscribers, queue.qsize()
+
+        self.assertEqual(asyncio.run(scenario()), ({}, 0))
+
+    def test_full_queue_drops_frames(self):
+        async def scenario():
+            broker = LocalBroker()
+            queue = broker.subscribe('channel')
+            for index in range(realtime.SUBSCRIBER_QUEUE_SIZE + 5):
+                broker.dispatch('channel', str(index))
+            await asyncio.sleep(0)
+            return queue.qsize(), queue.get_nowait()
+
+        self.assertEqual(asyncio.run(scenario()), (realtime.SUBSCRIBER_QUEUE_SIZE, '0'))
+
+
+def create_course(name='Python', sections=1, videos=1):
+    category, _ = CourseCategory.objects.get_or_create(
+        name_en='c', defaults={'name_uz': 'c', 'name_ru': 'c', 'description_en': 'd', 'description_uz': 'd',
+                               'description_ru': 'd'}
+    )
+    teacher, _ = Teacher.objects.get_or_create(
+        phone_number='+998900000001', defaults={'first_name': 'Ali', 'last_name': 'Valiyev', 'specialization': 'py'}
+    )
+    course = Course.objects.create(
+        name_en=name, name_uz=name, name_ru=name, description_en='d', description_uz='d',
+        description_ru='d', price=Decimal('100.00'), discount='10%', duration='10:00', category=category,
+        instructor=teacher, status='boshlangich'
+    )
+    for section_index in range(sections):
+        section = Section.objects.create(course=course, title_en='s', title_uz='s', title_ru='s', duration='1:00')
+        for video_index in range(videos):
+            Video.objects.create(
+                section=section, title_en='v', title_uz='v', title_ru='v', duration='02:30',
+                video_file=f'videos/v{course.pk}_{section_index}_{video_index}.mp4'
+            )
+    return course
+
+
+def create_user(phone_number='+998900000002'):
+    return CustomUser.objects.create(first_name='U', last_name='S', phone_number=phone_number)
+
+
+def collect_pages(client, url):
+    """next havolalari bo'ylab yurib, barcha sahifalardagi id larni qaytaradi."""
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.content
+        data = response.json()
+        ids.extend(item['id'] for item in data['results'])
+        url = data['next']
+    return ids
+
+
+@mock.patch('courses.realtime.redis_connection', return_value=None)
+class CommentEventsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.video = Video.objects.get(section__course=create_course())
+        cls.user = create_user()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_comment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f'/uz/api/course/add_video_comment/{self.video.pk}/', {'text': 'salom'}).json()
+
+    def like_comment(self, comment_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f'/uz/api/course/like_comment/{comment_id}/').json()
+
+    def test_comment_and_like_are_published(self, _):
+        with mock.patch.object(realtime.broker, 'dispatch') as dispatch:
+            comment = self.add_comment()
+            self.like_comment(comment['id'])
+
+        (comment_channel, comment_frame), (likes_channel, likes_frame) = [call.args for call in dispatch.call_args_list]
+        self.assertEqual(comment_channel, video_channel(self.video.pk))
+        self.assertTrue(comment_frame.startswith('event: comment\n'))
+        self.assertIn('"text": "salom"', comment_frame)
+        self.assertEqual(likes_channel, video_channel(self.video.pk))
+        self.assertEqual(likes_frame, f'event: likes\ndata: {{"id": {comment["id"]}, "likes_count": 1}}\n\n')
+
+    def test_publish_waits_for_commit(self, _):
+        with mock.patch.object(realtime.broker, 'dispatch') as dispatch:
+            with self.captureOnCommitCallbacks(execute=False):
+                VideoComment.objects.create(user=self.user, video=self.video, text='x')
+        dispatch.assert_not_called()
+
+    async def test_stream_delivers_events_to_subscriber(self, _):
+        response = await self.async_client.get(f'/events/videos/{self.video.pk}/comments/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), f'retry: {events_view.RETRY_MILLISECONDS}\n\n'.encode())
+        comment = await sync_to_async(self.add_comment)()
+        await sync_to_async(self.like_comment)(comment['id'])
+
+        comment_frame = await asyncio.wait_for(anext(stream), 1)
+        likes_frame = await asyncio.wait_for(anext(stream), 1)
+        self.assertTrue(comment_frame.startswith(b'event: comment\n'))
+        self.assertTrue(likes_frame.startswith(b'event: likes\n'))
+        await stream.aclose()
+
+    async def test_stream_sends_keepalive(self, _):
+        with mock.patch.object(events_view, 'KEEPALIVE_SECONDS', 0.01):
+            response = await self.async_client.get(f'/events/videos/{self.video.pk}/comments/')
+            stream = aiter(response.streaming_content)
+            await anext(stream)
+            self.assertEqual(await asyncio.wait_for(anext(stream), 1), b': keepalive\n\n')
+            await stream.aclose()
+
+    async def test_stream_for_missing_video_is_404(self, _):
+        response = await self.async_client.get('/events/videos/999999/comments/')
+        self.assertEqual(response.status_code, 404)
+
+
+# ["abc", "x"]: to'g'ri base64/JSON, lekin qiymat va pk turi noto'g'ri
+MALFORMED_CURSOR = 'WyJhYmMiLCAieCJd'
+
+
+class CatalogPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.course_ids = [create_course(f'Python {index}', sections=0).pk for index in range(5)]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_malformed_cursor_is_400(self):
+        for sort in ('newest', 'rating', 'popular', 'price', 'duration'):
+            for cursor in (MALFORMED_CURSOR, 'bm90LWpzb24', 'W251bGwsIDFd'):
+                response = self.client.get('/uz/api/course/get_all_courses/', {'sort': sort, 'cursor': cursor})
+                self.assertEqual(response.status_code, 400, (sort, cursor))
+                self.assertIn('cursor', response.json())
+
+    def test_ties_are_split_across_pages_by_id(self):
+        Course.objects.update(created_at=timezone.now())
+        for sort in ('newest', 'rating', 'duration'):
+            ids = collect_pages(self.client, f'/uz/api/course/get_all_courses/?sort={sort}&page_size=2')
+            expected = sorted(self.course_ids, reverse=sort != 'duration')
+            self.assertEqual(ids, expected, sort)
+
+
+class CommentPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.video = Video.objects.get(section__course=create_course())
+        user = create_user()
+        cls.comment_ids = [
+            VideoComment.objects.create(user=user, video=cls.video, text=str(index)).pk for index in range(5)
+        ]
+        VideoComment.objects.update(created_at=timezone.now())
+
+    def test_malformed_cursor_is_400(self):
+        response = self.client.get(
+            f'/uz/api/course/get_all_video_comments/{self.video.pk}/', {'cursor': MALFORMED_CURSOR}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cursor', response.json())
+
+    def test_ties_are_split_across_pages_by_id(self):
+        ids = collect_pages(self.client, f'/uz/api/course/get_all_video_comments/{self.video.pk}/?page_size=2')
+        self.assertEqual(ids, sorted(self.comment_ids, reverse=True))
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.section = Section.objects.get(course=create_course(videos=2))
+        Video.objects.update(is_preview=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_validator_is_etag_only(self):
+        response = self.client.get(f'/uz/api/course/get_video/{self.section.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(
+            self.client.get(f'/uz/api/course/get_video/{self.section.pk}/',
+                            HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304
+        )
+        self.assertEqual(
+            self.client.get(f'/uz/api/course/get_video/{self.section.pk}/',
+                            HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT').status_code,
+            200
+        )
+
+    def test_delete_changes_etag(self):
+        etag = self.client.get(f'/uz/api/course/get_video/{self.section.pk}/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Video.objects.filter(section=self.section).order_by('id').last().delete()
+        response = self.client.get(f'/uz/api/course/get_video/{self.section.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+
+
+class RedisRollupTests(TestCase):
+
+    def test_expired_day_keeps_stored_totals(self):
+        video = Video.objects.get(section__course=create_course())
+        expired, today = date(2026, 10, 1), date(2026, 10, 18)
+        VideoDailyStats.objects.create(video=video, date=expired, plays=7, unique_viewers=3, completions=2)
+        redis = mock.MagicMock()
+        redis.spop.side_effect = [[f'{expired}:{video.pk}'.encode(), f'{today}:{video.pk}'.encode()], []]
+        # har bir (kun, video) uchun: EXISTS, GET plays, PFCOUNT viewers, PFCOUNT completions
+        redis.pipeline.return_value.execute.return_value = [0, None, 0, 0, 2, b'5', 4, 0]
+
+        self.assertEqual(rollup_video_stats(RedisCounters(redis)), 1)
+        self.assertEqual(
+            sorted(VideoDailyStats.objects.values_list('date', 'plays', 'unique_viewers', 'completions')),
+            [(expired, 7, 3, 2), (today, 5, 4, 0)]
+        )
+        redis.sadd.assert_not_called()
+
+
+class CommentLikeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        video = Video.objects.get(section__course=create_course())
+        cls.user = create_user()
+        cls.comment = VideoComment.objects.create(user=cls.user, video=video, text='salom')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def like(self):
+        response = self.client.post(f'/uz/api/course/like_comment/{self.comment.pk}/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['liked'], data['likes_count']
+
+    def likes_count(self):
+        return VideoComment.objects.values_list('likes_count', flat=True).get(pk=self.comment.pk)
+
+    def test_toggle_twice(self):
+        self.assertEqual(self.like(), (True, 1))
+        self.assertEqual(self.like(), (False, 0))
+        self.assertEqual(self.like(), (True, 1))
+        self.assertEqual(self.comment.likes.count(), 1)
+
+    def test_concurrent_duplicate_like_is_counted_once(self):
+        # parallel so'rov DELETE dan keyin, INSERT dan oldin like qo'ygan: INSERT unique xatoga uchraydi
+        self.comment.likes.add(self.user)
+        likes = VideoComment.likes.through.objects
+        missed_delete = mock.Mock(**{'delete.return_value': (0, {})})
+        with mock.patch.object(likes, 'filter', return_value=missed_delete):
+            self.assertEqual(self.like(), (True, 1))
+        self.assertEqual((self.comment.likes.count(), self.likes_count()), (1, 1))
+
+    def test_m2m_changes_recount(self):
+        other = create_user('+998900000003')
+        self.comment.likes.add(self.user, other)
+        self.assertEqual(self.likes_count(), 2)
+        other.liked_comment.remove(self.comment)
+        self.assertEqual(self.likes_count(), 1)
+        self.user.liked_comment.clear()
+        self.assertEqual(self.likes_count(), 0)
+
+    def test_deleted_user_releases_like(self):
+        other = create_user('+998900000003')
+        self.comment.likes.add(self.user, other)
+        other.delete()
+        self.assertEqual(self.likes_count(), 1)
+
+
+class TemporaryMediaMixin:
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ResumableUploadTests(TemporaryMediaMixin, TestCase):
+    content = b'0123456789'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.section = Section.objects.get(course=create_course(videos=0))
+        cls.user = create_user()
+        cls.user.is_staff = True
+        cls.user.save()
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/uz/api/course/uploads/', {
+            'filename': 'dars 1.mp4', 'size': len(self.content), 'section': self.section.pk,
+            'title_uz': 'v', 'title_en': 'v', 'title_ru': 'v', 'duration': '02:30',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.url = f"/uz/api/course/uploads/{response.json()['id']}/"
+        self.session = UploadSession.objects.get(pk=response.json()['id'])
+
+    def send(self, offset, chunk):
+        return self.client.generic(
+            'PATCH', self.url, chunk, content_type=UPLOAD_CONTENT_TYPE, HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_offset_mismatch_is_409(self):
+        response = self.send(5, self.content[5:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '0')
+
+        self.assertEqual(self.send(0, self.content[:4]).status_code, 204)
+        response = self.send(0, self.content[:4])
+        self.assertEqual((response.status_code, response['Upload-Offset']), (409, '4'))
+
+    def test_resume_from_head_offset(self):
+        self.assertEqual(self.send(0, self.content[:4])['Upload-Offset'], '4')
+
+        response = self.client.head(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response['Upload-Offset'], response['Upload-Length']), ('4', '10'))
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+        response = self.send(int(response['Upload-Offset']), self.content[4:])
+        self.assertEqual((response.status_code, response['Upload-Offset']), (204, '10'))
+
+    def test_final_chunk_moves_file_into_place(self):
+        self.send(0, self.content[:6])
+        self.assertFalse(Video.objects.exists())
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.send(6, self.content[6:])
+
+        self.session.refresh_from_db()
+        video = self.session.video
+        self.assertEqual((self.session.state, video.section_id, video.duration_seconds), ('completed', self.section.pk, 150))
+        self.assertTrue(video.video_file.name.startswith('videos/'))
+        self.assertTrue(video.video_file.name.endswith('_dars_1.mp4'))
+        with video.video_file.open('rb') as uploaded:
+            self.assertEqual(uploaded.read(), self.content)
+        self.assertFalse(os.path.exists(part_path(self.session)))
+        self.assertTrue(callbacks, "HLS jobi commitdan keyin navbatga qo'yilishi kerak")
+        self.assertEqual(self.send(10, b'x').status_code, 409)
+
+    def test_delete_cleans_up(self):
+        self.send(0, self.content[:4])
+        self.assertTrue(os.path.exists(part_path(self.session)))
+
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertFalse(os.path.exists(part_path(self.session)))
+        self.assertFalse(UploadSession.objects.filter(pk=self.session.pk).exists())
+        self.assertEqual(self.client.head(self.url).status_code, 404)
+
+
+class SignedStreamTests(TemporaryMediaMixin, TestCase):
+
+    def sign(self, name, **kwargs):
+        return signed_stream_url(RequestFactory().get('/'), name, **kwargs)
+
+    def swap_path(self, url, path):
+        # http://testserver/stream/<expires>/<signature>/ saqlanadi, fayl yo'li almashtiriladi
+        return '/'.join(url.split('/')[:6] + [path])
+
+    @override_settings(STREAM_USE_X_ACCEL=True)
+    def test_x_accel_redirect(self):
+        response = self.client.get(self.sign('hls/5/index.m3u8'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/hls/5/index.m3u8')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apple.mpegurl')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(response.content, b'')
+
+    @override_settings(STREAM_USE_X_ACCEL=False)
+    def test_file_served_without_x_accel(self):
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'videos'))
+        with open(os.path.join(settings.MEDIA_ROOT, 'videos', 'dars.mp4'), 'wb') as video:
+            video.write(b'video')
+        response = self.client.get(self.sign('videos/dars.mp4'))
+        self.assertEqual((response.status_code, b''.join(response.streaming_content)), (200, b'video'))
+        self.assertNotIn('X-Accel-Redirect', response)
+
+    def test_expired_link_is_403(self):
+        url = self.sign('videos/dars.mp4')
+        with mock.patch('courses.streaming.time.time', return_value=time.time() + settings.STREAM_URL_TTL + 1):
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+    @override_settings(STREAM_USE_X_ACCEL=True)
+    def test_tampered_path_is_403(self):
+        url = self.sign('videos/dars.mp4')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        for path in ('videos/boshqa.mp4', 'videos/../secret.py', 'hls/5/index.m3u8'):
+            self.assertEqual(self.client.get(self.swap_path(url, path)).status_code, 403, path)
+
+    @override_settings(STREAM_USE_X_ACCEL=True)
+    def test_hls_signature_covers_playlist_directory(self):
+        url = self.sign('hls/5/index.m3u8', directory=True)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        segment = self.client.get(self.swap_path(url, 'hls/5/720p/segment_001.ts'))
+        self.assertEqual(segment.status_code, 200)
+        self.assertEqual(segment['X-Accel-Redirect'], '/protected-media/hls/5/720p/segment_001.ts')
+        for path in ('hls/6/index.m3u8', 'hls/5/../6/index.m3u8', 'videos/dars.mp4'):
+            self.assertEqual(self.client.get(self.swap_path(url, path)).status_code, 403, path)
+
+
+class VideoLinkTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+        cls.user.is_staff = True
+        cls.user.save()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = create_course(sections=2, videos=2)
+            for video in Video.objects.all():
+                question = Question.objects.create(
+                    video=video, question_text_en='q', question_text_uz='q', question_text_ru='q'
+                )
+                Answer.objects.create(
+                    question=question, answer_text_en='a', answer_text_uz='a', answer_text_ru='a', is_correct=True
+                )
+        self.sections = list(Section.objects.filter(course=self.course).order_by('position', 'id'))
+        self.videos = list(Video.objects.order_by('section__position', 'section_id', 'position', 'id'))
+
+    def chain(self):
+        return dict(Video.objects.values_list('id', 'previous_video_id'))
+
+    def expected_chain(self, ordered_ids):
+        return dict(zip(ordered_ids, [None] + ordered_ids[:-1]))
+
+    def reorder(self, layout):
+        response = self.client.post(f'/uz/api/course/reorder_curriculum/{self.course.pk}/', {'sections': [
+            {'id': section.pk, 'videos': [video.pk for video in videos]} for section, videos in layout
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def video_url(self, video):
+        response = self.client.get(f'/uz/api/course/get_video_url/{video.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def pass_video(self, video):
+        with self.captureOnCommitCallbacks(execute=True):
+            QuestionResult.objects.create(user=self.user, question=video.question_set.get(), is_passed=True)
+
+    def test_links_follow_creation_order(self):
+        self.assertEqual(self.chain(), self.expected_chain([video.pk for video in self.videos]))
+
+    def test_relink_after_reorder(self):
+        first, second, third, fourth = self.videos
+        self.reorder([(self.sections[1], [fourth, first]), (self.sections[0], [third, second])])
+        self.assertEqual(self.chain(), self.expected_chain([fourth.pk, first.pk, third.pk, second.pk]))
+
+    def test_relink_after_delete(self):
+        first, second, third, fourth = self.videos
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.chain(), self.expected_chain([first.pk, third.pk, fourth.pk]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sections[1].delete()
+        self.assertEqual(self.chain(), {first.pk: None})
+
+    def test_relink_repairs_stale_pointers(self):
+        Video.objects.update(previous_video=None)
+        relink_course_videos(self.course.pk)
+        self.assertEqual(self.chain(), self.expected_chain([video.pk for video in self.videos]))
+
+    def test_video_url_gated_on_previous_video(self):
+        first, second = self.videos[:2]
+        self.assertIn('video_url', self.video_url(first))
+
+        locked = self.video_url(second)
+        self.assertNotIn('video_url', locked)
+        self.assertEqual(locked['detail'], "Previous video test not completed.")
+        self.assertEqual([question['id'] for question in locked['questions']], [first.question_set.get().pk])
+
+        self.pass_video(first)
+        self.assertEqual(self.video_url(second)['video_id'], second.pk)
+
+    def test_bitmap_follows_reorder(self):
+        first, second, third, fourth = self.videos
+        self.assertNotIn('video_url', self.video_url(second))
+        self.reorder([(self.sections[0], [second, first]), (self.sections[1], [third, fourth])])
+        self.assertIn('video_url', self.video_url(second))
+        self.assertNotIn('video_url', self.video_url(first))
+
+    def test_bitmap_drops_deleted_result(self):
+        first, second = self.videos[:2]
+        self.pass_video(first)
+        self.assertIn('video_url', self.video_url(second))
+        with self.captureOnCommitCallbacks(execute=True):
+            QuestionResult.objects.get(user=self.user).delete()
+        self.assertNotIn('video_url', self.video_url(second))
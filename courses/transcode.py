@@ -0,0 +1,158 @@
+"""
+ffmpeg/ffprobe chaqiruvlari. Bu funksiyalar ProcessPoolExecutor ichida
+ishlaydi, shuning uchun Django/bazaga bog'liq emas: faqat fayl yo'llari
+bilan ishlaydi.
+"""
+import json
+import math
+import os
+import subprocess
+
+FFMPEG = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE = os.getenv('FFPROBE_BINARY', 'ffprobe')
+
+HLS_SEGMENT_SECONDS = 6
+
+# (nom, balandlik, video bitrate, audio bitrate)
+HLS_RENDITIONS = (
+    ('360p', 360, 800_000, 96_000),
+    ('480p', 480, 1_400_000, 128_000),
+    ('720p', 720, 2_800_000, 128_000),
+    ('1080p', 1080, 5_000_000, 192_000),
+)
+
+# Seek-preview sprite: har THUMBNAIL_INTERVAL soniyada bitta kadr, ko'pi bilan THUMBNAIL_MAX_TILES ta
+THUMBNAIL_INTERVAL = 5
+THUMBNAIL_MAX_TILES = 200
+THUMBNAIL_WIDTH = 160
+THUMBNAIL_COLUMNS = 10
+POSTER_HEIGHT = 720
+
+
+class TranscodeError(Exception):
+    pass
+
+
+def _run(command, timeout=None):
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        raise TranscodeError(f"{command[0]}: {exc}") from exc
+    if completed.returncode != 0:
+        raise TranscodeError(completed.stderr.strip()[-2000:] or f"{command[0]} exited with {completed.returncode}")
+    return completed.stdout
+
+
+def probe(source):
+    """Video o'lchamlari, davomiyligi va audio bor-yo'qligi."""
+    output = _run([
+        FFPROBE, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', source
+    ], timeout=120)
+    data = json.loads(output or '{}')
+    streams = data.get('streams', [])
+    video = next((stream for stream in streams if stream.get('codec_type') == 'video'), None)
+    if video is None:
+        raise TranscodeError("Faylda video oqimi topilmadi.")
+    return {
+        'width': int(video.get('width') or 0),
+        'height': int(video.get('height') or 0),
+        'duration': float(data.get('format', {}).get('duration') or video.get('duration') or 0),
+        'has_audio': any(stream.get('codec_type') == 'audio' for stream in streams),
+    }
+
+
+def select_renditions(source_height):
+    """Manbadan balandroq renditionlar tashlanadi, lekin eng pasti har doim qoladi."""
+    renditions = [rendition for rendition in HLS_RENDITIONS if rendition[1] <= source_height]
+    return renditions or [HLS_RENDITIONS[0]]
+
+
+def transcode_rendition(source, output_dir, rendition, has_audio):
+    """Bitta rendition uchun <output_dir>/<nom>/index.m3u8 va segmentlarni yaratadi."""
+    name, height, video_bitrate, audio_bitrate = rendition
+    target = os.path.join(output_dir, name)
+    os.makedirs(target, exist_ok=True)
+    command = [
+        FFMPEG, '-y', '-v', 'error', '-i', source,
+        '-map', '0:v:0', '-vf', f'scale=-2:{height}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main', '-pix_fmt', 'yuv420p',
+        '-b:v', str(video_bitrate), '-maxrate', str(int(video_bitrate * 1.07)),
+        '-bufsize', str(video_bitrate * 2),
+        '-g', str(HLS_SEGMENT_SECONDS * 24), '-keyint_min', str(HLS_SEGMENT_SECONDS * 24), '-sc_threshold', '0',
+    ]
+    if has_audio:
+        command += ['-map', '0:a:0', '-c:a', 'aac', '-b:a', str(audio_bitrate), '-ac', '2']
+    command += [
+        '-f', 'hls', '-hls_time', str(HLS_SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', os.path.join(target, 'seg_%04d.ts'),
+        os.path.join(target, 'index.m3u8'),
+    ]
+    _run(command)
+    return name
+
+
+def write_master_playlist(output_dir, renditions, source_width, source_height, has_audio):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for name, height, video_bitrate, audio_bitrate in renditions:
+        width = round(source_width * height / source_height / 2) * 2 if source_height else 0
+        bandwidth = video_bitrate + (audio_bitrate if has_audio else 0)
+        codecs = 'avc1.4d401f,mp4a.40.2' if has_audio else 'avc1.4d401f'
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height},CODECS="{codecs}"')
+        lines.append(f'{name}/index.m3u8')
+    path = os.path.join(output_dir, 'master.m3u8')
+    with open(path, 'w') as playlist:
+        playlist.write('\n'.join(lines) + '\n')
+    return path
+
+
+def extract_poster(source, target, duration):
+    """Videoning ~10% joyidagi kadrdan poster (jpg) yasaydi."""
+    at = min(duration * 0.1, 10) if duration else 0
+    _run([
+        FFMPEG, '-y', '-v', 'error', '-ss', f'{at:.2f}', '-i', source,
+        '-frames:v', '1', '-vf', f"scale=-2:'min({POSTER_HEIGHT},ih)'", '-q:v', '3', target,
+    ], timeout=120)
+    return target
+
+
+def sprite_layout(duration, width, height):
+    """(interval, kadrlar soni, ustunlar, qatorlar, kadr eni, kadr bo'yi)"""
+    interval = max(THUMBNAIL_INTERVAL, math.ceil(duration / THUMBNAIL_MAX_TILES)) if duration else THUMBNAIL_INTERVAL
+    count = max(math.ceil(duration / interval), 1)
+    columns = min(count, THUMBNAIL_COLUMNS)
+    rows = math.ceil(count / columns)
+    tile_height = round(THUMBNAIL_WIDTH * height / width / 2) * 2 if width else THUMBNAIL_WIDTH * 9 // 16
+    return interval, count, columns, rows, THUMBNAIL_WIDTH, tile_height
+
+
+def build_sprite(source, target, layout):
+    """Barcha preview kadrlarni bitta jpg panelga (tile filter) yig'adi."""
+    interval, count, columns, rows, tile_width, tile_height = layout
+    _run([
+        FFMPEG, '-y', '-v', 'error', '-i', source, '-an',
+        '-vf', f'fps=1/{interval},scale={tile_width}:{tile_height},tile={columns}x{rows}',
+        '-frames:v', '1', '-q:v', '5', target,
+    ])
+    return target
+
+
+def _vtt_timestamp(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f'{hours:02d}:{minutes:02d}:{seconds:06.3f}'
+
+
+def write_sprite_vtt(path, sprite_name, layout, duration):
+    """Har bir vaqt oralig'ini sprite ichidagi kadrga (#xywh) bog'laydigan WebVTT."""
+    interval, count, columns, rows, tile_width, tile_height = layout
+    lines = ['WEBVTT', '']
+    for index in range(count):
+        start = index * interval
+        end = min(start + interval, duration) if duration else start + interval
+        x, y = index % columns * tile_width, index // columns * tile_height
+        lines.append(f'{_vtt_timestamp(start)} --> {_vtt_timestamp(max(end, start))}')
+        lines.append(f'{sprite_name}#xywh={x},{y},{tile_width},{tile_height}')
+        lines.append('')
+    with open(path, 'w') as vtt:
+        vtt.write('\n'.join(lines))
+    return path
@@ -0,0 +1,173 @@
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+
+from accounts.models import Teacher
+from courses.models import Course
+
+GENERATION_KEY = 'typeahead:generation'
+GENERATION_CHECK_INTERVAL = 5
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.casefold().split())
+
+
+def _word_keys(text):
+    """Nomning har bir so'zidan boshlanadigan kalitlar: 'python kursi' -> ['python kursi', 'kursi']."""
+    words = normalize(text).split(' ')
+    return {' '.join(words[index:]) for index in range(len(words)) if words[index]}
+
+
+class PrefixIndex:
+    """
+    Kurs nomlari (uz/en/ru) va o'qituvchi ismlari bo'yicha prefiks qidiruvi uchun
+    xotiradagi saralangan massiv. Har bir element (kalit, tur, id) ko'rinishida,
+    qidiruv bisect bilan O(log n + k) vaqtda bajariladi.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []
+        self._labels = {}
+        self._entry_keys = {}
+        self.generation = None
+        self.built_at = None
+        self.build_seconds = None
+        self._checked_at = 0
+
+    def build(self):
+        started = time.perf_counter()
+        keys, labels, entry_keys = [], {}, {}
+
+        def collect(entry, label, names):
+            labels[entry] = label
+            entry_keys[entry] = set().union(*(_word_keys(name) for name in names))
+            keys.extend((key, entry) for key in entry_keys[entry])
+
+        for pk, name_uz, name_en, name_ru in Course.objects.values_list('pk', 'name_uz', 'name_en', 'name_ru'):
+            collect(('course', str(pk)), {'uz': name_uz, 'en': name_en, 'ru': name_ru}, [name_uz, name_en, name_ru])
+        for pk, first_name, last_name in Teacher.objects.values_list('pk', 'first_name', 'last_name'):
+            full_name = f"{first_name} {last_name}"
+            collect(('instructor', str(pk)), {'uz': full_name, 'en': full_name, 'ru': full_name}, [full_name])
+        keys.sort()
+
+        with self._lock:
+            self._keys, self._labels, self._entry_keys = keys, labels, entry_keys
+            self.generation = cache.get(GENERATION_KEY)
+            self.built_at = time.time()
+            self.build_seconds = time.perf_counter() - started
+            self._checked_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if self.built_at is None:
+            self.build()
+            return
+        now = time.monotonic()
+        if now - self._checked_at < GENERATION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        if cache.get(GENERATION_KEY) != self.generation:
+            self.build()
+
+    def _remove(self, entry):
+        for key in self._entry_keys.pop(entry, ()):
+            index = bisect_left(self._keys, (key, entry))
+            if index < len(self._keys) and self._keys[index] == (key, entry):
+                del self._keys[index]
+        self._labels.pop(entry, None)
+
+    def update(self, kind, pk, label=None, names=()):
+        """Bitta yozuvni qo'shadi/yangilaydi (label=None bo'lsa o'chiradi)."""
+        entry = (kind, str(pk))
+        with self._lock:
+            if self.built_at is None:
+                _bump_generation(None)
+                return
+            self._remove(entry)
+            if label is not None:
+                self._labels[entry] = label
+                self._entry_keys[entry] = set().union(*(_word_keys(name) for name in names))
+                for key in self._entry_keys[entry]:
+                    insort(self._keys, (key, entry))
+            self.generation = _bump_generation(self.generation)
+
+    def search(self, prefix, lang='uz', limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_fresh()
+        with self._lock:
+            keys, labels = self._keys, self._labels
+            results, seen = [], set()
+            index = bisect_left(keys, (prefix,))
+            while index < len(keys) and len(results) < limit:
+                key, entry = keys[index]
+                if not key.startswith(prefix):
+                    break
+                if entry not in seen:
+                    seen.add(entry)
+                    kind, pk = entry
+                    results.append({'kind': kind, 'id': pk, 'label': labels[entry].get(lang) or labels[entry]['uz']})
+                index += 1
+        return results
+
+    def stats(self):
+        self._ensure_fresh()
+        with self._lock:
+            memory = sys.getsizeof(self._keys) + sys.getsizeof(self._labels) + sys.getsizeof(self._entry_keys)
+            for key, entry in self._keys:
+                memory += sys.getsizeof((key, entry)) + sys.getsizeof(key)
+            for entry, label in self._labels.items():
+                memory += sys.getsizeof(entry) + sum(sys.getsizeof(part) for part in entry)
+                memory += sys.getsizeof(label) + sum(sys.getsizeof(value) for value in label.values())
+            for keys in self._entry_keys.values():
+                memory += sys.getsizeof(keys)
+            return {
+                'entries': len(self._labels),
+                'keys': len(self._keys),
+                'memory_bytes': memory,
+                'build_seconds': round(self.build_seconds or 0, 6),
+                'built_at': self.built_at,
+                'generation': self.generation,
+            }
+
+
+def _bump_generation(local_generation):
+    """
+    Boshqa workerlarga indeks o'zgarganini bildiradi. Agar bu worker oxirgi
+    versiyada bo'lsa, o'zgarish allaqachon qo'llangani uchun qayta qurilmaydi.
+    """
+    try:
+        generation = cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        return None
+    if local_generation is not None and generation == local_generation + 1:
+        return generation
+    return local_generation
+
+
+index = PrefixIndex()
+
+
+def update_course(course, deleted=False):
+    if deleted:
+        index.update('course', course.pk)
+        return
+    names = [course.name_uz, course.name_en, course.name_ru]
+    index.update('course', course.pk, {'uz': course.name_uz, 'en': course.name_en, 'ru': course.name_ru}, names)
+
+
+def update_teacher(teacher, deleted=False):
+    if deleted:
+        index.update('instructor', teacher.pk)
+        return
+    full_name = teacher.full_name
+    index.update('instructor', teacher.pk, {'uz': full_name, 'en': full_name, 'ru': full_name}, [full_name])
@@ -0,0 +1,105 @@
+import fcntl
+import os
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.text import get_valid_filename
+
+from courses.models import UploadSession, Video
+
+UPLOAD_DIR = 'uploads'
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadLocked(Exception):
+    pass
+
+
+def part_path(session):
+    return os.path.join(settings.MEDIA_ROOT, UPLOAD_DIR, f"{session.pk}.part")
+
+
+def create_part_file(session):
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+
+
+@contextmanager
+def locked_part_file(session):
+    """
+    .part faylini eksklyuziv qulflaydi: bir sessiyaga parallel PATCH
+    so'rovlari (boshqa gunicorn workerlardan ham) bir-birini buzmaydi.
+    """
+    with open(part_path(session), 'r+b') as part:
+        try:
+            fcntl.flock(part.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadLocked()
+        try:
+            yield part
+        finally:
+            fcntl.flock(part.fileno(), fcntl.LOCK_UN)
+
+
+def append_chunk(part, stream, offset, length):
+    """
+    Oqimdan `length` baytni CHUNK_SIZE bo'laklab `offset` dan boshlab yozadi,
+    shuning uchun xotira sarfi bo'lak hajmidan oshmaydi. Yozilgan baytlar sonini qaytaradi.
+    """
+    part.seek(offset)
+    part.truncate()
+    written = 0
+    while written < length:
+        chunk = stream.read(min(CHUNK_SIZE, length - written))
+        if not chunk:
+            break
+        part.write(chunk)
+        written += len(chunk)
+    part.flush()
+    os.fsync(part.fileno())
+    return written
+
+
+def finalize_upload(session):
+    """
+    To'liq yuklangan faylni videos/ ga atomik ko'chiradi (os.replace) va Video
+    yaratadi. Video post_save signali HLS jobini navbatga qo'yadi.
+    """
+    name = f"videos/{uuid.uuid4().hex}_{get_valid_filename(os.path.basename(session.filename))}"
+    target = os.path.join(settings.MEDIA_ROOT, name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(part_path(session), target)
+
+    metadata = session.metadata
+    video = Video(
+        section_id=metadata['section'],
+        title_uz=metadata['title_uz'],
+        title_en=metadata['title_en'],
+        title_ru=metadata['title_ru'],
+        description_uz=metadata.get('description_uz', ''),
+        description_en=metadata.get('description_en', ''),
+        description_ru=metadata.get('description_ru', ''),
+        duration=metadata.get('duration', ''),
+        is_preview=metadata.get('is_preview', False),
+    )
+    video.video_file.name = name
+    try:
+        with transaction.atomic():
+            video.save()
+            session.state, session.video = 'completed', video
+            session.save(update_fields=['state', 'video', 'updated_at'])
+    except Exception:
+        os.replace(target, part_path(session))
+        raise
+    return video
+
+
+def discard_upload(session):
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
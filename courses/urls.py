@@ -6,6 +6,9 @@ from .views.video_comment_view import *
 from .views.question_view import CheckAnswerAPIView, GetQuestionAPIView, GetAllUserAPIView
 from .views.test_view import AddAnswerAPIView
 from .views.contact_views import ContactUsAPIView
+from .views.search_view import SearchAPIView, TypeaheadAPIView, TypeaheadStatsAPIView
+from .views.upload_view import CreateUploadSessionAPIView, UploadSessionAPIView
+from .views.analytics_view import VideoStatsAPIView
 
 urlpatterns = [
     path('create_category/', CreateCourseCategoryAPIView.as_view(), ),
@@ -13,9 +16,14 @@ urlpatterns = [
     path('add_course/', AddCourseAPIView.as_view(), ),
     path('get_all_courses/', GetCourseListAPIView.as_view(), ),
     path('get_course/<int:pk>/', GetCourseAPIView.as_view(), ),
+    path('get_course_curriculum/<int:pk>/', GetCourseCurriculumAPIView.as_view(), ),
+    path('reorder_curriculum/<int:pk>/', ReorderCourseCurriculumAPIView.as_view(), ),
     path('add_video/', AddVideoAPIView.as_view(), ),
+    path('uploads/', CreateUploadSessionAPIView.as_view(), ),
+    path('uploads/<uuid:pk>/', UploadSessionAPIView.as_view(), ),
     path('get_video/<int:pk>/', GetVideoAPIView.as_view(), ),
     path('get_video_url/<int:pk>/', GetVideoUrlAPIView.as_view(), ),
+    path('video_stats/<int:pk>/', VideoStatsAPIView.as_view(), ),
     path('add_section/', AddSectionAPIView.as_view(), ),
     path('get_section/<int:pk>/', GetSectionAPIView.as_view(), ),
     path('add_video_comment/<int:pk>/', AddVideoCommentAPIView.as_view(), ),
@@ -27,5 +35,8 @@ urlpatterns = [
     path('get_all_section/', GetAllSectionAPIView.as_view(), ),
     path('get_all_users/', GetAllUserAPIView.as_view(), ),
     path('contact/', ContactUsAPIView.as_view(), ),
+    path('search/', SearchAPIView.as_view(), ),
+    path('typeahead/', TypeaheadAPIView.as_view(), ),
+    path('typeahead/stats/', TypeaheadStatsAPIView.as_view(), ),
     path("check-answer/<int:id>",CheckAnswerAPIView.as_view())
 ]
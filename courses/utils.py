@@ -1,7 +1,9 @@
 from accounts.models import Enrollment
 from course_progress.models import QuestionResult
-from courses.models import ContactUsMessage, Video, Question
-from django.db.models import Count, Q
+from courses.progress import course_video_order, get_progress_bitmap
+from courses.models import ContactUsMessage, Course, Section, Video, VideoComment, Question
+from django.db.models import Exists, OuterRef, F, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
 import requests
 from django.conf import settings
 
@@ -32,60 +34,129 @@ def send_telegram(self, instance: ContactUsMessage):
         print(f"Telegramga xabar yuborishda xato yuz berdi: {e}")
 
 
-def build_video_access_map(user, course):
-    course_videos = list(
-        Video.objects.filter(section__course=course).order_by('created_at', 'id')
+def course_catalog_queryset(queryset=None):
+    """
+    CourseSerializer uchun kurslarni kategoriya, o'qituvchi va CourseStats
+    qatori bilan birga bitta so'rovda yuklaydi.
+    """
+    if queryset is None:
+        queryset = Course.objects.all()
+    return queryset.select_related('category', 'instructor', 'stats')
+
+
+# sort nomi -> (maydon, kamayish tartibida). Har biri migratsiyadagi kompozit indeksga mos keladi.
+CATALOG_SORTS = {
+    'newest': ('created_at', True),
+    'popular': ('stats__enrolled_count', True),
+    'rating': ('stats__rating_avg', True),
+    'price': ('effective_price', False),
+    '-price': ('effective_price', True),
+    'duration': ('stats__total_duration', False),
+    '-duration': ('stats__total_duration', True),
+}
+
+
+def filter_course_catalog(queryset, filters):
+    """CatalogFilterSerializer bilan tekshirilgan filtrlarni kurslar querysetiga qo'llaydi."""
+    if filters.get('category') is not None:
+        queryset = queryset.filter(category_id=filters['category'])
+    if filters.get('status'):
+        queryset = queryset.filter(status=filters['status'])
+    if filters.get('instructor'):
+        queryset = queryset.filter(instructor_id=filters['instructor'])
+    if filters.get('min_price') is not None:
+        queryset = queryset.filter(effective_price__gte=filters['min_price'])
+    if filters.get('max_price') is not None:
+        queryset = queryset.filter(effective_price__lte=filters['max_price'])
+    if filters.get('min_rating') is not None:
+        queryset = queryset.filter(stats__rating_avg__gte=filters['min_rating'])
+    if filters.get('min_duration') is not None:
+        queryset = queryset.filter(stats__total_duration__gte=filters['min_duration'])
+    if filters.get('max_duration') is not None:
+        queryset = queryset.filter(stats__total_duration__lte=filters['max_duration'])
+    if CATALOG_SORTS[filters['sort']][0].startswith('stats__'):
+        # CourseStats qatori har bir kurs uchun mavjud (0019 va Course post_save): INNER JOIN indeksdan o'qiydi
+        queryset = queryset.filter(stats__isnull=False)
+    return queryset
+
+
+def attach_catalog_videos(courses):
+    """
+    Barcha kurslarning videolarini bitta so'rov bilan yuklab,
+    har bir kursga `catalog_videos` sifatida biriktiradi.
+    """
+    courses = list(courses)
+    videos_by_course = {course.id: [] for course in courses}
+    videos = (
+        Video.objects
+        .filter(section__course_id__in=videos_by_course.keys())
+        .annotate(
+            course_ref=F('section__course_id'),
+            has_questions_flag=Exists(Question.objects.filter(video=OuterRef('pk'))),
+        )
+        .order_by('section__position', 'section_id', 'position', 'id')
+    )
+    for video in videos:
+        videos_by_course[video.course_ref].append(video)
+    for course in courses:
+        course.catalog_videos = videos_by_course[course.id]
+    return courses
+
+
+def curriculum_queryset():
+    """Kurs -> sectionlar -> videolar daraxtini 3 ta so'rovda yuklaydi."""
+    videos = Video.objects.order_by('position', 'id')
+    sections = (
+        Section.objects
+        .annotate(duration_seconds=Coalesce(Sum('video__duration_seconds'), 0))
+        .prefetch_related(Prefetch('video_set', queryset=videos))
+        .order_by('position', 'id')
     )
+    return (
+        Course.objects
+        .annotate(duration_seconds=Coalesce(F('stats__total_duration'), 0))
+        .prefetch_related(Prefetch('section_set', queryset=sections))
+    )
+
+
+def annotate_comments(queryset, user):
+    """liked_by_me har bir comment uchun EXISTS subquery bilan, muallif select_related('user') bilan."""
+    if user and user.is_authenticated:
+        liked_by_me = Exists(VideoComment.likes.through.objects.filter(
+            videocomment_id=OuterRef('pk'), customuser_id=user.pk
+        ))
+    else:
+        liked_by_me = Value(False)
+    return queryset.select_related('user').annotate(liked_by_me=liked_by_me)
+
+
+def comment_threads_queryset(video, user):
+    """Videoning asosiy commentlari; javoblar sahifa uchun bitta prefetch so'rovida yuklanadi."""
+    replies = annotate_comments(VideoComment.objects.order_by('created_at', 'id'), user)
+    return annotate_comments(
+        VideoComment.objects.filter(video=video, parent_comment__isnull=True), user
+    ).prefetch_related(Prefetch('replies', queryset=replies))
+
+
+def enrolled_course_ids(user):
     if not user or not user.is_authenticated:
-        return {video.id: video.is_preview for video in course_videos}
-
-    is_enrolled = Enrollment.objects.filter(user=user, course=course).exists()
-    if not is_enrolled:
-        return {video.id: video.is_preview for video in course_videos}
-
-    video_ids = [video.id for video in course_videos]
-    question_counts = {
-        row["video_id"]: row["count"]
-        for row in Question.objects.filter(video_id__in=video_ids)
-        .values("video_id")
-        .annotate(count=Count("id"))
-    }
-    completed_counts = {
-        row["video_id"]: row["count"]
-        for row in Question.objects.filter(video_id__in=video_ids)
-        .filter(
-            Q(is_completed=True) |
-            Q(questionresult__user=user, questionresult__is_passed=True)
-        )
-        .values("video_id")
-        .annotate(count=Count("id", distinct=True))
-    }
-
-    access_map = {}
-    def is_video_completed(video_id):
-        total = question_counts.get(video_id, 0)
-        if total == 0:
-            return True
-        return completed_counts.get(video_id, 0) >= total
-
-    for index, video in enumerate(course_videos):
-        if video.is_preview or index == 0:
-            access_map[video.id] = True
-            continue
-        prev_video = course_videos[index - 1]
-        access_map[video.id] = is_video_completed(prev_video.id)
-    return access_map
-
-
-def is_video_test_completed(video, user):
-    questions = Question.objects.filter(video=video)
-    if not questions.exists():
-        return True
+        return set()
+    return set(Enrollment.objects.filter(user=user).values_list('course_id', flat=True))
+
+
+def build_video_access_map(user, course, is_enrolled=None):
+    """
+    {video_id: ochiqmi} xaritasi. Preview va birinchi video har doim ochiq,
+    qolganlari oldingi video testlari yakunlangan bo'lsa ochiladi. Hisob
+    keshlangan video tartibi va foydalanuvchi progress bitmapi ustida bajariladi.
+    """
+    course_id = getattr(course, 'pk', course)
     if not user or not user.is_authenticated:
-        return False
-    total = questions.count()
-    completed = questions.filter(
-        Q(is_completed=True) |
-        Q(questionresult__user=user, questionresult__is_passed=True)
-    ).distinct().count()
-    return completed >= total
+        order = course_video_order(course_id)
+        unlocked = order['preview_mask']
+    else:
+        order, progress = get_progress_bitmap(user, course_id, is_enrolled=is_enrolled)
+        unlocked = order['preview_mask']
+        if progress['enrolled']:
+            unlocked |= 1 | (progress['bits'] << 1)
+    return {video_id: bool(unlocked >> index & 1) for index, video_id in enumerate(order['ids'])}
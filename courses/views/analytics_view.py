@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from courses.models import Video, VideoDailyStats
+
+MAX_STATS_DAYS = 365
+
+
+def _completion_rate(completions, viewers):
+    return round(min(completions / viewers, 1) * 100, 1) if viewers else 0
+
+
+class VideoStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Video statistikasi",
+        operation_description="Kunlik ko'rishlar, unikal tomoshabinlar (HyperLogLog) va yakunlash foizi. "
+                              "Faqat kurs o'qituvchisi yoki admin uchun.",
+        manual_parameters=[
+            openapi.Parameter('id', openapi.IN_PATH, description="Video ID", type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('days', openapi.IN_QUERY, description="Oxirgi necha kun (default 30)",
+                              type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: "Kunlik statistika va jami: plays, viewer_days, completion_days, completion_rate",
+            403: "Ruxsat yo'q",
+            404: "Video topilmadi"
+        },
+        tags=["Video"]
+    )
+    def get(self, request, pk):
+        video = get_object_or_404(Video.objects.select_related('section__course'), pk=pk)
+        if not request.user.is_staff and video.section.course.instructor_id != request.user.pk:
+            return Response({"error": "Permission denied.!"}, status=403)
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), MAX_STATS_DAYS)
+        except ValueError:
+            return Response({"error": "days butun son bo'lishi kerak.!"}, status=400)
+
+        rows = VideoDailyStats.objects.filter(
+            video=video, date__gt=timezone.localdate() - timedelta(days=days)
+        ).order_by('date')
+        totals = rows.aggregate(plays=Sum('plays'), viewers=Sum('unique_viewers'), completions=Sum('completions'))
+        return Response(
+            {
+                "video_id": video.id,
+                "days": [
+                    {
+                        "date": row.date,
+                        "plays": row.plays,
+                        "unique_viewers": row.unique_viewers,
+                        "completions": row.completions,
+                        "completion_rate": _completion_rate(row.completions, row.unique_viewers),
+                    }
+                    for row in rows
+                ],
+                "totals": {
+                    "plays": totals['plays'] or 0,
+                    # kunlik HLL qiymatlari yig'indisi: bir necha kun ko'rgan foydalanuvchi har kuni sanaladi,
+                    # shuning uchun davr bo'yicha unikal tomoshabinlar emas, "tomoshabin-kun" qaytariladi
+                    "viewer_days": totals['viewers'] or 0,
+                    "completion_days": totals['completions'] or 0,
+                    "completion_rate": _completion_rate(totals['completions'] or 0, totals['viewers'] or 0),
+                },
+            },
+            status=200
+        )
@@ -4,9 +4,19 @@ from rest_framework.response import Response
 
 from courses.models import CourseCategory, Course, Video, Section, VideoComment
 from courses.serializers import CourseCategorySerializer, CourseSerializer, VideoSerializer, \
-    SectionSerializer, VideoCommentSerializer, UserSerializer
+    SectionSerializer, VideoCommentSerializer, UserSerializer, CurriculumSerializer, CatalogFilterSerializer, \
+    CurriculumReorderSerializer
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from accounts.models import CustomUser
+from courses.utils import course_catalog_queryset, attach_catalog_videos, curriculum_queryset, \
+    build_video_access_map, enrolled_course_ids, filter_course_catalog, CATALOG_SORTS
+from courses.pagination import KeysetPagination
+from courses.cache import cached_response_data, response_audience, course_scope, bump_versions
+from courses.progress import relink_course_videos
+from courses.stats import refresh_quiz_totals
+from django.db import transaction
+from django.utils import timezone
+from courses.conditional import conditional_get, catalog_validator, course_validator, category_validator
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -56,12 +66,16 @@ class GetCourseCategoryAPIView(APIView):
             ),
         }
     )
+    @conditional_get(category_validator)
     def get(self, request):
 
         try:
-            category = CourseCategory.objects.all()
-            serializer = CourseCategorySerializer(category, many=True, context={'request': request})
-            return Response(serializer.data, status=200)
+            def build():
+                category = CourseCategory.objects.all()
+                return CourseCategorySerializer(category, many=True, context={'request': request}).data
+
+            data = cached_response_data('categories', request, ['categories'], build)
+            return Response(data, status=200)
         except CourseCategory.DoesNotExist:
             return Response({"message": "CourseCategory Not Created Yet.!"}, status=404)
 
@@ -123,13 +137,20 @@ class GetCourseAPIView(APIView):
             404: "course topilmadi"
         }
     )
+    @conditional_get(course_validator)
     def get(self, request, pk):
         try:
-            course = Course.objects.get(pk=pk)
-
-            serializer = CourseSerializer(course, context={'request': request})
+            def build():
+                course = course_catalog_queryset().get(pk=pk)
+                if CourseSerializer.field_requested(request, 'videos'):
+                    attach_catalog_videos([course])
+                return CourseSerializer(course, context={'request': request}).data
 
-            return Response(serializer.data, status=200)
+            data = cached_response_data(
+                'course', request, [course_scope(pk)], build,
+                audience=response_audience(request, course_id=pk)
+            )
+            return Response(data, status=200)
 
         except Course.DoesNotExist:
             return Response({"error": "course not found.!"}, status=404)
@@ -138,23 +159,143 @@ class GetCourseAPIView(APIView):
 class GetCourseListAPIView(APIView):
 
     @swagger_auto_schema(
-        operation_description="Barcha courselarni olish",
+        operation_description="Barcha courselarni olish (filtr, saralash va cursor pagination bilan)",
+        manual_parameters=[
+            openapi.Parameter('category', openapi.IN_QUERY, description="Category ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('status', openapi.IN_QUERY, description="boshlangich / o'rta / yuqori",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('instructor', openapi.IN_QUERY, description="Instructor ID", type=openapi.TYPE_STRING,
+                              format='uuid'),
+            openapi.Parameter('min_price', openapi.IN_QUERY, description="Chegirmali narx (dan)",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('max_price', openapi.IN_QUERY, description="Chegirmali narx (gacha)",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('min_rating', openapi.IN_QUERY, description="Minimal reyting", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('min_duration', openapi.IN_QUERY, description="Kurs davomiyligi, sekund (dan)",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('max_duration', openapi.IN_QUERY, description="Kurs davomiyligi, sekund (gacha)",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('sort', openapi.IN_QUERY,
+                              description="newest / popular / rating / price / -price / duration / -duration",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Oldingi javobdagi next cursor",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Sahifa hajmi (max 100)",
+                              type=openapi.TYPE_INTEGER),
+        ],
         responses={
             200: openapi.Response(
-                description="course ro‘yxati",
+                description="course ro‘yxati: {next, results}",
                 schema=CourseSerializer(many=True)
             ),
-            404: openapi.Response(
-                description="Hech qanday course topilmadi",
-
-            ),
+            400: "Noto'g'ri filtr yoki cursor",
         }
     )
+    @conditional_get(catalog_validator)
     def get(self, request):
+        filters = CatalogFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        field, descending = CATALOG_SORTS[filters.validated_data['sort']]
+
+        def build():
+            courses = filter_course_catalog(course_catalog_queryset(), filters.validated_data)
+            paginator = KeysetPagination(field, descending)
+            page = paginator.paginate_queryset(courses, request)
+            if CourseSerializer.field_requested(request, 'videos'):
+                attach_catalog_videos(page)
+            context = {'request': request, 'enrolled_course_ids': enrolled_course_ids(request.user)}
+            return paginator.get_paginated_data(CourseSerializer(page, many=True, context=context).data)
+
+        data = cached_response_data('courses', request, ['catalog'], build, audience=response_audience(request))
+        return Response(data, status=200)
+
+
+class GetCourseCurriculumAPIView(APIView):
+
+    @swagger_auto_schema(
+        operation_description="Kurs tuzilmasi: course -> sectionlar -> videolar (savollar soni va qulf holati bilan)",
+        manual_parameters=[
+            openapi.Parameter(
+                name='id',
+                in_=openapi.IN_PATH,
+                description="Course ID",
+                type=openapi.TYPE_INTEGER,
+                required=True
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Kurs tuzilmasi", schema=CurriculumSerializer),
+            404: "course topilmadi"
+        }
+    )
+    @conditional_get(course_validator)
+    def get(self, request, pk):
+        def build():
+            course = curriculum_queryset().get(pk=pk)
+            return CurriculumSerializer(course, context={'request': request}).data
 
         try:
-            course = Course.objects.all()
-            serializer = CourseSerializer(course, many=True, context={'request': request})
-            return Response(serializer.data, status=200)
+            tree = cached_response_data('curriculum', request, [course_scope(pk)], build)
         except Course.DoesNotExist:
-            return Response({"message": "Course Not Created Yet.!"}, status=404)
\ No newline at end of file
+            return Response({"error": "course not found.!"}, status=404)
+
+        access_map = build_video_access_map(request.user, pk)
+        data = {
+            **tree,
+            'sections': [
+                {
+                    **section,
+                    'videos': [
+                        {**video, 'is_locked': not access_map.get(video['id'], False)}
+                        for video in section['videos']
+                    ],
+                }
+                for section in tree['sections']
+            ],
+        }
+        return Response(data, status=200)
+
+
+class ReorderCourseCurriculumAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Kurs sectionlari va videolari tartibini bitta so'rovda o'zgartirish. "
+                              "Ro'yxatdagi tartib position sifatida saqlanadi, video boshqa sectionga ham o'tkazilishi mumkin.",
+        manual_parameters=[
+            openapi.Parameter(
+                name='id',
+                in_=openapi.IN_PATH,
+                description="Course ID",
+                type=openapi.TYPE_INTEGER,
+                required=True
+            )
+        ],
+        request_body=CurriculumReorderSerializer,
+        responses={
+            200: openapi.Response(description="Yangi tartib", schema=CurriculumReorderSerializer),
+            400: "Noto'g'ri ma'lumot",
+            404: "course topilmadi"
+        }
+    )
+    def post(self, request, pk):
+        course = get_object_or_404(Course, pk=pk)
+        serializer = CurriculumReorderSerializer(data=request.data, context={'request': request, 'course': course})
+        serializer.is_valid(raise_exception=True)
+
+        now = timezone.now()
+        sections, videos = [], []
+        for section_position, item in enumerate(serializer.validated_data['sections']):
+            sections.append(Section(id=item['id'], position=section_position, updated_at=now))
+            for video_position, video_id in enumerate(item['videos']):
+                videos.append(Video(id=video_id, section_id=item['id'], position=video_position, updated_at=now))
+
+        with transaction.atomic():
+            Section.objects.bulk_update(sections, ['position', 'updated_at'], batch_size=500)
+            Video.objects.bulk_update(videos, ['section', 'position', 'updated_at'], batch_size=500)
+            relink_course_videos(course.pk)
+            # bulk_update signal yubormaydi: quiz jami qiymatlari va kesh versiyalari qo'lda yangilanadi
+            refresh_quiz_totals(section_ids=Section.objects.filter(course=course).values_list('id', flat=True))
+            bump_versions('catalog', course_scope(course.pk))
+
+        return Response(serializer.data, status=200)
@@ -0,0 +1,38 @@
+import asyncio
+
+from django.http import Http404, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from courses.models import Video
+from courses.realtime import subscribe, unsubscribe, video_channel
+
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+
+
+async def _event_stream(channel):
+    queue = subscribe(channel)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # proxy va brauzer ulanishni yopib qo'ymasligi uchun izoh qatori
+                yield ": keepalive\n\n"
+    finally:
+        unsubscribe(channel, queue)
+
+
+@require_safe
+async def comment_events(request, video_id):
+    """
+    Video uchun Server-Sent Events oqimi: yangi comment/javoblar (`comment`) va
+    like sonlari (`likes`). get_all_video_comments ni qayta-qayta so'rash o'rniga ishlatiladi.
+    """
+    if not await Video.objects.filter(pk=video_id).aexists():
+        raise Http404("Video not found.!")
+    response = StreamingHttpResponse(_event_stream(video_channel(video_id)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,95 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+from courses import typeahead
+from courses.search import search_documents
+from courses.serializers import localized
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+
+class SearchAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Kurs, section va video nomlari/tavsiflari bo'yicha to'liq matnli qidiruv",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description="Qidiruv so'zi"),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: "Qidiruv natijalari (rank bo'yicha tartiblangan)",
+            400: "q parametri berilmagan"
+        }
+    )
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q parameter required.!"}, status=400)
+
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', SEARCH_PAGE_SIZE)), 1),
+                            SEARCH_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "page and page_size must be integers.!"}, status=400)
+
+        total, hits = search_documents(query, limit=page_size, offset=(page - 1) * page_size)
+        lang = request.LANGUAGE_CODE
+        results = [
+            {
+                "kind": document.kind,
+                "id": document.object_id,
+                "course_id": document.course_id,
+                "title": localized(document, 'title', lang),
+                "rank": round(rank, 4),
+            }
+            for document, rank in hits
+        ]
+        return Response(
+            {
+                "count": total,
+                "page": page,
+                "page_size": page_size,
+                "results": results,
+            },
+            status=200
+        )
+
+
+class TypeaheadAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Kurs nomlari va o'qituvchi ismlari bo'yicha prefiks (autocomplete) qidiruv. "
+                              "Natijalar xotiradagi indeksdan olinadi, bazaga murojaat qilinmaydi.",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: "Takliflar ro'yxati"}
+    )
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({"error": "limit must be an integer.!"}, status=400)
+        results = typeahead.index.search(request.query_params.get('q', ''), request.LANGUAGE_CODE, limit)
+        return Response({"results": results}, status=200)
+
+
+class TypeaheadStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Autocomplete indeksining hajmi, xotira sarfi va qurilish vaqti",
+        responses={200: "Indeks statistikasi"}
+    )
+    def get(self, request):
+        return Response(typeahead.index.stats(), status=200)
@@ -3,9 +3,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from courses.models import CourseCategory, Course, Video, Section, VideoComment
 from courses.serializers import CourseCategorySerializer, CourseSerializer, VideoSerializer, \
-    SectionSerializer, VideoCommentSerializer, UserSerializer
+    SectionSerializer, VideoCommentSerializer, UserSerializer, SectionListSerializer
+from courses.pagination import SectionPagination
+from courses.utils import course_catalog_queryset, attach_catalog_videos, enrolled_course_ids
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from accounts.models import CustomUser
+from courses.conditional import conditional_get, section_validator
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -59,6 +62,7 @@ class GetSectionAPIView(APIView):
             404: "Section topilmadi"
         }
     )
+    @conditional_get(section_validator)
     def get(self, request, pk):
         try:
             section = Section.objects.get(pk=pk)
@@ -73,11 +77,18 @@ class GetAllSectionAPIView(APIView):
 
     @swagger_auto_schema(
         operation_summary="Barcha sectionlarni olish",
-        operation_description="Sistemadagi mavjud barcha sectionlarni qaytaradi.",
+        operation_description="Sistemadagi sectionlarni sahifalab qaytaradi. Har bir course javobda "
+                              "faqat bir marta, `courses` lug'atida (course_id bo'yicha) beriladi.",
+        manual_parameters=[
+            openapi.Parameter('course', openapi.IN_QUERY, description="Course ID bo'yicha filter",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
         responses={
             200: openapi.Response(
                 description="Sectionlar ro‘yxati",
-                schema=SectionSerializer(many=True)
+                schema=SectionListSerializer(many=True)
             ),
             404: openapi.Response(
                 description="Hech qanday section topilmadi",
@@ -86,10 +97,30 @@ class GetAllSectionAPIView(APIView):
         }
     )
     def get(self, request):
-        sections = Section.objects.all()
+        sections = Section.objects.order_by('course_id', 'position', 'id')
+        course_id = request.query_params.get('course')
+        if course_id:
+            if not course_id.isdigit():
+                return Response({"error": "course must be an integer.!"}, status=400)
+            sections = sections.filter(course_id=course_id)
 
-        if not sections:
+        paginator = SectionPagination()
+        page = paginator.paginate_queryset(sections, request, view=self)
+        if not page:
             return Response({"message": "Not Any Section Found.!"}, status=404)
-        serializer = SectionSerializer(sections, many=True, context={'request': request})
 
-        return Response(serializer.data, status=200)
+        serializer = SectionListSerializer(page, many=True, context={'request': request})
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['courses'] = _side_loaded_courses(request, {section.course_id for section in page})
+        return response
+
+
+def _side_loaded_courses(request, course_ids):
+    courses = course_catalog_queryset(Course.objects.filter(pk__in=course_ids))
+    if CourseSerializer.field_requested(request, 'videos', top_level=False):
+        courses = attach_catalog_videos(courses)
+    context = {'request': request, 'nested': True, 'enrolled_course_ids': enrolled_course_ids(request.user)}
+    return {
+        str(item['id']): item
+        for item in CourseSerializer(courses, many=True, context=context).data
+    }
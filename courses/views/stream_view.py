@@ -0,0 +1,33 @@
+import mimetypes
+import os
+import time
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+
+from courses.streaming import verify_stream_signature, x_accel_location
+
+
+@require_safe
+def stream_media(request, expires, signature, path):
+    """
+    Imzolangan video URL. Imzo to'g'ri bo'lsa, baytlarni nginx uzatadi
+    (X-Accel-Redirect); DEBUG rejimida fayl Django orqali beriladi.
+    """
+    if not verify_stream_signature(path, expires, signature):
+        return HttpResponseForbidden("Link yaroqsiz yoki muddati tugagan.!")
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if settings.STREAM_USE_X_ACCEL:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = x_accel_location(path)
+    else:
+        full_path = os.path.join(settings.MEDIA_ROOT, path)
+        if not os.path.isfile(full_path):
+            raise Http404("File not found.!")
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+    patch_cache_control(response, private=True, max_age=max(int(expires - time.time()), 0))
+    return response
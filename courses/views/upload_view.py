@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from courses.models import UploadSession
+from courses.serializers import UploadSessionCreateSerializer
+from courses.uploads import UploadLocked, append_chunk, create_part_file, discard_upload, finalize_upload, \
+    locked_part_file
+
+UPLOAD_CONTENT_TYPE = 'application/offset+octet-stream'
+
+
+def _upload_headers(response, session):
+    response['Upload-Offset'] = str(session.offset)
+    response['Upload-Length'] = str(session.size)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def _session_data(session):
+    return {
+        "id": str(session.pk),
+        "filename": session.filename,
+        "size": session.size,
+        "offset": session.offset,
+        "state": session.state,
+        "video": session.video_id,
+        "expires_at": session.expires_at,
+    }
+
+
+class CreateUploadSessionAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Bo'laklab (resumable) video yuklash sessiyasini yaratish. "
+                              "So'ng fayl PATCH so'rovlari bilan Upload-Offset bo'yicha yuboriladi.",
+        request_body=UploadSessionCreateSerializer,
+        responses={
+            201: "Sessiya yaratildi (Location va Upload-Offset headerlari bilan)",
+            400: "Xato: noto‘g‘ri ma'lumot"
+        },
+        tags=["Video"]
+    )
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        filename, size = data.pop('filename'), data.pop('size')
+        data['section'] = data['section'].pk
+
+        session = UploadSession.objects.create(
+            user=request.user,
+            filename=filename,
+            size=size,
+            metadata=data,
+            expires_at=timezone.now() + timedelta(seconds=settings.VIDEO_UPLOAD_TTL),
+        )
+        create_part_file(session)
+        response = Response(_session_data(session), status=201)
+        response['Location'] = request.build_absolute_uri(f"{session.pk}/")
+        return _upload_headers(response, session)
+
+
+class UploadSessionAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get_session(self, request, pk):
+        return get_object_or_404(UploadSession, pk=pk, user=request.user)
+
+    @swagger_auto_schema(operation_description="Yuklash holati (JSON)", tags=["Video"])
+    def get(self, request, pk):
+        session = self.get_session(request, pk)
+        return _upload_headers(Response(_session_data(session), status=200), session)
+
+    def head(self, request, pk):
+        session = self.get_session(request, pk)
+        return _upload_headers(Response(status=200), session)
+
+    @swagger_auto_schema(
+        operation_description="Faylning navbatdagi bo'lagini yuborish. Content-Type: application/offset+octet-stream, "
+                              "Upload-Offset: serverdagi joriy offset. Oxirgi bo'lakdan keyin Video yaratiladi.",
+        manual_parameters=[
+            openapi.Parameter('Upload-Offset', openapi.IN_HEADER, type=openapi.TYPE_INTEGER, required=True),
+        ],
+        responses={
+            204: "Bo'lak qabul qilindi (yangi Upload-Offset headerda)",
+            409: "Upload-Offset mos emas yoki sessiya boshqa so'rov bilan band",
+            410: "Sessiya muddati tugagan",
+            415: "Content-Type noto'g'ri",
+        },
+        tags=["Video"]
+    )
+    def patch(self, request, pk):
+        session = self.get_session(request, pk)
+        if request.content_type.split(';')[0].strip() != UPLOAD_CONTENT_TYPE:
+            return Response({"error": f"Content-Type {UPLOAD_CONTENT_TYPE} bo'lishi kerak.!"}, status=415)
+        if session.state == 'completed':
+            return _upload_headers(Response({"error": "Upload already completed.!"}, status=409), session)
+        if session.expires_at < timezone.now():
+            return Response({"error": "Upload session expired.!"}, status=410)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response({"error": "Upload-Offset va Content-Length talab qilinadi.!"}, status=400)
+
+        try:
+            with locked_part_file(session) as part:
+                # qulf olingandan keyin offset bazadan qayta o'qiladi
+                session.refresh_from_db(fields=['offset', 'state'])
+                if offset != session.offset or session.state == 'completed':
+                    return _upload_headers(Response({"error": "Upload-Offset mismatch.!"}, status=409), session)
+                if offset + length > session.size:
+                    return Response({"error": "Chunk fayl hajmidan oshib ketdi.!"}, status=400)
+
+                written = append_chunk(part, request.stream, offset, length) if length else 0
+                session.offset = offset + written
+                session.save(update_fields=['offset', 'updated_at'])
+                if session.offset == session.size:
+                    finalize_upload(session)
+        except UploadLocked:
+            return _upload_headers(Response({"error": "Upload is busy.!"}, status=409), session)
+
+        return _upload_headers(Response(status=204), session)
+
+    @swagger_auto_schema(operation_description="Yuklashni bekor qilish", responses={204: "O'chirildi"}, tags=["Video"])
+    def delete(self, request, pk):
+        session = self.get_session(request, pk)
+        if session.state == 'completed':
+            return Response({"error": "Upload already completed.!"}, status=409)
+        discard_upload(session)
+        return Response(status=204)
@@ -1,3 +1,5 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.views import APIView
@@ -6,7 +8,10 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from courses.models import CourseCategory, Course, Video, Section, VideoComment
 from courses.serializers import CourseCategorySerializer, CourseSerializer, VideoSerializer, \
-    SectionSerializer, VideoCommentSerializer, UserSerializer
+    SectionSerializer, VideoCommentSerializer, VideoCommentThreadSerializer, UserSerializer
+from courses.pagination import KeysetPagination
+from courses.utils import comment_threads_queryset
+from courses.realtime import publish_likes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -62,7 +67,8 @@ class GetAllVideoCommentsAPIView(APIView):
     permission_classes = [AllowAny]
 
     @swagger_auto_schema(
-        operation_description="Tanlangan videoga yozilgan barcha asosiy commentlarni olish",
+        operation_description="Tanlangan videoga yozilgan asosiy commentlar (yangilari birinchi, cursor pagination) "
+                              "va ularning javoblari",
         manual_parameters=[
             openapi.Parameter(
                 name='id',
@@ -70,24 +76,26 @@ class GetAllVideoCommentsAPIView(APIView):
                 description="Commentlarni ko‘rmoqchi bo‘lgan Video ID",
                 type=openapi.TYPE_INTEGER,
                 required=True
-            )
+            ),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Oldingi javobdagi next cursor",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Sahifa hajmi (max 100)",
+                              type=openapi.TYPE_INTEGER),
         ],
         responses={
             200: openapi.Response(
-                description="Video commentlari ro‘yxati",
-                schema=VideoCommentSerializer(many=True)
+                description="Video commentlari: {next, results}",
+                schema=VideoCommentThreadSerializer(many=True)
             ),
             404: "Video topilmadi"
         }
     )
     def get(self, request, pk):
         video = get_object_or_404(Video, pk=pk)
-        comments = VideoComment.objects.filter(
-            video=video,
-
-        )
-        serializer = VideoCommentSerializer(comments, many=True, context={'request': request})
-        return Response(serializer.data, status=200)
+        paginator = KeysetPagination('created_at', descending=True)
+        comments = paginator.paginate_queryset(comment_threads_queryset(video, request.user), request)
+        serializer = VideoCommentThreadSerializer(comments, many=True, context={'request': request})
+        return Response(paginator.get_paginated_data(serializer.data), status=200)
 
 
 class ReplyCommentToVideoCommentAPIView(APIView):
@@ -153,18 +161,35 @@ class LikeVideoCommentAPIView(APIView):
             200: openapi.Response(
                 description="Like/unlike javobi",
                 examples={
-                    "application/json": {"message": "liked"}
+                    "application/json": {"message": "liked", "liked": True, "likes_count": 12}
                 }
             ),
             404: "Comment topilmadi"
         }
     )
     def post(self, request, pk):
-        comment = get_object_or_404(VideoComment, pk=pk)
-
-        if request.user in comment.likes.all():
-            comment.likes.remove(request.user)
-            return Response({"message": "like removed"})
-        else:
-            comment.likes.add(request.user)
-            return Response({"message": "liked"})
+        comments = VideoComment.objects.filter(pk=pk)
+        if not comments.exists():
+            return Response({"error": "Comment not found.!"}, status=404)
+        likes = VideoComment.likes.through.objects
+
+        # o'chirish/qo'shish through jadvaliga bitta shartli so'rov; unique (comment, user)
+        # tufayli bir vaqtdagi ikki bosish ham hisobni buzmaydi
+        with transaction.atomic():
+            removed, _ = likes.filter(videocomment_id=pk, customuser_id=request.user.pk).delete()
+            if removed:
+                comments.update(likes_count=F('likes_count') - 1)
+                liked = False
+            else:
+                try:
+                    with transaction.atomic():
+                        likes.create(videocomment_id=pk, customuser_id=request.user.pk)
+                except IntegrityError:
+                    pass
+                else:
+                    comments.update(likes_count=F('likes_count') + 1)
+                liked = True
+            likes_count, video_id = comments.values_list('likes_count', 'video_id').get()
+            publish_likes(video_id, int(pk), likes_count)
+
+        return Response({"message": "liked" if liked else "like removed", "liked": liked, "likes_count": likes_count})
@@ -3,7 +3,12 @@ from django.shortcuts import get_object_or_404
 
 from courses.models import Video, Section, Question
 from courses.serializers import VideoSerializer, QuestionSerializer
-from courses.utils import build_video_access_map, is_video_test_completed
+from courses.utils import build_video_access_map
+from courses.progress import is_video_passed
+from courses.cache import cached_response_data, course_scope
+from courses.analytics import record_play
+from courses.streaming import public_media_url, signed_stream_url
+from courses.conditional import conditional_get, section_videos_validator
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
 from drf_yasg.utils import swagger_auto_schema
@@ -119,6 +124,7 @@ class GetVideoAPIView(APIView):
         },
         tags=["Video"]
     )
+    @conditional_get(section_videos_validator)
     def get(self, request, pk):
         videos = Video.objects.filter(section_id=pk,is_preview=True)
         if not videos.exists():
@@ -136,6 +142,15 @@ class GetVideoAPIView(APIView):
         return Response(serializer.data, status=200)
 
 
+def _question_bank(request, video_id, course_id):
+    """Video savollari (javoblari bilan) til bo'yicha keshlanadi; Question/Answer o'zgarsa kurs versiyasi yangilanadi."""
+    def build():
+        questions = Question.objects.filter(video_id=video_id).prefetch_related('answer_set').order_by('id')
+        return QuestionSerializer(questions, many=True, context={'request': request}).data
+
+    return cached_response_data(f'questions:{video_id}', request, [course_scope(course_id)], build)
+
+
 class GetVideoUrlAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -158,6 +173,10 @@ class GetVideoUrlAPIView(APIView):
                     properties={
                         "video_id": openapi.Schema(type=openapi.TYPE_INTEGER),
                         "video_url": openapi.Schema(type=openapi.TYPE_STRING),
+                        "format": openapi.Schema(type=openapi.TYPE_STRING, description="hls (master.m3u8) yoki file"),
+                        "poster": openapi.Schema(type=openapi.TYPE_STRING),
+                        "thumbnails": openapi.Schema(type=openapi.TYPE_STRING,
+                                                     description="Seek-preview sprite uchun WebVTT"),
                         "questions": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_OBJECT)),
                     }
                 )
@@ -167,39 +186,32 @@ class GetVideoUrlAPIView(APIView):
         tags=["Video"]
     )
     def get(self, request, pk):
-        video = get_object_or_404(Video, pk=pk)
-        course_videos = list(
-            Video.objects.filter(section__course=video.section.course)
-            .order_by('created_at', 'id')
-        )
-        try:
-            current_index = next(
-                index for index, item in enumerate(course_videos) if item.id == video.id
+        video = get_object_or_404(Video.objects.select_related('section'), pk=pk)
+        course_id = video.section.course_id
+
+        prev_video_id = video.previous_video_id
+        if prev_video_id and not is_video_passed(request.user, prev_video_id, course_id):
+            return Response(
+                {
+                    "detail": "Previous video test not completed.",
+                    "questions": _question_bank(request, prev_video_id, course_id)
+                },
+                status=200
             )
-        except StopIteration:
-            return Response({"error": "Video Not Found.!"},
-                            status=404)
-
-        if current_index > 0:
-            prev_video = course_videos[current_index - 1]
-            if not is_video_test_completed(prev_video, request.user):
-                questions = Question.objects.filter(video=prev_video)
-                serializer = QuestionSerializer(questions, many=True, context={'request': request})
-                return Response(
-                    {
-                        "detail": "Previous video test not completed.",
-                        "questions": serializer.data
-                    },
-                    status=200
-                )
 
-        video_url = None
-        if video.video_file:
-            video_url = request.build_absolute_uri(video.video_file.url)
+        video_url, video_format = None, None
+        record_play(video.id, request.user.id)
+        if video.hls_playlist:
+            video_url, video_format = signed_stream_url(request, video.hls_playlist, directory=True), "hls"
+        elif video.video_file:
+            video_url, video_format = signed_stream_url(request, video.video_file.name), "file"
         return Response(
             {
                 "video_id": video.id,
-                "video_url": video_url
+                "video_url": video_url,
+                "format": video_format,
+                "poster": public_media_url(request, video.poster),
+                "thumbnails": public_media_url(request, video.thumbnails_vtt)
             },
             status=200
         )